@@ -1,36 +1,206 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional
+from ..core.config import settings
+from ..core.execution import execution, PoolSaturatedError, PoolSlot
 from ..services.model_service import model_manager
+from ..services.batch_prediction import is_archive, iter_archive_images, stream_batch_predictions
+from ..services.ensemble import ENSEMBLE_METHODS
+from ..services.tiling import TILE_AGGREGATIONS
 
 router = APIRouter()
 
+class SlotStreamingResponse(StreamingResponse):
+    """Streaming response that frees its pool slot when sending ends, even if the body was never iterated."""
+
+    def __init__(self, content, slot: PoolSlot, **kwargs):
+        super().__init__(content, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.slot.release()
+
 @router.get("/models", response_model=List[str])
 async def list_models():
     """List all available models."""
     return model_manager.get_available_models()
 
+@router.get("/models/resident")
+async def resident_models():
+    """Models currently loaded in memory, their measured size and the cache budget."""
+    return model_manager.resident_models()
+
 @router.post("/predict")
 async def predict(
     file: UploadFile = File(...),
-    model_name: Optional[str] = Form(None)
+    model_name: Optional[str] = Form(None),
+    ensemble: bool = Form(False),
+    ensemble_models: Optional[str] = Form(None),
+    ensemble_method: Optional[str] = Form(None)
 ):
     """
     Analyze an uploaded image for steganography.
+    With ensemble=true the verdict combines several models (ensemble_models: comma-separated
+    "model[:weight]", cheapest first; default ENSEMBLE_MEMBERS) and reports every member.
     """
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
+    if ensemble_method and ensemble_method not in ENSEMBLE_METHODS:
+        raise HTTPException(status_code=400, detail=f"ensemble_method must be one of {', '.join(ENSEMBLE_METHODS)}")
     
     try:
         contents = await file.read()
-        result = model_manager.predict(contents, model_name)
+        # Run on the inference pool so concurrent requests can be micro-batched together
+        if ensemble:
+            members = ensemble_models.split(",") if ensemble_models else None
+            result = await execution.run(
+                "inference", model_manager.predict_ensemble, contents, members, ensemble_method
+            )
+        else:
+            result = await execution.run("inference", model_manager.predict, contents, model_name)
         
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
             
         return result
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/predict/tiled")
+async def predict_tiled(
+    file: UploadFile = File(...),
+    model_name: Optional[str] = Form(None),
+    stride: Optional[int] = Form(None),
+    max_tiles: Optional[int] = Form(None),
+    aggregation: Optional[str] = Form(None)
+):
+    """
+    Analyze an image at full resolution: score native-resolution patches (stride pixels apart,
+    at most max_tiles, 0 = all) instead of one downscaled copy, and return the combined
+    verdict with a per-patch heatmap.
+    """
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+    if aggregation and aggregation not in TILE_AGGREGATIONS:
+        raise HTTPException(status_code=400, detail=f"aggregation must be one of {', '.join(TILE_AGGREGATIONS)}")
+    if (stride is not None and stride <= 0) or (max_tiles is not None and max_tiles < 0):
+        raise HTTPException(status_code=400, detail="stride must be > 0 and max_tiles >= 0")
+
+    try:
+        contents = await file.read()
+        result = await execution.run(
+            "inference", model_manager.predict_tiled, contents, model_name, stride, max_tiles, aggregation
+        )
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        return result
+    except PoolSaturatedError:
+        raise
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/predict/cascade")
+async def predict_cascade(
+    file: UploadFile = File(...),
+    stage1_model: Optional[str] = Form(None),
+    stage2_models: Optional[str] = Form(None)
+):
+    """
+    Triage an image: a cheap first stage (LSB statistics + a small model) decides confident
+    images, only uncertain ones run the heavy stage2_models ("model[:weight],...").
+    The response records which stage decided.
+    """
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    try:
+        contents = await file.read()
+        members = stage2_models.split(",") if stage2_models else None
+        result = await execution.run("inference", model_manager.predict_cascade, contents, stage1_model, members)
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        return result
+    except PoolSaturatedError:
+        raise
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/predict/batch")
+async def predict_batch(
+    files: List[UploadFile] = File(...),
+    model_name: Optional[str] = Form(None)
+):
+    """
+    Analyze many images in one request: several image files, or a single zip/tar archive.
+    Results are streamed as NDJSON, one line per image, in upload/archive order.
+    """
+    # Resolve the model up front so a bad model name fails before streaming starts
+    try:
+        target_model, error_msg = await execution.run("inference", model_manager.resolve_model, model_name)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not target_model:
+        raise HTTPException(status_code=500, detail=error_msg)
+
+    max_image_bytes = settings.BULK_PREDICT_MAX_IMAGE_MB * 1024 * 1024
+
+    def iter_items():
+        if len(files) == 1 and is_archive(files[0].filename, files[0].file):
+            yield from iter_archive_images(files[0].file, max_image_bytes)
+            return
+        for upload in files:
+            data = upload.file.read(max_image_bytes + 1)
+            if len(data) > max_image_bytes:
+                yield upload.filename, ValueError("Image too large")
+            else:
+                yield upload.filename, data
+
+    # Reserve a bulk slot now so a saturated server answers 429 instead of an empty stream
+    bulk_pool = execution["bulk"]
+    slot = bulk_pool.reserve()
+    return SlotStreamingResponse(
+        bulk_pool.stream(stream_batch_predictions(iter_items(), target_model), slot=slot),
+        slot=slot,
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/batching/stats")
+async def batching_stats():
+    """Queue depth, batch-size histogram and added wait time per model."""
+    return model_manager.batching_stats()
+
+@router.get("/cascade/stats")
+async def cascade_stats():
+    """Images decided by each cascade stage, per-stage latency and throughput gain over the heavy stage alone."""
+    return model_manager.cascade_stats()
+
+@router.get("/cache/stats")
+async def prediction_cache_stats():
+    """Hits, misses, shared (single-flight) lookups and size of the /predict result cache."""
+    return model_manager.prediction_cache_stats()
+
+@router.get("/execution/stats")
+async def execution_stats():
+    """Workers, in-flight calls and rejections for each execution pool."""
+    return execution.stats()
+
 @router.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until every preloaded model has finished its warm-up inference."""
+    state = model_manager.readiness()
+    if not state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "not ready", **state})
+    return {"status": "ready", **state}
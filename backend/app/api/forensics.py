@@ -8,17 +8,21 @@ Version: 1.0.0
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from typing import Optional
+import asyncio
+import base64
 import logging
 from pathlib import Path
 
+from backend.app.core.execution import execution, PoolSaturatedError
 from backend.app.services.forensics import (
     MetadataExtractor,
     StringExtractor,
     VisualAnalyzer,
     LSBAnalyzer
 )
+from backend.app.services.forensics.lsb_engine import TRAVERSAL_ORDERS
 from backend.app.services.forensics.superimposed_analyzer import analyze_superimposed
 import tempfile
 import os
@@ -39,6 +43,22 @@ visual_analyzer = VisualAnalyzer()
 lsb_analyzer = LSBAnalyzer(temp_dir='./temp_extracted')
 
 
+def _validate_lsb_params(channels: str, bit_order: str, order: str):
+    """Reject LSB stream parameters the analyzer does not support (400)."""
+    if bit_order not in ('LSB', 'MSB'):
+        raise HTTPException(status_code=400, detail="bit_order must be LSB or MSB")
+    
+    if order not in TRAVERSAL_ORDERS:
+        raise HTTPException(status_code=400, detail=f"order must be one of: {', '.join(TRAVERSAL_ORDERS)}")
+    
+    valid_channels = {'R', 'G', 'B', 'A', 'RGB', 'RGBA', 'RG', 'RB', 'GB'}
+    if channels.upper() not in valid_channels:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid channels. Must be one of: {', '.join(valid_channels)}"
+        )
+
+
 @router.post("/metadata")
 async def extract_metadata(file: UploadFile = File(...)):
     """
@@ -60,7 +80,7 @@ async def extract_metadata(file: UploadFile = File(...)):
         if len(contents) > 50 * 1024 * 1024:  # 50MB limit
             raise HTTPException(status_code=400, detail="File too large (max 50MB)")
         
-        result = metadata_extractor.extract(contents)
+        result = await execution.run("forensics_light", metadata_extractor.extract, contents)
         
         return {
             "success": True,
@@ -68,6 +88,8 @@ async def extract_metadata(file: UploadFile = File(...)):
             "data": result
         }
         
+    except PoolSaturatedError:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -101,7 +123,7 @@ async def extract_strings(
             raise HTTPException(status_code=400, detail="Empty file")
         
         extractor = StringExtractor(min_length=min_length)
-        result = extractor.extract(contents, max_strings=max_strings)
+        result = await execution.run("forensics_heavy", extractor.extract, contents, max_strings=max_strings)
         
         return {
             "success": True,
@@ -109,6 +131,8 @@ async def extract_strings(
             "data": result
         }
         
+    except PoolSaturatedError:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -151,7 +175,9 @@ async def visual_analysis(
                 detail="Image too large for visual analysis (max 20MB)"
             )
         
-        result = visual_analyzer.analyze(
+        result = await execution.run(
+            "forensics_heavy",
+            visual_analyzer.analyze,
             contents,
             include_bit_planes=include_bit_planes,
             include_operations=include_operations,
@@ -164,6 +190,8 @@ async def visual_analysis(
             "data": result
         }
         
+    except PoolSaturatedError:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -177,7 +205,9 @@ async def extract_lsb(
     channels: str = Query('RGB', description="Channels to use (RGB, R, G, B, RG, etc.)"),
     bit_order: str = Query('LSB', description="Bit order (LSB or MSB)"),
     bits_per_channel: int = Query(1, ge=1, le=8, description="Bits per channel (1-8)"),
-    max_bytes: int = Query(1024*1024, ge=1024, le=10*1024*1024, description="Max bytes to extract")
+    max_bytes: int = Query(1024*1024, ge=1024, le=10*1024*1024, description="Max bytes to extract"),
+    order: str = Query('row', description="Pixel traversal: row, column, row_reversed or column_reversed"),
+    staged: bool = Query(False, description="Probe a short prefix first and extract only what it justifies")
 ):
     """
     Extract hidden data from Least Significant Bits.
@@ -187,6 +217,10 @@ async def extract_lsb(
     - bit_order: LSB (least significant) or MSB (most significant)
     - bits_per_channel: Number of bits to extract per channel (1-8)
     - max_bytes: Maximum bytes to extract (default: 1MB)
+    - order: Pixel traversal order (default: row = left to right, top to bottom)
+    - staged: Header-first mode. A container or length prefix is extracted at its declared
+      size (prefix included), a file signature or text up to max_bytes, anything else stops
+      at the probe
     
     **Returns:**
     - data_info: Size, hash, and preview of extracted data
@@ -202,23 +236,18 @@ async def extract_lsb(
         if len(contents) == 0:
             raise HTTPException(status_code=400, detail="Empty file")
         
-        # Validate parameters
-        if bit_order not in ('LSB', 'MSB'):
-            raise HTTPException(status_code=400, detail="bit_order must be LSB or MSB")
-        
-        valid_channels = {'R', 'G', 'B', 'A', 'RGB', 'RGBA', 'RG', 'RB', 'GB'}
-        if channels.upper() not in valid_channels:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid channels. Must be one of: {', '.join(valid_channels)}"
-            )
+        _validate_lsb_params(channels, bit_order, order)
         
-        result = lsb_analyzer.extract(
+        result = await execution.run(
+            "forensics_heavy",
+            lsb_analyzer.extract,
             contents,
             channels=channels.upper(),
             bit_order=bit_order,
             bits_per_channel=bits_per_channel,
-            max_bytes=max_bytes
+            max_bytes=max_bytes,
+            order=order,
+            staged=staged
         )
         
         return {
@@ -227,6 +256,10 @@ async def extract_lsb(
             "data": result
         }
         
+    except PoolSaturatedError:
+        raise
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -234,6 +267,172 @@ async def extract_lsb(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/lsb/range")
+async def read_lsb_range(
+    file: UploadFile = File(...),
+    offset: int = Query(0, ge=0, description="First byte of the LSB stream to return"),
+    length: int = Query(64*1024, ge=1, le=10*1024*1024, description="Bytes to return"),
+    channels: str = Query('RGB', description="Channels to use (RGB, R, G, B, RG, etc.)"),
+    bit_order: str = Query('LSB', description="Bit order (LSB or MSB)"),
+    bits_per_channel: int = Query(1, ge=1, le=8, description="Bits per channel (1-8)"),
+    order: str = Query('row', description="Pixel traversal: row, column, row_reversed or column_reversed"),
+    raw: bool = Query(False, description="Return the bytes as application/octet-stream")
+):
+    """
+    Read one page of an LSB stream: bytes [offset, offset + length).
+
+    Only the pixels holding the range are read, so a page deep into a multi-megabyte
+    stream costs the same as the first one. The decoded image is cached per worker, so
+    paging through the same upload decodes it once.
+
+    **Parameters:**
+    - offset: First byte to return (default: 0)
+    - length: Bytes to return (default: 64KB)
+    - channels, bit_order, bits_per_channel, order: As for /lsb/extract
+    - raw: Return the bytes themselves, with the position in X-Stream-* headers
+
+    **Returns:**
+    - data_base64: The bytes
+    - preview_hex: First 32 bytes in hex
+    - offset, length, stream_bytes, has_more, next_offset: Position in the stream
+    """
+    try:
+        contents = await file.read()
+
+        if len(contents) == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+
+        _validate_lsb_params(channels, bit_order, order)
+
+        result = await execution.run(
+            "forensics_heavy",
+            lsb_analyzer.read_range,
+            contents,
+            offset=offset,
+            length=length,
+            channels=channels.upper(),
+            bit_order=bit_order,
+            bits_per_channel=bits_per_channel,
+            order=order
+        )
+        data = result.pop('data')
+
+        if raw:
+            headers = {
+                "X-Stream-Offset": str(result['offset']),
+                "X-Stream-Length": str(result['length']),
+                "X-Stream-Bytes": str(result['stream_bytes'])
+            }
+            if result['next_offset'] is not None:
+                headers["X-Next-Offset"] = str(result['next_offset'])
+            return Response(content=data, media_type='application/octet-stream', headers=headers)
+
+        result['preview_hex'] = ' '.join(f'{b:02x}' for b in data[:32])
+        result['data_base64'] = base64.b64encode(data).decode('ascii')
+
+        return {
+            "success": True,
+            "filename": file.filename,
+            "data": result
+        }
+
+    except PoolSaturatedError:
+        raise
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"LSB range read failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/lsb/sweep")
+async def sweep_lsb(
+    file: UploadFile = File(...),
+    header_bytes: int = Query(64, ge=8, le=1024, description="Bytes of each candidate stream to score"),
+    top_n: int = Query(3, ge=1, le=8, description="Best candidates to extract and analyze in full"),
+    max_bytes: int = Query(256*1024, ge=1024, le=10*1024*1024, description="Max bytes per full extraction"),
+    orders: str = Query(','.join(TRAVERSAL_ORDERS), description="Traversal orders to try (comma-separated)")
+):
+    """
+    Try every LSB extraction setting at once (like zsteg) and analyze the most promising.
+
+    The image is decoded once; the first header_bytes of every combination of channels,
+    bits per channel (1-8), bit order and traversal order are scored on file signatures,
+    printable text and entropy. Only the top_n are extracted and analyzed in full, one
+    forensics job each so they run in parallel; only their analysis comes back.
+
+    **Parameters:**
+    - header_bytes: Bytes of each candidate stream to score (default: 64)
+    - top_n: Candidates to extract and analyze in full (default: 3)
+    - max_bytes: Maximum bytes per full extraction (default: 256KB)
+    - orders: Traversal orders to try (default: all)
+
+    **Returns:**
+    - ranking: Best-scored candidates with their parameters (replayable via /lsb/extract)
+    - results: /lsb/extract-style analysis of the top_n candidates, with their score
+    """
+    try:
+        contents = await file.read()
+
+        if len(contents) == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+
+        order_list = [o.strip() for o in orders.split(',') if o.strip()]
+        if not order_list or any(o not in TRAVERSAL_ORDERS for o in order_list):
+            raise HTTPException(status_code=400, detail=f"orders must be among: {', '.join(TRAVERSAL_ORDERS)}")
+
+        # Reserve the sweep's slot and one per candidate up front, so a busy pool answers 429
+        # before any work rather than after the sweep (a pool smaller than that caps top_n)
+        heavy = execution["forensics_heavy"]
+        top_n = min(top_n, heavy.capacity - 1)
+        slots = heavy.reserve_many(1 + top_n)
+        try:
+            sweep = await heavy.run_reserved(
+                slots.pop(),
+                lsb_analyzer.sweep,
+                contents,
+                header_bytes=header_bytes,
+                orders=tuple(order_list)
+            )
+
+            candidates = sweep['ranking'][:top_n]
+            results = await asyncio.gather(*(
+                heavy.run_reserved(
+                    slots.pop(),
+                    lsb_analyzer.extract,
+                    contents,
+                    max_bytes=max_bytes,
+                    **{key: candidate[key] for key in ('channels', 'bit_order', 'bits_per_channel', 'order')}
+                )
+                for candidate in candidates
+            ))
+        finally:
+            # Slots of jobs that were started are released when the job ends
+            for slot in slots:
+                slot.release()
+
+        for result, candidate in zip(results, candidates):
+            result['score'] = candidate['score']
+
+        return {
+            "success": True,
+            "filename": file.filename,
+            "data": {**sweep, "results": results}
+        }
+
+    except PoolSaturatedError:
+        raise
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"LSB sweep failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/download/{file_id}")
 async def download_extracted_file(file_id: str):
     """
@@ -341,7 +540,7 @@ async def superimposed_analysis(
                 'blend_mode': blend_mode
             }
             
-            result = analyze_superimposed(tmp_path, config)
+            result = await execution.run("forensics_heavy", analyze_superimposed, tmp_path, config)
             
             return {
                 "success": True,
@@ -354,6 +553,8 @@ async def superimposed_analysis(
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
         
+    except PoolSaturatedError:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -373,7 +574,7 @@ async def analyze_all(
     - Metadata extraction
     - String extraction
     - Visual analysis
-    - LSB extraction (with default settings)
+    - LSB extraction (default settings, staged)
     
     **Parameters:**
     - quick_mode: Skip time-intensive operations (bit planes, operations)
@@ -390,23 +591,28 @@ async def analyze_all(
         if len(contents) > 20 * 1024 * 1024:
             raise HTTPException(status_code=400, detail="File too large for full analysis (max 20MB)")
         
-        # Run all analyses
-        metadata = metadata_extractor.extract(contents)
-        strings = string_extractor.extract(contents, max_strings=500)
-        
-        visual = visual_analyzer.analyze(
-            contents,
-            include_bit_planes=not quick_mode,
-            include_operations=not quick_mode,
-            include_histograms=True
-        )
-        
-        lsb = lsb_analyzer.extract(
-            contents,
-            channels='RGB',
-            bit_order='LSB',
-            bits_per_channel=1,
-            max_bytes=512 * 1024  # 512KB for quick analysis
+        # Run all analyses concurrently on their execution pools
+        metadata, strings, visual, lsb = await asyncio.gather(
+            execution.run("forensics_light", metadata_extractor.extract, contents),
+            execution.run("forensics_heavy", string_extractor.extract, contents, max_strings=500),
+            execution.run(
+                "forensics_heavy",
+                visual_analyzer.analyze,
+                contents,
+                include_bit_planes=not quick_mode,
+                include_operations=not quick_mode,
+                include_histograms=True
+            ),
+            execution.run(
+                "forensics_heavy",
+                lsb_analyzer.extract,
+                contents,
+                channels='RGB',
+                bit_order='LSB',
+                bits_per_channel=1,
+                max_bytes=512 * 1024,  # 512KB for quick analysis
+                staged=True  # Most images stop at the probe
+            )
         )
         
         # Generate summary
@@ -434,6 +640,8 @@ async def analyze_all(
             "lsb": lsb
         }
         
+    except PoolSaturatedError:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -0,0 +1,133 @@
+import time
+from typing import List
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from ..core.config import settings
+from ..core.execution import execution
+from ..core.metrics import RequestTimings, render_family, render_histograms, request_seconds, request_timings, timed
+from ..services.model_cache import read_rss_bytes
+from ..services.model_service import model_manager
+
+router = APIRouter()
+
+
+def _wants_timings(scope) -> bool:
+    for name, value in scope.get("headers", ()):
+        if name == b"x-timings":
+            return value.decode("latin-1").lower() in ("1", "true")
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get("timings", [""])[-1].lower() in ("1", "true")
+
+
+def _route_template(scope) -> str:
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    # A route of a router included with a prefix only knows its own path; the prefix is
+    # whatever precedes the segments the template matched
+    parts = scope.get("path", "").split("/")
+    return "/".join(parts[:len(parts) - template.count("/")]) + template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording every HTTP request in request_seconds (labelled with the route
+    template, so /api/forensics/download/{file_id} is one series).
+
+    Requests with ?timings=1 or an "X-Timings: 1" header also collect their stage timings:
+    JSON object responses get a "timings" field (see TimingJSONResponse) and every response
+    gets a Server-Timing header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = RequestTimings() if _wants_timings(scope) else None
+        token = request_timings.set(timings)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if timings is not None:
+                    header = ", ".join(
+                        f"{stage.removesuffix('_ms')};dur={value}" for stage, value in timings.summary().items()
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timings.reset(token)
+            request_seconds.observe(
+                time.perf_counter() - started, scope.get("method", ""), _route_template(scope), str(status["code"])
+            )
+
+
+class TimingJSONResponse(JSONResponse):
+    """JSONResponse that times its own serialization and adds the request's stage timings when asked for."""
+
+    def render(self, content) -> bytes:
+        timings = request_timings.get()
+        if timings is not None and isinstance(content, dict):
+            content = {**content, "timings": timings.summary()}
+        with timed("json_serialize"):
+            return super().render(content)
+
+
+def _runtime_gauges() -> List[str]:
+    """Point-in-time state read at scrape time: pools, batchers, resident models, caches, memory."""
+    pools = execution.stats()
+    batching = model_manager.batching_stats()["models"]
+    resident = model_manager.resident_models()
+    cache = model_manager.prediction_cache_stats()
+
+    lines = []
+    lines += render_family("steganalysis_pool_in_flight", "gauge", "Calls admitted to an execution pool (running or queued)",
+                           (({"pool": name}, p["in_flight"]) for name, p in pools.items()))
+    lines += render_family("steganalysis_pool_capacity", "gauge", "Workers plus queue slots of an execution pool",
+                           (({"pool": name}, p["capacity"]) for name, p in pools.items()))
+    lines += render_family("steganalysis_pool_rejected_total", "counter", "Calls rejected with 429 because the pool was saturated",
+                           (({"pool": name}, p["rejected"]) for name, p in pools.items()))
+    lines += render_family("steganalysis_batch_queue_depth", "gauge", "Images waiting in a model's micro-batching queue",
+                           (({"model": name}, b["queue_depth"]) for name, b in batching.items()))
+    lines += render_family("steganalysis_batch_requests_total", "counter", "Images served through a model's micro-batcher",
+                           (({"model": name}, b["requests"]) for name, b in batching.items()))
+    lines += render_family("steganalysis_models_loaded", "gauge", "Models resident in memory",
+                           [({}, len(resident["models"]))])
+    lines += render_family("steganalysis_model_footprint_bytes", "gauge", "Measured memory footprint of a resident model",
+                           (({"model": m["name"]}, m["footprint_bytes"]) for m in resident["models"]))
+    lines += render_family("steganalysis_model_cache_evictions_total", "counter", "Models evicted to respect the memory budget",
+                           [({}, resident["evictions"])])
+    if cache["enabled"]:
+        lines += render_family("steganalysis_prediction_cache_lookups_total", "counter", "Prediction cache lookups by outcome",
+                               (({"result": key}, cache[key]) for key in ("hits", "disk_hits", "shared", "misses")))
+        lines += render_family("steganalysis_prediction_cache_hit_ratio", "gauge", "Share of prediction cache lookups served without inference",
+                               [({}, cache["hit_ratio"])])
+        lines += render_family("steganalysis_prediction_cache_entries", "gauge", "Results held in the in-memory prediction cache",
+                               [({}, cache["entries"])])
+
+    rss = [({"process": "server", "pid": "self"}, read_rss_bytes())]
+    for name, pool in execution.pools.items():
+        rss += [({"process": name, "pid": str(pid)}, read_rss_bytes(pid)) for pid in pool.worker_pids()]
+    lines += render_family("steganalysis_resident_memory_bytes", "gauge", "Resident set size of the server and of each pool worker process", rss)
+    return lines
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition: stage and request latency histograms plus runtime gauges."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body = "\n".join(render_histograms() + _runtime_gauges()) + "\n"
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
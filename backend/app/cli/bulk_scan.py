@@ -0,0 +1,321 @@
+"""
+Offline bulk scan: score every image under a directory tree (or inside a zip/tar archive)
+without going through HTTP.
+
+Images are decoded and resized in a process pool (NumPy/Pillow only, no TensorFlow in the
+workers), then scored in batches by ModelManager in this process. Optional cheap forensics
+per image: EXIF/metadata summary (--metadata) and LSB entropy/pattern statistics (--lsb).
+Rows go to a CSV file or a directory of Parquet parts (needs pyarrow).
+
+The scan order is deterministic (sorted walk / archive order). Every --checkpoint-every
+images the output is flushed and a checkpoint records how many images are done, so an
+interrupted scan started again with the same arguments continues where it stopped
+(--restart throws the previous output and checkpoint away).
+
+Usage:
+    python -m backend.app.cli.bulk_scan /mnt/evidence --model model_MobileNetV2_HPF_Enabled.keras \\
+        --out scan.csv [--format csv|parquet] [--workers 8] [--batch-size 32] [--metadata] [--lsb]
+        [--fast-decode] [--models-dir models/] [--checkpoint scan.csv.checkpoint.json] [--restart]
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .scan_worker import scan_image
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif"}
+
+BASE_COLUMNS = {
+    "path": "str", "model": "str", "prediction": "str", "confidence": "float", "raw_score": "float",
+    "error": "str", "width": "int", "height": "int", "format": "str", "file_bytes": "int"
+}
+METADATA_COLUMNS = {
+    "meta_exif": "bool", "meta_camera": "str", "meta_software": "str", "meta_gps": "bool",
+    "meta_comment": "bool", "meta_suspicious": "int", "meta_hash": "str"
+}
+LSB_COLUMNS = {
+    **{f"lsb_entropy_{c}": "float" for c in ("red", "green", "blue")},
+    **{f"lsb_pattern_{c}": "float" for c in ("red", "green", "blue")},
+    "lsb_flagged": "str"
+}
+
+# (display name, file path or None, bytes / Exception / None)
+Source = Tuple[str, Optional[str], object]
+
+
+def iter_sources(root: Path, max_bytes: int) -> Iterator[Source]:
+    """Images under a directory in sorted order (read by the workers), or the members of an archive in archive order."""
+    if root.is_dir():
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if Path(filename).suffix.lower() in IMAGE_EXTENSIONS:
+                    path = os.path.join(dirpath, filename)
+                    yield os.path.relpath(path, root), path, None
+        return
+
+    from ..services.batch_prediction import iter_archive_images
+    with open(root, "rb") as f:
+        for name, data in iter_archive_images(f, max_bytes):
+            yield name, None, data
+
+
+class CSVOutput:
+    """Rows appended to one CSV file; resuming truncates anything written after the last checkpoint."""
+
+    def __init__(self, path: Path, columns: List[str], state: Optional[Dict]):
+        self.path = path
+        self.columns = columns
+        if state:
+            with open(path, "r+b") as f:
+                f.truncate(state["offset"])
+            self._file = open(path, "a", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore")
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore")
+            self._writer.writeheader()
+
+    def write(self, rows: List[Dict]):
+        self._writer.writerows(rows)
+
+    def commit(self) -> Dict:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {"offset": self._file.tell()}
+
+    def close(self):
+        self._file.close()
+
+    @staticmethod
+    def remove(path: Path):
+        path.unlink(missing_ok=True)
+
+
+class ParquetOutput:
+    """A directory of part-NNNNN.parquet files, one per checkpoint; resuming drops uncommitted parts."""
+
+    def __init__(self, path: Path, columns: Dict[str, str], state: Optional[Dict]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from e
+        types = {"str": pa.string(), "float": pa.float64(), "int": pa.int64(), "bool": pa.bool_()}
+        self._pa, self._pq = pa, pq
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns.items()])
+        self.path = path
+        self.parts = state["parts"] if state else 0
+        self._rows: List[Dict] = []
+        path.mkdir(parents=True, exist_ok=True)
+        for stale in path.glob("part-*.parquet"):
+            if int(stale.stem.split("-")[1]) >= self.parts:
+                stale.unlink()
+
+    def write(self, rows: List[Dict]):
+        self._rows.extend(rows)
+
+    def commit(self) -> Dict:
+        if self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self.schema)
+            self._pq.write_table(table, self.path / f"part-{self.parts:05d}.parquet")
+            self.parts += 1
+            self._rows = []
+        return {"parts": self.parts}
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def remove(path: Path):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _write_checkpoint(path: Path, state: Dict):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, path)
+
+
+def _format_elapsed(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+class BulkScan:
+    def __init__(self, args):
+        self.args = args
+        self.root = Path(args.root).resolve()
+        self.out = Path(args.out)
+        self.format = args.format or ("parquet" if self.out.suffix in (".parquet", "") else "csv")
+        self.checkpoint_path = Path(args.checkpoint or f"{self.out}.checkpoint.json")
+        self.columns = dict(BASE_COLUMNS)
+        if args.metadata:
+            self.columns.update(METADATA_COLUMNS)
+        if args.lsb:
+            self.columns.update(LSB_COLUMNS)
+        self.identity = {
+            "root": str(self.root),
+            "model": args.model,
+            "out": str(self.out.resolve()),
+            "format": self.format,
+            "options": {"metadata": args.metadata, "lsb": args.lsb, "fast_decode": args.fast_decode}
+        }
+        self.state = {**self.identity, "processed": 0, "errors": 0, "last_path": None, "elapsed_s": 0.0, "output": None}
+
+    def _load_checkpoint(self) -> bool:
+        output_cls = ParquetOutput if self.format == "parquet" else CSVOutput
+        if self.args.restart:
+            self.checkpoint_path.unlink(missing_ok=True)
+            output_cls.remove(self.out)
+            return False
+        if not self.checkpoint_path.exists():
+            if self.out.exists():
+                raise SystemExit(f"{self.out} exists without a checkpoint; use --restart to overwrite it")
+            return False
+        saved = json.loads(self.checkpoint_path.read_text())
+        mismatched = [key for key in self.identity if saved.get(key) != self.identity[key]]
+        if mismatched:
+            raise SystemExit(f"Checkpoint {self.checkpoint_path} was written with different {', '.join(mismatched)}; use --restart")
+        self.state = saved
+        return True
+
+    def run(self) -> Dict:
+        from ..services.model_service import model_manager
+
+        if self.args.models_dir:
+            settings.MODELS_DIR = Path(self.args.models_dir).resolve()
+        resumed = self._load_checkpoint()
+        if self.state.get("completed"):
+            print(f"[INFO] Scan already completed ({self.state['processed']} images), nothing to do")
+            return self.state
+        target_model, error_msg = model_manager.resolve_model(self.args.model)
+        if not target_model:
+            raise SystemExit(error_msg)
+
+        output_cls = ParquetOutput if self.format == "parquet" else CSVOutput
+        output = output_cls(self.out, self.columns if self.format == "parquet" else list(self.columns), self.state["output"] if resumed else None)
+        skip = self.state["processed"]
+        if resumed:
+            print(f"[INFO] Resuming after {skip} images (last: {self.state['last_path']})")
+
+        max_bytes = self.args.max_image_mb * 1024 * 1024
+        batch_size = max(1, self.args.batch_size)
+        workers = max(1, self.args.workers)
+        input_shape = tuple(settings.MODEL_INPUT_SHAPE[:2])
+        started = time.perf_counter()
+        elapsed_before = self.state["elapsed_s"]
+        session = {"images": 0, "last_report": started, "since_checkpoint": 0}
+        pending: deque = deque()
+
+        def checkpoint(completed: bool = False):
+            self.state["output"] = output.commit()
+            self.state["elapsed_s"] = round(elapsed_before + time.perf_counter() - started, 3)
+            self.state["completed"] = completed
+            _write_checkpoint(self.checkpoint_path, self.state)
+            session["since_checkpoint"] = 0
+
+        def report(final: bool = False):
+            now = time.perf_counter()
+            if not final and now - session["last_report"] < self.args.progress_every:
+                return
+            session["last_report"] = now
+            rate = session["images"] / max(now - started, 1e-9)
+            print(
+                f"[INFO] {self.state['processed']} images ({session['images']} this run) | {rate:.1f} img/s | "
+                f"{self.state['errors']} errors | elapsed {_format_elapsed(elapsed_before + now - started)}",
+                flush=True
+            )
+
+        def flush(count: int):
+            rows, tensors, scored = [], [], []
+            for _ in range(min(count, len(pending))):
+                row, tensor = pending.popleft().result()
+                row["model"] = target_model
+                rows.append(row)
+                if tensor is not None:
+                    tensors.append(tensor)
+                    scored.append(row)
+            if tensors:
+                for row, result in zip(scored, model_manager.predict_batch(np.concatenate(tensors, axis=0), target_model)):
+                    row.update({key: result.get(key) for key in ("prediction", "confidence", "raw_score", "error")})
+            output.write(rows)
+            self.state["processed"] += len(rows)
+            self.state["errors"] += sum(1 for row in rows if row.get("error"))
+            self.state["last_path"] = rows[-1]["path"] if rows else self.state["last_path"]
+            session["images"] += len(rows)
+            session["since_checkpoint"] += len(rows)
+            if session["since_checkpoint"] >= self.args.checkpoint_every:
+                checkpoint()
+            report()
+
+        if not resumed:
+            # From here on the output always has a checkpoint to resume from
+            checkpoint()
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for index, (name, path, data) in enumerate(iter_sources(self.root, max_bytes)):
+                if index < skip:
+                    if index == skip - 1 and name != self.state["last_path"]:
+                        raise SystemExit(
+                            f"Scan order changed since the checkpoint (image {skip} is now {name}, "
+                            f"was {self.state['last_path']}); use --restart"
+                        )
+                    continue
+                pending.append(pool.submit(
+                    scan_image, name, path, data, input_shape, max_bytes,
+                    self.args.fast_decode, self.args.metadata, self.args.lsb
+                ))
+                # Keep every worker busy while a batch is being scored, without unbounded buffering
+                if len(pending) >= max(2 * batch_size, 4 * workers):
+                    flush(batch_size)
+            while pending:
+                flush(batch_size)
+
+        checkpoint(completed=True)
+        output.close()
+        report(final=True)
+        return self.state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="Directory tree or zip/tar archive to scan")
+    parser.add_argument("--model", default=settings.DEFAULT_MODEL or None, help="Model file name in the models directory")
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--out", required=True, help="CSV file, or directory for Parquet parts")
+    parser.add_argument("--format", choices=("csv", "parquet"), default=None, help="Default: from --out suffix")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=settings.BULK_PREDICT_BATCH_SIZE)
+    parser.add_argument("--metadata", action="store_true", help="Add EXIF/metadata summary columns")
+    parser.add_argument("--lsb", action="store_true", help="Add LSB entropy/pattern columns (needs full decode)")
+    parser.add_argument("--fast-decode", action="store_true", help="Reduced-resolution decode (approximate scores)")
+    parser.add_argument("--max-image-mb", type=int, default=settings.BULK_PREDICT_MAX_IMAGE_MB)
+    parser.add_argument("--checkpoint", default=None, help="Default: <out>.checkpoint.json")
+    parser.add_argument("--checkpoint-every", type=int, default=5000, help="Images between checkpoints")
+    parser.add_argument("--progress-every", type=float, default=10.0, help="Seconds between progress lines")
+    parser.add_argument("--restart", action="store_true", help="Discard previous output and checkpoint")
+    args = parser.parse_args()
+
+    state = BulkScan(args).run()
+    print(json.dumps({k: state[k] for k in ("processed", "errors", "elapsed_s", "output")}, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
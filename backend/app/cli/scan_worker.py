@@ -0,0 +1,91 @@
+import io
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ..core.config import settings
+from ..services.cascade import lsb_screen
+from ..services.forensics.metadata_extractor import MetadataExtractor
+from ..services.image_processing import decode_reduced, decode_rgb, resize_bilinear
+
+# Runs in bulk-scan worker processes: only NumPy / Pillow code paths, never TensorFlow
+
+_metadata_extractor = None
+
+
+def _metadata_columns(data: bytes) -> Dict:
+    global _metadata_extractor
+    if _metadata_extractor is None:
+        _metadata_extractor = MetadataExtractor()
+    meta = _metadata_extractor.extract(data)
+    camera = meta["exif"].get("camera", {}) if meta["exif"].get("available") else {}
+    return {
+        "meta_exif": bool(meta["exif"].get("available")),
+        "meta_camera": " ".join(v for v in (camera.get("make"), camera.get("model")) if v) or None,
+        "meta_software": camera.get("software") or None,
+        "meta_gps": bool(meta["gps"].get("available")),
+        "meta_comment": bool(meta["comments"].get("available")),
+        "meta_suspicious": len(meta["suspicious_findings"]),
+        "meta_hash": meta["metadata_hash"]
+    }
+
+
+def _lsb_columns(image: np.ndarray) -> Dict:
+    screen = lsb_screen(image, settings.CASCADE_LSB_PATTERN_THRESHOLD)
+    columns = {}
+    for channel, values in screen["channels"].items():
+        columns[f"lsb_entropy_{channel}"] = values["lsb_entropy"]
+        columns[f"lsb_pattern_{channel}"] = values["lsb_pattern"]
+    columns["lsb_flagged"] = ",".join(screen["flagged"]) or None
+    return columns
+
+
+def scan_image(
+    name: str,
+    path: Optional[str],
+    data,
+    input_shape: Tuple[int, int],
+    max_bytes: int,
+    fast_decode: bool = False,
+    metadata: bool = False,
+    lsb: bool = False
+) -> Tuple[Dict, Optional[np.ndarray]]:
+    """
+    Decode and preprocess one image for the bulk scan: read it (from `path`, or the archive
+    bytes in `data`), build the (1, H, W, 3) model input and the optional forensics columns.
+    Returns (row, tensor); tensor is None and row["error"] is set when the image is unusable.
+
+    LSB statistics need the exact full-resolution pixels, so --lsb always decodes fully and
+    the tensor then comes from that decode even with fast_decode.
+    """
+    row: Dict = {"path": name}
+    try:
+        if isinstance(data, Exception):
+            raise data
+        if data is None:
+            size = Path(path).stat().st_size
+            if size > max_bytes:
+                raise ValueError("Image too large")
+            data = Path(path).read_bytes()
+        row["file_bytes"] = len(data)
+
+        with Image.open(io.BytesIO(data)) as img:
+            row["width"], row["height"], row["format"] = img.width, img.height, img.format
+
+        height, width = input_shape
+        if fast_decode and not lsb:
+            image = decode_reduced(data, height, width, settings.PREPROCESS_FAST_DECODE_OVERSAMPLE)
+        else:
+            image = decode_rgb(data)
+        tensor = resize_bilinear(image, height, width)[np.newaxis]
+
+        if lsb:
+            row.update(_lsb_columns(image))
+        if metadata:
+            row.update(_metadata_columns(data))
+        return row, tensor
+    except Exception as e:
+        row["error"] = f"Preprocessing failed: {str(e)}"
+        return row, None
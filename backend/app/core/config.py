@@ -9,11 +9,141 @@ class Settings:
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     MODELS_DIR: Path = BASE_DIR.parent / "models"
     UPLOAD_DIR: Path = BASE_DIR / "uploads"
+    # Per model-file-hash record of the load strategy that worked (+ inference weights for rebuilt graphs)
+    ARTIFACT_CACHE_DIR: Path = Path(os.getenv("ARTIFACT_CACHE_DIR", str(BASE_DIR / "artifact_cache")))
+    ARTIFACT_CACHE_ENABLED: bool = os.getenv("ARTIFACT_CACHE_ENABLED", "1") == "1"
     
     # Model Config
     MODEL_INPUT_SHAPE: tuple = (224, 224)
     ALLOWED_EXTENSIONS: set = {"png", "jpg", "jpeg"}
-    
+
+    # Image decode + resize: "tf" (tf.io.decode_image + tf.image.resize, as in training) or "numpy"
+    # (Pillow + a NumPy port of TF's half-pixel bilinear resize; no TensorFlow import, usable in worker processes)
+    PREPROCESS_BACKEND: str = os.getenv("PREPROCESS_BACKEND", "tf")
+    # Fast reduced-resolution decode (JPEG DCT scaling / integer box reduce down to OVERSAMPLE x the model
+    # input, then the usual resize). Approximate: only for bulk triage (/predict/batch with BULK_FAST_DECODE=1).
+    PREPROCESS_FAST_DECODE_OVERSAMPLE: int = int(os.getenv("PREPROCESS_FAST_DECODE_OVERSAMPLE", "2"))
+
+    # Model cache: resident models are evicted LRU-first once their measured size exceeds the budget.
+    # DEFAULT_MODEL is served when a request names no model and is pinned (never evicted).
+    MODEL_CACHE_BUDGET_MB: int = int(os.getenv("MODEL_CACHE_BUDGET_MB", "1024"))
+    DEFAULT_MODEL: str = os.getenv("DEFAULT_MODEL", "")
+
+    # Models loaded, pinned and warmed up at startup; /api/v1/ready reports 503 until they are done
+    PRELOAD_MODELS: list = [m.strip() for m in os.getenv("PRELOAD_MODELS", "").split(",") if m.strip()]
+
+    # Forward pass: "compiled" runs a fixed-signature tf.function, "predict" uses Keras model.predict().
+    # With XLA on, batches are padded to the nearest traced size so the set of compiled shapes stays small.
+    INFERENCE_MODE: str = os.getenv("INFERENCE_MODE", "compiled")
+    INFERENCE_JIT_COMPILE: bool = os.getenv("INFERENCE_JIT_COMPILE", "0") == "1"
+    INFERENCE_TRACE_BATCH_SIZES: list = [
+        int(b) for b in os.getenv("INFERENCE_TRACE_BATCH_SIZES", "").split(",") if b.strip()
+    ]
+
+    # Rewrite Keras models for inference at load time: fold BatchNorm into the preceding convolution,
+    # drop Dropout and fold To_Grayscale into the SRM kernel. Falls back to the original graph if the
+    # rewritten one differs by more than GRAPH_OPTIMIZER_ATOL on a random batch.
+    GRAPH_OPTIMIZER_ENABLED: bool = os.getenv("GRAPH_OPTIMIZER_ENABLED", "1") == "1"
+    GRAPH_OPTIMIZER_ATOL: float = float(os.getenv("GRAPH_OPTIMIZER_ATOL", "1e-4"))
+
+    # .tflite models (exported with `python -m backend.app.services.tflite_backend`) run on the TFLite interpreter
+    TFLITE_NUM_THREADS: int = int(os.getenv("TFLITE_NUM_THREADS", str(os.cpu_count() or 1)))
+
+    # .onnx models (exported with `python -m backend.app.services.onnx_backend`) run on ONNX Runtime's CPU provider.
+    # 0 threads lets ONNX Runtime decide; optimization level is one of disable/basic/extended/all.
+    ONNX_INTRA_OP_THREADS: int = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+    ONNX_INTER_OP_THREADS: int = int(os.getenv("ONNX_INTER_OP_THREADS", "0"))
+    ONNX_OPTIMIZATION_LEVEL: str = os.getenv("ONNX_OPTIMIZATION_LEVEL", "all")
+
+    # Micro-batching (concurrent /predict calls for the same model share one forward pass)
+    BATCHING_ENABLED: bool = os.getenv("BATCHING_ENABLED", "1") == "1"
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "16"))
+    BATCH_MAX_WAIT_MS: float = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+    # Ensemble /predict: "model[:weight]" members, cheapest first (empty = every available model, smallest file first).
+    # The first ENSEMBLE_EARLY_EXIT_MEMBERS run first; if they agree with at least ENSEMBLE_EARLY_EXIT_CONFIDENCE
+    # the rest are skipped (set the confidence above 1 to always run every member).
+    ENSEMBLE_MEMBERS: list = [m.strip() for m in os.getenv("ENSEMBLE_MEMBERS", "").split(",") if m.strip()]
+    ENSEMBLE_METHOD: str = os.getenv("ENSEMBLE_METHOD", "weighted")
+    ENSEMBLE_EARLY_EXIT_MEMBERS: int = int(os.getenv("ENSEMBLE_EARLY_EXIT_MEMBERS", "2"))
+    ENSEMBLE_EARLY_EXIT_CONFIDENCE: float = float(os.getenv("ENSEMBLE_EARLY_EXIT_CONFIDENCE", "0.95"))
+    # HPF members with identical SRM kernels run the grayscale -> SRM -> TLU front-end once per image
+    ENSEMBLE_SHARE_SRM: bool = os.getenv("ENSEMBLE_SHARE_SRM", "1") == "1"
+
+    # /predict/tiled: score native-resolution MODEL_INPUT_SHAPE patches instead of one downscaled image.
+    # At most TILED_MAX_TILES patches (evenly sampled over the grid, 0 = all) run TILED_BATCH_SIZE at a time;
+    # patch scores are combined with TILED_AGGREGATION (mean / max / topk).
+    TILED_STRIDE: int = int(os.getenv("TILED_STRIDE", "224"))
+    TILED_MAX_TILES: int = int(os.getenv("TILED_MAX_TILES", "256"))
+    TILED_BATCH_SIZE: int = int(os.getenv("TILED_BATCH_SIZE", "32"))
+    TILED_AGGREGATION: str = os.getenv("TILED_AGGREGATION", "mean")
+    TILED_TOPK_FRACTION: float = float(os.getenv("TILED_TOPK_FRACTION", "0.1"))
+
+    # /predict/cascade: a cheap stage 1 (LSB screen + CASCADE_STAGE1_MODEL, default the smallest model file)
+    # decides confident images; scores inside [CASCADE_BAND_LOW, CASCADE_BAND_HIGH], or "clean" images whose
+    # LSB plane looks structured, go to the CASCADE_STAGE2_MODELS (default: every other model).
+    CASCADE_STAGE1_MODEL: str = os.getenv("CASCADE_STAGE1_MODEL", "")
+    CASCADE_STAGE2_MODELS: list = [m for m in os.getenv("CASCADE_STAGE2_MODELS", "").split(",") if m.strip()]
+    CASCADE_BAND_LOW: float = float(os.getenv("CASCADE_BAND_LOW", "0.2"))
+    CASCADE_BAND_HIGH: float = float(os.getenv("CASCADE_BAND_HIGH", "0.8"))
+    # Per-channel VisualAnalyzer.lsb_plane_metrics pattern score above which stage 1 escalates a "clean" image
+    # (the default matches VisualAnalyzer.LSB_PATTERN_THRESHOLD)
+    CASCADE_LSB_PATTERN_THRESHOLD: float = float(os.getenv("CASCADE_LSB_PATTERN_THRESHOLD", "0.3"))
+
+    # /predict result cache keyed by image SHA-256 + model name + model file SHA-256 (LRU + TTL in memory,
+    # optionally persisted to a SQLite file so it survives restarts; empty path = memory only)
+    PREDICTION_CACHE_ENABLED: bool = os.getenv("PREDICTION_CACHE_ENABLED", "1") == "1"
+    PREDICTION_CACHE_MAX_ENTRIES: int = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+    PREDICTION_CACHE_TTL_S: float = float(os.getenv("PREDICTION_CACHE_TTL_S", "86400"))
+    PREDICTION_CACHE_DB: str = os.getenv("PREDICTION_CACHE_DB", "")
+
+    # Prometheus metrics at /metrics and per-stage timers (decode, preprocess, inference, forensics,
+    # encoding, JSON). A request gets its own stage timings in the response ("timings" field and
+    # Server-Timing header) with ?timings=1 or an "X-Timings: 1" header
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "1") == "1"
+
+    # Bulk /predict/batch endpoint
+    BULK_PREDICT_BATCH_SIZE: int = int(os.getenv("BULK_PREDICT_BATCH_SIZE", "32"))
+    BULK_PREDICT_WORKERS: int = int(os.getenv("BULK_PREDICT_WORKERS", str(min(8, os.cpu_count() or 1))))
+    BULK_PREDICT_MAX_IMAGE_MB: int = int(os.getenv("BULK_PREDICT_MAX_IMAGE_MB", "50"))
+    BULK_FAST_DECODE: bool = os.getenv("BULK_FAST_DECODE", "0") == "1"
+
+    # Decoded images kept by each LSBAnalyzer (per forensics worker process), keyed by SHA-256 of the upload,
+    # so paging through one image's LSB stream (/lsb/range) decodes it once. LRU within this budget; 0 = off
+    LSB_DECODE_CACHE_MB: int = int(os.getenv("LSB_DECODE_CACHE_MB", "128"))
+
+    # Execution pools per endpoint class: blocking work runs here, never on the event loop.
+    # "queue" is how many extra calls may wait for a worker before the API answers 429.
+    EXECUTION_POOLS: dict = {
+        "inference": {
+            "kind": "thread",
+            "workers": int(os.getenv("INFERENCE_WORKERS", "16")),
+            "queue": int(os.getenv("INFERENCE_QUEUE", "64")),
+        },
+        # Ensemble and cascade members run side by side here when micro-batching (own threads) is off
+        "ensemble": {
+            "kind": "thread",
+            "workers": int(os.getenv("ENSEMBLE_WORKERS", "4")),
+            "queue": int(os.getenv("ENSEMBLE_QUEUE", "16")),
+        },
+        "bulk": {
+            "kind": "thread",
+            "workers": int(os.getenv("BULK_WORKERS", "2")),
+            "queue": int(os.getenv("BULK_QUEUE", "0")),
+        },
+        "forensics_light": {
+            "kind": "thread",
+            "workers": int(os.getenv("FORENSICS_LIGHT_WORKERS", "4")),
+            "queue": int(os.getenv("FORENSICS_LIGHT_QUEUE", "16")),
+        },
+        "forensics_heavy": {
+            "kind": "process",
+            "workers": int(os.getenv("FORENSICS_HEAVY_WORKERS", str(os.cpu_count() or 1))),
+            "queue": int(os.getenv("FORENSICS_HEAVY_QUEUE", "8")),
+        },
+    }
+    EXECUTION_RETRY_AFTER_S: int = int(os.getenv("EXECUTION_RETRY_AFTER_S", "2"))
+
     # Create dirs if not exist
     def __init__(self):
         self.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
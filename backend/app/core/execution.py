@@ -0,0 +1,212 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from .config import settings
+from .metrics import collect_timings, record_timings
+
+
+class PoolSaturatedError(Exception):
+    """Raised when an execution pool has no free worker and its wait queue is full."""
+
+    def __init__(self, pool_name: str, retry_after: int):
+        super().__init__(f"Server busy: '{pool_name}' pool is saturated, retry in {retry_after}s")
+        self.pool_name = pool_name
+        self.retry_after = retry_after
+
+
+class PoolSlot:
+    """One admitted call on an ExecutionPool; release() frees it once, however often it is called."""
+
+    def __init__(self, pool: "ExecutionPool"):
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._released = False
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._pool.release()
+
+
+class ExecutionPool:
+    """
+    A sized thread or process pool with admission control.
+
+    At most workers + queue_size calls may be admitted at once; further calls are
+    rejected immediately with PoolSaturatedError instead of queuing without bound.
+    Process pools use the 'spawn' start method so children never inherit TensorFlow's
+    thread state from the server process.
+    """
+
+    def __init__(self, name: str, kind: str, workers: int, queue_size: int, retry_after: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.retry_after = retry_after
+
+        self._executor: Executor = None
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix=f"pool-{self.name}"
+                    )
+            return self._executor
+
+    def try_acquire(self, count: int = 1):
+        """Reserve count slots (all or none) or raise PoolSaturatedError."""
+        with self._lock:
+            if self._admitted + count > self.capacity:
+                self._rejected += 1
+                raise PoolSaturatedError(self.name, self.retry_after)
+            self._admitted += count
+
+    def release(self):
+        with self._lock:
+            self._admitted -= 1
+
+    def reserve(self) -> PoolSlot:
+        """Reserve a slot (or raise PoolSaturatedError) that the caller releases through the returned PoolSlot."""
+        self.try_acquire()
+        return PoolSlot(self)
+
+    def reserve_many(self, count: int) -> List[PoolSlot]:
+        """Reserve count slots at once, for work that fans out after a first call: all or PoolSaturatedError."""
+        self.try_acquire(count)
+        return [PoolSlot(self) for _ in range(count)]
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on this pool without blocking the event loop. Stage timings
+        recorded by fn reach the metrics and the request's timings either way: threads run in
+        a copy of the caller's context, process workers send their samples back.
+
+        The slot is freed when the job itself finishes, not when the caller stops waiting:
+        a cancelled await (client disconnect) leaves the job running on its worker.
+        """
+        return await self._wait(self._start(functools.partial(fn, *args, **kwargs)))
+
+    async def run_reserved(self, slot: PoolSlot, fn: Callable, *args, **kwargs) -> Any:
+        """run() in a slot the caller already reserved (reserve_many()); the job's end releases it."""
+        return await self._wait(self._start(functools.partial(fn, *args, **kwargs), slot))
+
+    async def _wait(self, future: Future) -> Any:
+        if self.kind == "process":
+            result, samples = await asyncio.wrap_future(future)
+            record_timings(samples)
+            return result
+        return await asyncio.wrap_future(future)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        run() for blocking callers on a thread pool: admit (or raise PoolSaturatedError) and
+        start fn in a copy of the caller's context, returning its Future.
+        """
+        if self.kind != "thread":
+            raise ValueError(f"submit() needs a thread pool, '{self.name}' is a {self.kind} pool")
+        return self._start(functools.partial(fn, *args, **kwargs))
+
+    def _start(self, call: Callable, slot: Optional[PoolSlot] = None) -> Future:
+        """Admit (unless slot is given) and submit one job; its slot is released from the job's own done callback."""
+        if slot is None:
+            slot = self.reserve()
+        try:
+            if self.kind == "process":
+                future = self.executor.submit(collect_timings, call)
+            else:
+                future = self.executor.submit(contextvars.copy_context().run, call)
+        except BaseException:
+            slot.release()
+            raise
+        future.add_done_callback(lambda _: slot.release())
+        return future
+
+    async def stream(self, iterator: Iterator, slot: Optional[PoolSlot] = None) -> AsyncIterator:
+        """
+        Drive a blocking iterator on this pool, holding one slot until it is exhausted or closed.
+        Pass the slot when the caller already reserved it with reserve(): a generator that is
+        never started never runs its finally, so the caller must release it as well.
+        """
+        if slot is None:
+            slot = self.reserve()
+        sentinel = object()
+        try:
+            loop = asyncio.get_running_loop()
+            while True:
+                item = await loop.run_in_executor(self.executor, next, iterator, sentinel)
+                if item is sentinel:
+                    return
+                yield item
+        finally:
+            slot.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._admitted,
+                "rejected": self._rejected
+            }
+
+    def worker_pids(self) -> List[int]:
+        """PIDs of the live worker processes (empty for thread pools or before first use)."""
+        with self._lock:
+            if self.kind != "process" or self._executor is None:
+                return []
+            return [p.pid for p in (self._executor._processes or {}).values() if p.is_alive()]
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class ExecutionLayer:
+    """Named execution pools, one per endpoint class (see settings.EXECUTION_POOLS)."""
+
+    def __init__(self, pool_config: Dict[str, Dict], retry_after: int):
+        self.pools = {
+            name: ExecutionPool(name, cfg["kind"], cfg["workers"], cfg["queue"], retry_after)
+            for name, cfg in pool_config.items()
+        }
+
+    def __getitem__(self, name: str) -> ExecutionPool:
+        return self.pools[name]
+
+    async def run(self, pool_name: str, fn: Callable, *args, **kwargs) -> Any:
+        return await self.pools[pool_name].run(fn, *args, **kwargs)
+
+    def stats(self) -> Dict:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            pool.shutdown()
+
+
+execution = ExecutionLayer(settings.EXECUTION_POOLS, settings.EXECUTION_RETRY_AFTER_S)
@@ -0,0 +1,148 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+
+# Seconds: from a sub-millisecond resize up to a multi-second full-resolution forensics run
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Histogram:
+    """
+    A Prometheus histogram family: per label set, a count per bucket plus the sum and count.
+
+    observe() is a bisect and three increments under a lock, cheap enough for every stage
+    of every request. Buckets are stored non-cumulative and accumulated when rendered.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *labels):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [per-bucket counts (last one is +Inf), sum, count]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{format_labels({**base, 'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(base)} {total:.6f}")
+            lines.append(f"{self.name}_count{format_labels(base)} {count}")
+        return lines
+
+
+def render_family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict, float]]) -> List[str]:
+    """Text exposition of a gauge or counter family from (labels, value) samples."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{format_labels(labels)} {float(value):g}" for labels, value in samples)
+    return lines
+
+
+stage_seconds = Histogram(
+    "steganalysis_stage_duration_seconds",
+    "Time spent in each processing stage (decode, preprocess, inference, forensics analyzers, encoding)",
+    ("stage",)
+)
+request_seconds = Histogram(
+    "steganalysis_http_request_duration_seconds",
+    "HTTP request latency by route template and status code",
+    ("method", "route", "status")
+)
+
+
+class RequestTimings:
+    """Stage durations recorded while serving one request (or one process-pool call)."""
+
+    __slots__ = ("started", "samples")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.samples: List[Tuple[str, float]] = []
+
+    def summary(self) -> Dict[str, float]:
+        """Milliseconds per stage (repeated stages are summed), in first-seen order, plus the total so far."""
+        totals: Dict[str, float] = {}
+        for stage, seconds in self.samples:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        summary = {f"{stage}_ms": round(seconds * 1000.0, 3) for stage, seconds in totals.items()}
+        summary["total_ms"] = round((time.perf_counter() - self.started) * 1000.0, 3)
+        return summary
+
+
+# Set by the API's MetricsMiddleware for requests that asked for timings; copied into the execution
+# pool's worker threads, and replaced by a fresh collector inside process-pool workers
+request_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def observe_stage(stage: str, seconds: float):
+    if not settings.METRICS_ENABLED:
+        return
+    stage_seconds.observe(seconds, stage)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.samples.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage: str):
+    """Time a block (or, as a decorator, every call of a function) as `stage`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def collect_timings(call: Callable) -> tuple:
+    """
+    Run call() in a process-pool worker and return (result, stage samples). The worker's own
+    histograms are never scraped, so the caller feeds the samples to record_timings().
+    """
+    timings = RequestTimings()
+    token = request_timings.set(timings)
+    try:
+        return call(), timings.samples
+    finally:
+        request_timings.reset(token)
+
+
+def record_timings(samples: List[Tuple[str, float]]):
+    for stage, seconds in samples:
+        observe_stage(stage, seconds)
+
+
+def render_histograms() -> List[str]:
+    return stage_seconds.render() + request_seconds.render()
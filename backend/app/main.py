@@ -1,15 +1,41 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from .core.config import settings
+from .core.execution import execution, PoolSaturatedError
+from .services.model_service import model_manager
 from .api import endpoints
 from .api import forensics
+from .api import metrics
+from .api.metrics import MetricsMiddleware, TimingJSONResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Preload in the background: liveness (/health) answers immediately,
+    # readiness (/api/v1/ready) only once every preloaded model has been warmed up
+    preload_task = asyncio.create_task(asyncio.to_thread(model_manager.preload, settings.PRELOAD_MODELS))
+    yield
+    preload_task.cancel()
+    execution.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    description="Steganalysis System: AI Detection + Forensics Analysis"
+    description="Steganalysis System: AI Detection + Forensics Analysis",
+    lifespan=lifespan,
+    default_response_class=TimingJSONResponse
 )
 
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -18,10 +44,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(endpoints.router, prefix=settings.API_V1_STR)
 app.include_router(forensics.router)  # Forensics has its own prefix
+app.include_router(metrics.router)  # Prometheus scrape endpoint at /metrics
 
 @app.get("/")
 async def root():
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+_digest_lock = threading.Lock()
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_sha256(path) -> str:
+    """
+    SHA-256 of a file, read in 1 MB chunks.
+    Memoized on (path, size, mtime) so re-hashing only happens when the file changes.
+    """
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        digest = _digest_memo.get(key)
+    if digest is not None:
+        return digest
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digest_memo[key] = digest
+    return digest
+
+
+class LoadArtifactCache:
+    """
+    On-disk record of how each model file was successfully loaded, keyed by the file's SHA-256.
+
+    Layout: <root>/<sha256>/manifest.json (+ inference.weights.h5 when a model is given).
+    The manifest stores the strategy that worked ('direct', 'reconstruction' or
+    'reconstruction_by_name') and, for rebuilt graphs, which builder to use. For graphs that
+    only loaded by_name the weights are re-saved from the rebuilt model itself, so later
+    loads match them strictly and skip the by_name fallback.
+
+    A 'direct' entry is manifest-only: the .keras file already is the ready-to-serve
+    artifact, so a warm start still deserializes it and only skips compile(). Reconstructed
+    models also skip the failed direct attempt (see benchmarks/bench_model_loading.py).
+    """
+
+    MANIFEST = "manifest.json"
+    WEIGHTS = "inference.weights.h5"
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _entry_dir(self, digest: str) -> Path:
+        return self.root / digest
+
+    def lookup(self, digest: str) -> Optional[Dict]:
+        manifest_path = self._entry_dir(digest) / self.MANIFEST
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("weights_file") and not (self._entry_dir(digest) / manifest["weights_file"]).exists():
+            return None
+        return manifest
+
+    def weights_path(self, digest: str) -> Path:
+        return self._entry_dir(digest) / self.WEIGHTS
+
+    def record(self, digest: str, strategy: str, builder: Optional[str] = None, model=None, **info) -> Dict:
+        """Store the winning strategy; with a model, also save its weights for strict reloads."""
+        entry_dir = self._entry_dir(digest)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "sha256": digest,
+            "strategy": strategy,
+            "builder": builder,
+            "weights_file": None,
+            "created_at": time.time(),
+            **info
+        }
+        if model is not None and builder is not None:
+            model.save_weights(str(self.weights_path(digest)))
+            manifest["weights_file"] = self.WEIGHTS
+
+        # Write then rename so a crash never leaves a half-written manifest behind
+        tmp_path = entry_dir / f"{self.MANIFEST}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, entry_dir / self.MANIFEST)
+        return manifest
+
+    def invalidate(self, digest: str):
+        shutil.rmtree(self._entry_dir(digest), ignore_errors=True)
@@ -0,0 +1,116 @@
+import json
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from ..core.config import settings
+from .image_processing import ImagePreprocessor
+from .model_service import model_manager
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif"}
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+# (filename, image bytes) or (filename, error) for members that were rejected before decoding
+BatchItem = Tuple[str, Union[bytes, Exception]]
+
+
+def is_archive(filename: Optional[str], fileobj: BinaryIO) -> bool:
+    """Detect a zip/tar upload by extension first, then by content."""
+    name = (filename or "").lower()
+    if name.endswith(".zip") or name.endswith(TAR_SUFFIXES):
+        return True
+
+    try:
+        if zipfile.is_zipfile(fileobj):
+            return True
+        fileobj.seek(0)
+        return tarfile.is_tarfile(fileobj)
+    except Exception:
+        return False
+    finally:
+        fileobj.seek(0)
+
+
+def iter_archive_images(fileobj: BinaryIO, max_image_bytes: int) -> Iterator[BatchItem]:
+    """
+    Yield image members of a zip or tar archive one at a time.
+
+    Only the member currently being yielded is held in memory; tar archives are read
+    in streaming mode so even compressed multi-GB uploads are never fully materialized.
+    """
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or PurePosixPath(info.filename).suffix.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                if info.file_size > max_image_bytes:
+                    yield info.filename, ValueError("Image too large")
+                    continue
+                yield info.filename, archive.read(info)
+        return
+
+    fileobj.seek(0)
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile() or PurePosixPath(member.name).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            if member.size > max_image_bytes:
+                yield member.name, ValueError("Image too large")
+                continue
+            yield member.name, archive.extractfile(member).read()
+
+
+def _preprocess(data: Union[bytes, Exception]) -> np.ndarray:
+    if isinstance(data, Exception):
+        raise data
+    if settings.BULK_FAST_DECODE:
+        return ImagePreprocessor.preprocess_fast(data)
+    return ImagePreprocessor.preprocess(data)
+
+
+def stream_batch_predictions(
+    items: Iterable[BatchItem],
+    model_name: str,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Decode/preprocess images in parallel and score them in batches, yielding one NDJSON line per image.
+
+    At most 2 * batch_size images are in flight at any time: while one batch runs through
+    the model, the thread pool is already preprocessing the next one.
+    """
+    batch_size = max(1, batch_size or settings.BULK_PREDICT_BATCH_SIZE)
+    workers = max(1, workers or settings.BULK_PREDICT_WORKERS)
+    pending: deque = deque()
+
+    def flush(count: int) -> Iterator[str]:
+        ready, tensors = [], []
+        for _ in range(min(count, len(pending))):
+            index, filename, future = pending.popleft()
+            try:
+                tensors.append(future.result())
+                ready.append((index, filename, None))
+            except Exception as e:
+                ready.append((index, filename, f"Preprocessing failed: {str(e)}"))
+
+        results = iter(model_manager.predict_batch(np.concatenate(tensors, axis=0), model_name)) if tensors else iter(())
+        for index, filename, error in ready:
+            line = {"index": index, "filename": filename}
+            line.update({"error": error} if error else next(results))
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-preprocess") as pool:
+        for index, (filename, data) in enumerate(items):
+            pending.append((index, filename, pool.submit(_preprocess, data)))
+            if len(pending) >= 2 * batch_size:
+                yield from flush(batch_size)
+
+        while pending:
+            yield from flush(batch_size)
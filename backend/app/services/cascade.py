@@ -0,0 +1,90 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .forensics.visual_analyzer import VisualAnalyzer
+
+CASCADE_STAGES = ("stage1", "stage2")
+_LSB_CHANNELS = ("red", "green", "blue")
+_analyzer = VisualAnalyzer()
+
+
+def lsb_screen(image: np.ndarray, pattern_threshold: float) -> Dict:
+    """
+    Per-channel LSB entropy and transition pattern score of a decoded (H, W, 3) uint8 image,
+    computed with VisualAnalyzer's anomaly metrics. Channels whose pattern score exceeds
+    pattern_threshold (structured rather than noise-like LSBs) are flagged.
+    """
+    metrics = {}
+    flagged = []
+    for index, name in enumerate(_LSB_CHANNELS[:image.shape[2]]):
+        lsb_metrics = _analyzer.lsb_plane_metrics(image[:, :, index])
+        pattern = float(lsb_metrics['lsb_pattern'])
+        metrics[name] = {
+            "lsb_entropy": round(float(lsb_metrics['lsb_entropy']), 4),
+            "lsb_pattern": round(pattern, 4)
+        }
+        if pattern > pattern_threshold:
+            flagged.append(name)
+    return {"channels": metrics, "flagged": flagged}
+
+
+def stage1_decides(score: float, band: Tuple[float, float], lsb_flagged: List[str]) -> bool:
+    """
+    Whether the cheap stage's verdict is final: the score must fall outside the uncertainty
+    band [low, high]. A confident "clean" is still escalated when the LSB screen flags a channel.
+    """
+    low, high = band
+    if score > high:
+        return True
+    return score < low and not lsb_flagged
+
+
+class CascadeStats:
+    """Running per-stage counts and latencies, used to report the throughput gain over running stage 2 on every image."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = 0
+        self.errors = 0
+        self.decided = {stage: 0 for stage in CASCADE_STAGES}
+        self._stage_ms = {stage: 0.0 for stage in CASCADE_STAGES}
+        self._stage_runs = {stage: 0 for stage in CASCADE_STAGES}
+        self._total_ms = 0.0
+
+    def record(self, decided_by: Optional[str], stage1_ms: float, stage2_ms: Optional[float], total_ms: float):
+        with self._lock:
+            if decided_by is None:
+                self.errors += 1
+                return
+            self.images += 1
+            self.decided[decided_by] += 1
+            self._total_ms += total_ms
+            self._stage_ms["stage1"] += stage1_ms
+            self._stage_runs["stage1"] += 1
+            if stage2_ms is not None:
+                self._stage_ms["stage2"] += stage2_ms
+                self._stage_runs["stage2"] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            mean = {
+                stage: round(self._stage_ms[stage] / self._stage_runs[stage], 3) if self._stage_runs[stage] else None
+                for stage in CASCADE_STAGES
+            }
+            mean_total = self._total_ms / self.images if self.images else None
+            result = {
+                "images": self.images,
+                "errors": self.errors,
+                "decided": dict(self.decided),
+                "escalation_rate": round(self.decided["stage2"] / self.images, 4) if self.images else None,
+                "stage_mean_ms": mean,
+                "mean_ms": round(mean_total, 3) if mean_total is not None else None,
+                "images_per_s": round(1000.0 / mean_total, 2) if mean_total else None,
+            }
+            # Without the cascade every image would pay the stage-2 latency
+            if mean["stage2"] and mean_total:
+                result["stage2_only_images_per_s"] = round(1000.0 / mean["stage2"], 2)
+                result["throughput_gain"] = round(mean["stage2"] / mean_total, 2)
+            return result
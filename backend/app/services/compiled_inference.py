@@ -0,0 +1,105 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import tensorflow as tf
+
+
+class CompiledModel:
+    """
+    A loaded Keras model wrapped in a tf.function with a fixed (None, H, W, C) float32 signature
+    (C = 3 for images; sub-models such as SRM tails take feature maps with more channels).
+
+    Calling it skips Keras's predict() machinery (data adapter, callbacks, step loop), which
+    costs more than the forward pass itself for the single images /predict serves.
+
+    Without XLA a single concrete function serves every batch size. With jit_compile=True,
+    XLA compiles one executable per distinct shape, so batches are padded up to the nearest
+    pre-traced size ("bucket") and larger batches are split; the set of compiled shapes
+    stays bounded no matter what batch sizes arrive. If XLA cannot compile the graph the
+    wrapper falls back to the plain tf.function.
+    """
+
+    def __init__(
+        self,
+        model,
+        input_shape: tuple = (224, 224),
+        jit_compile: bool = False,
+        batch_sizes: Iterable[int] = (1,),
+        input_channels: int = 3
+    ):
+        self.model = model
+        self.input_shape = tuple(input_shape[:2])
+        self.input_channels = input_channels
+        self.batch_sizes: List[int] = sorted(set(max(1, int(b)) for b in batch_sizes)) or [1]
+        self.jit_compile = jit_compile
+        self.fallback_reason: Optional[str] = None
+        self._traced: set = set()
+        self._lock = threading.Lock()
+        self._fn = self._make_function(jit_compile)
+
+    def _make_function(self, jit_compile: bool):
+        model = self.model
+        height, width = self.input_shape
+        signature = [tf.TensorSpec(shape=(None, height, width, self.input_channels), dtype=tf.float32, name="image")]
+
+        @tf.function(input_signature=signature, jit_compile=jit_compile, reduce_retracing=True)
+        def serve(images):
+            return model(images, training=False)
+
+        return serve
+
+    def _bucket(self, n: int) -> int:
+        for size in self.batch_sizes:
+            if size >= n:
+                return size
+        return self.batch_sizes[-1]
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        try:
+            return self._fn(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()
+        except Exception as e:
+            if not self.jit_compile:
+                raise
+            # XLA could not compile (unsupported op, out of memory...); keep serving without it
+            with self._lock:
+                if self.jit_compile:
+                    print(f"[WARN] XLA compilation failed for {self.model.name}, using tf.function without jit: {str(e)[:200]}")
+                    self.fallback_reason = str(e)[:500]
+                    self.jit_compile = False
+                    self._traced.clear()
+                    self._fn = self._make_function(False)
+            return self._fn(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        """Forward a (N, H, W, C) batch. Returns the model outputs like predict()."""
+        n = len(batch)
+        if not self.jit_compile:
+            return self._run(batch)
+
+        outputs = []
+        largest = self.batch_sizes[-1]
+        for start in range(0, n, largest):
+            chunk = batch[start:start + largest]
+            bucket = self._bucket(len(chunk))
+            if bucket > len(chunk):
+                pad = np.zeros((bucket - len(chunk),) + chunk.shape[1:], dtype=chunk.dtype)
+                chunk = np.concatenate([chunk, pad], axis=0)
+            self._traced.add(bucket)
+            outputs.append(self._run(chunk)[:min(largest, n - start)])
+        return np.concatenate(outputs, axis=0)
+
+    def warm_up(self):
+        """Trace (and with XLA, compile) every configured batch size ahead of traffic."""
+        height, width = self.input_shape
+        for size in self.batch_sizes:
+            self(np.zeros((size, height, width, self.input_channels), dtype=np.float32))
+            self._traced.add(size)
+
+    def describe(self) -> Dict:
+        return {
+            "jit_compile": self.jit_compile,
+            "batch_sizes": self.batch_sizes,
+            "traced_batch_sizes": sorted(self._traced),
+            "fallback_reason": self.fallback_reason
+        }
@@ -0,0 +1,52 @@
+from typing import Iterable, List, Optional, Tuple
+
+ENSEMBLE_METHODS = ("weighted", "vote")
+
+
+def parse_members(spec: Optional[Iterable[str]]) -> List[Tuple[str, float]]:
+    """
+    Parse "model[:weight]" entries into (model_name, weight) pairs, keeping their order.
+    Order matters: members are listed cheapest first, and the first ones are the early-exit stage.
+    """
+    members = []
+    for entry in spec or []:
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, weight = entry, 1.0
+        head, sep, tail = entry.rpartition(":")
+        if sep:
+            try:
+                name, weight = head, float(tail)
+            except ValueError:
+                pass
+        if weight < 0:
+            raise ValueError(f"Ensemble weight for {name} must be >= 0")
+        members.append((name, weight))
+    return members
+
+
+def combine_scores(scores: List[Tuple[float, float]], method: str = "weighted") -> float:
+    """
+    Combine (raw_score, weight) pairs into one stego probability.
+
+    weighted - weighted mean of the sigmoid scores
+    vote     - weighted share of members voting stego (score >= 0.5); 0.5 on a tie
+    """
+    if method not in ENSEMBLE_METHODS:
+        raise ValueError(f"Unknown ensemble method '{method}', expected one of {ENSEMBLE_METHODS}")
+    total = sum(weight for _, weight in scores)
+    if not scores or total <= 0:
+        raise ValueError("Ensemble has no member with a positive weight")
+    if method == "vote":
+        return sum(weight for score, weight in scores if score >= 0.5) / total
+    return sum(score * weight for score, weight in scores) / total
+
+
+def confident_agreement(scores: List[float], threshold: float) -> bool:
+    """True when every score gives the same label with at least `threshold` confidence."""
+    if not scores:
+        return False
+    stego = [s >= 0.5 for s in scores]
+    confidences = [s if s >= 0.5 else 1.0 - s for s in scores]
+    return len(set(stego)) == 1 and min(confidences) >= threshold
@@ -0,0 +1,134 @@
+"""
+Byte Statistics
+---------------
+Vectorized randomness statistics shared by the forensics analyzers.
+
+One histogram (np.bincount over an np.frombuffer view, in chunks so a large input is
+never widened to intp all at once) gives the Shannon entropy, chi-square and arithmetic
+mean; serial correlation at several lags and the Monte-Carlo pi estimate (as in the
+`ent` tool) are dot products and integer comparisons over the same array.
+"""
+
+from typing import Any, Dict, Sequence, Union
+
+import numpy as np
+
+# Bytes per bincount call (even): bounds the temporary intp copy to 16 MB
+_CHUNK = 4 * 1024 * 1024
+
+# Below this many bytes the fixed cost of 65536 pair bins outweighs the halved bincount
+# (a 64-byte header is ~50x slower paired); measured crossover is around 100 KB
+_PAIRED_MIN_BYTES = 128 * 1024
+
+# Monte-Carlo pi: consecutive 6-byte groups are (x, y) points of 24 bits each
+_MC_RADIUS_SQ = (2 ** 24 - 1) ** 2
+
+DEFAULT_LAGS = (1, 2, 4, 8)
+
+
+def as_bytes_array(data: Union[bytes, bytearray, memoryview, np.ndarray]) -> np.ndarray:
+    """Flat uint8 view of bytes-like data, or of an array's values (copied only if not uint8)."""
+    if isinstance(data, np.ndarray):
+        return data.reshape(-1) if data.dtype == np.uint8 else data.reshape(-1).astype(np.uint8)
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def byte_histogram(values: np.ndarray) -> np.ndarray:
+    """
+    Occurrences of each value 0-255 in a flat uint8 array. Large arrays are counted in pairs
+    (one bincount over a uint16 view, folded back to 256 bins), which halves the bincount work;
+    small ones, such as sweep headers, with a plain 256-bin bincount.
+    """
+    if values.size < _PAIRED_MIN_BYTES:
+        return np.bincount(values, minlength=256).astype(np.int64, copy=False)
+    values = np.ascontiguousarray(values)
+    counts = np.zeros(256, dtype=np.int64)
+    paired = values.size - values.size % 2
+    for start in range(0, paired, _CHUNK):
+        pairs = np.bincount(values[start:min(start + _CHUNK, paired)].view(np.uint16), minlength=65536)
+        # Row = one byte of the pair, column = the other: each axis sum counts one of them
+        pairs = pairs.reshape(256, 256)
+        counts += pairs.sum(axis=0) + pairs.sum(axis=1)
+    if paired < values.size:
+        counts[values[-1]] += 1
+    return counts
+
+
+def shannon_entropy(counts: np.ndarray) -> float:
+    """Shannon entropy in bits per symbol of a histogram (0 for an empty one)."""
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    probabilities = counts[counts > 0] / total
+    return max(0.0, float(-(probabilities * np.log2(probabilities)).sum()))
+
+
+def chi_square(counts: np.ndarray) -> float:
+    """Pearson chi-square of a byte histogram against the uniform distribution (255 degrees of freedom)."""
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    expected = total / 256
+    return float(((counts - expected) ** 2).sum() / expected)
+
+
+def arithmetic_mean(counts: np.ndarray) -> float:
+    """Mean byte value (127.5 for uniform random data)."""
+    total = counts.sum()
+    return float(counts @ np.arange(len(counts)) / total) if total else 0.0
+
+
+def serial_correlation(values: np.ndarray, lags: Sequence[int] = (1,)) -> Dict[int, float]:
+    """
+    Autocorrelation of the byte sequence at each lag: sum((x[i] - m)(x[i+lag] - m)) / sum((x - m)^2).
+    Near 0 for random data; 0.0 when the data is constant or shorter than lag + 1.
+    """
+    centered = values.astype(np.float64)
+    centered -= centered.mean() if centered.size else 0.0
+    denominator = float(centered @ centered)
+    result = {}
+    for lag in lags:
+        if centered.size < lag + 1 or denominator == 0:
+            result[lag] = 0.0
+        else:
+            result[lag] = float(centered[:-lag] @ centered[lag:]) / denominator
+    return result
+
+
+def monte_carlo_pi(values: np.ndarray) -> float:
+    """
+    Estimate pi from the share of (x, y) points inside the quarter circle, each point taken
+    from 6 consecutive bytes. Close to pi only for random data; 0.0 with fewer than 6 bytes.
+    """
+    points = values[:values.size - values.size % 6].reshape(-1, 6)
+    if not len(points):
+        return 0.0
+    # Big-endian 24-bit coordinates; squares need up to 49 bits
+    x = points[:, 0].astype(np.int64) << 16 | points[:, 1].astype(np.int64) << 8 | points[:, 2]
+    y = points[:, 3].astype(np.int64) << 16 | points[:, 4].astype(np.int64) << 8 | points[:, 5]
+    inside = np.count_nonzero(x * x + y * y <= _MC_RADIUS_SQ)
+    return 4.0 * inside / len(points)
+
+
+def byte_statistics(data, lags: Sequence[int] = DEFAULT_LAGS) -> Dict[str, Any]:
+    """
+    All statistics of a byte buffer (or uint8 array) in one call.
+
+    Returns:
+        size, entropy (bits per byte), normalized_entropy (0-1), chi_square, mean,
+        serial_correlation (lag -> value), monte_carlo_pi and its relative error
+    """
+    values = as_bytes_array(data)
+    counts = byte_histogram(values)
+    entropy = shannon_entropy(counts)
+    pi_estimate = monte_carlo_pi(values)
+    return {
+        'size': int(values.size),
+        'entropy': entropy,
+        'normalized_entropy': entropy / 8.0,
+        'chi_square': chi_square(counts),
+        'mean': arithmetic_mean(counts),
+        'serial_correlation': serial_correlation(values, lags),
+        'monte_carlo_pi': pi_estimate,
+        'monte_carlo_pi_error': abs(pi_estimate - np.pi) / np.pi if pi_estimate else None
+    }
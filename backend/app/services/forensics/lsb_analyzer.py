@@ -9,16 +9,30 @@ Version: 1.0.0
 
 import io
 import hashlib
+import threading
 import uuid
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
-from collections import Counter
+from collections import OrderedDict
 import numpy as np
 from PIL import Image
 import logging
 
+from ...core.config import settings
+from ...core.metrics import timed
+from .byte_stats import as_bytes_array, byte_histogram, byte_statistics
+from .lsb_engine import TRAVERSAL_ORDERS, StreamPrefix, extract_bytes, extract_range, stream_size
+from .lsb_headers import container_length, length_prefix
+from .lsb_sweep import rank_candidates, score_header
+
 logger = logging.getLogger(__name__)
 
+# Decoded images by SHA-256 of the upload, LRU within settings.LSB_DECODE_CACHE_MB. Module level:
+# the analyzer is pickled into every process-pool call, the worker process is what persists
+_decoded_images: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_decoded_bytes = 0
+_decoded_lock = threading.Lock()
+
 
 class LSBAnalyzer:
     """
@@ -28,6 +42,10 @@ class LSBAnalyzer:
         - Multi-channel LSB extraction (RGB, individual channels)
         - Configurable bit depth (1-8 bits per channel)
         - LSB/MSB order support
+        - Row, column and reversed pixel traversal orders
+        - One-pass parameter sweep with ranked candidates
+        - Staged (header-first) extraction with declared-size detection
+        - Random-access reads (offset, length) for paging through long streams
         - File signature detection
         - Text encoding detection
         - Entropy analysis
@@ -65,35 +83,53 @@ class LSBAnalyzer:
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logging.getLogger(self.__class__.__name__)
     
+    @timed("forensics_lsb")
     def extract(
         self,
         image_bytes: bytes,
         channels: str = 'RGB',
         bit_order: str = 'LSB',
         bits_per_channel: int = 1,
-        max_bytes: int = 1024 * 1024  # 1MB default max
+        max_bytes: int = 1024 * 1024,  # 1MB default max
+        order: str = 'row',
+        staged: bool = False,
+        probe_bytes: int = 256
     ) -> Dict[str, Any]:
         """
         Extract hidden data from LSB with comprehensive analysis.
         
+        In staged mode only a probe_bytes prefix is extracted first. A declared size (a
+        container header, or a length prefix followed by payload-like bytes) is then extracted
+        exactly, a file signature or text up to max_bytes, and anything else is analyzed from
+        the probe alone. A length prefix stays in the extracted stream.
+        
         Args:
             image_bytes: Raw image data
             channels: Which channels to use ('RGB', 'R', 'G', 'B', etc.)
             bit_order: 'LSB' or 'MSB'
             bits_per_channel: Number of bits to extract per channel (1-8)
             max_bytes: Maximum bytes to extract (safety limit)
+            order: Pixel traversal order (see lsb_engine.TRAVERSAL_ORDERS)
+            staged: Extract a header-sized prefix first and only as much as it justifies
+            probe_bytes: Size of that prefix
             
         Returns:
             Dictionary with extracted data and analysis
         """
         try:
-            img = Image.open(io.BytesIO(image_bytes))
-            
-            # Con vert to RGB if needed
-            if img.mode not in ('RGB', 'RGBA'):
-                img = img.convert('RGB')
+            img_array = self._load_image_array(image_bytes)
+            config = {
+                'channels': channels,
+                'bit_order': bit_order,
+                'bits_per_channel': bits_per_channel,
+                'order': order
+            }
             
-            img_array = np.array(img)
+            if staged:
+                extracted_bytes, stage_info = self._extract_staged(img_array, max_bytes=max_bytes, probe_bytes=probe_bytes, **config)
+                result = self.analyze_payload(extracted_bytes, config)
+                result['staged_extraction'] = stage_info
+                return result
             
             # Extract LSB data
             extracted_bytes = self._extract_lsb_data(
@@ -101,54 +137,197 @@ class LSBAnalyzer:
                 channels,
                 bit_order,
                 bits_per_channel,
-                max_bytes
+                max_bytes,
+                order
             )
             
-            if not extracted_bytes:
-                return {
-                    'success': False,
-                    'error': 'No data extracted',
-                    'extracted_size': 0
-                }
+            return self.analyze_payload(extracted_bytes, config)
             
-            # Analyze extracted data
-            data_info = self._analyze_extracted_data(extracted_bytes)
-            file_detection = self._detect_file_type(extracted_bytes)
-            text_analysis = self._try_decode_text(extracted_bytes)
-            entropy_analysis = self._analyze_entropy(extracted_bytes)
-            
-            # Save file for download
-            file_info = self._save_extracted_file(
-                extracted_bytes,
-                file_detection.get('ext', '.bin')
-            )
-            
-            # Overall assessment
-            assessment = self._assess_data_quality(
-                extracted_bytes,
-                file_detection,
-                text_analysis,
-                entropy_analysis
-            )
+        except Exception as e:
+            self.logger.error(f"LSB extraction failed: {str(e)}")
+            raise ValueError(f"Failed to extract LSB data: {str(e)}")
+    
+    def analyze_payload(self, extracted_bytes: bytes, extraction_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze an extracted LSB stream and save it for download (the second half of extract()).
+        
+        Args:
+            extracted_bytes: The extracted stream
+            extraction_config: Parameters it was extracted with, echoed in the result
             
+        Returns:
+            Dictionary with extracted data and analysis
+        """
+        if not extracted_bytes:
             return {
-                'success': True,
-                'extraction_config': {
-                    'channels': channels,
-                    'bit_order': bit_order,
-                    'bits_per_channel': bits_per_channel
-                },
-                'data_info': data_info,
-                'file_detection': file_detection,
-                'text_analysis': text_analysis,
-                'entropy_analysis': entropy_analysis,
-                'file_download': file_info,
-                'assessment': assessment
+                'success': False,
+                'error': 'No data extracted',
+                'extracted_size': 0
             }
+        
+        # Analyze extracted data
+        data_info = self._analyze_extracted_data(extracted_bytes)
+        file_detection = self._detect_file_type(extracted_bytes)
+        text_analysis = self._try_decode_text(extracted_bytes)
+        entropy_analysis = self._analyze_entropy(extracted_bytes)
+        
+        # Save file for download
+        file_info = self._save_extracted_file(
+            extracted_bytes,
+            file_detection.get('ext', '.bin')
+        )
+        
+        # Overall assessment
+        assessment = self._assess_data_quality(
+            extracted_bytes,
+            file_detection,
+            text_analysis,
+            entropy_analysis
+        )
+        
+        return {
+            'success': True,
+            'extraction_config': extraction_config,
+            'data_info': data_info,
+            'file_detection': file_detection,
+            'text_analysis': text_analysis,
+            'entropy_analysis': entropy_analysis,
+            'file_download': file_info,
+            'assessment': assessment
+        }
+    
+    @timed("forensics_lsb_sweep")
+    def sweep(
+        self,
+        image_bytes: bytes,
+        header_bytes: int = 64,
+        orders: Tuple[str, ...] = TRAVERSAL_ORDERS,
+        ranking_size: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Brute-force the extraction parameters in one pass (see lsb_sweep): decode once and score
+        the header of every channels / bit order / bits per channel / traversal combination.
+        Only the best deserve a full extract(), which callers run as separate jobs so the
+        candidates are analyzed in parallel and their streams never cross processes.
+        
+        Args:
+            image_bytes: Raw image data
+            header_bytes: Bytes of each candidate stream to score
+            orders: Traversal orders to try
+            ranking_size: Best-scored candidates to report
             
+        Returns:
+            Dictionary with the ranking (each entry's channels, bit_order,
+            bits_per_channel and order are extract() arguments)
+        """
+        for order in orders:
+            if order not in TRAVERSAL_ORDERS:
+                raise ValueError(f"order must be one of {', '.join(TRAVERSAL_ORDERS)}")
+        
+        try:
+            img_array = self._load_image_array(image_bytes)
         except Exception as e:
-            self.logger.error(f"LSB extraction failed: {str(e)}")
-            raise ValueError(f"Failed to extract LSB data: {str(e)}")
+            raise ValueError(f"Failed to decode image: {str(e)}")
+        
+        ranking = rank_candidates(img_array, self._parse_channels, self.FILE_SIGNATURES, header_bytes, orders)
+        
+        return {
+            'image': {
+                'width': int(img_array.shape[1]),
+                'height': int(img_array.shape[0]),
+                'channels': int(img_array.shape[2]) if img_array.ndim == 3 else 1
+            },
+            'header_bytes': header_bytes,
+            'candidates_tested': sum(1 + c['equivalent_candidates'] for c in ranking),
+            'distinct_candidates': len(ranking),
+            'ranking': ranking[:ranking_size]
+        }
+    
+    @timed("forensics_lsb_range")
+    def read_range(
+        self,
+        image_bytes: bytes,
+        offset: int = 0,
+        length: int = 64 * 1024,
+        channels: str = 'RGB',
+        bit_order: str = 'LSB',
+        bits_per_channel: int = 1,
+        order: str = 'row'
+    ) -> Dict[str, Any]:
+        """
+        Read bytes [offset, offset + length) of an LSB stream without extracting what precedes
+        them: only the pixels holding the range are read, so every page costs the same.
+        
+        Args:
+            image_bytes: Raw image data
+            offset: First byte of the stream to return
+            length: Bytes to return (fewer at the end of the stream)
+            channels, bit_order, bits_per_channel, order: As for extract()
+            
+        Returns:
+            Dictionary with the bytes ('data'), their position and the stream size
+        """
+        if order not in TRAVERSAL_ORDERS:
+            raise ValueError(f"order must be one of {', '.join(TRAVERSAL_ORDERS)}")
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must not be negative")
+        
+        try:
+            img_array = self._load_image_array(image_bytes)
+        except Exception as e:
+            raise ValueError(f"Failed to decode image: {str(e)}")
+        
+        channel_indices = self._parse_channels(channels, img_array.shape[2] if len(img_array.shape) == 3 else 1)
+        data = extract_range(img_array, channel_indices, bit_order, bits_per_channel, offset, length, order)
+        total = stream_size(img_array if img_array.ndim == 3 else img_array[:, :, np.newaxis], channel_indices, bits_per_channel)
+        end = offset + len(data)
+        
+        return {
+            'extraction_config': {
+                'channels': channels,
+                'bit_order': bit_order,
+                'bits_per_channel': bits_per_channel,
+                'order': order
+            },
+            'offset': offset,
+            'length': len(data),
+            'stream_bytes': total,
+            'has_more': end < total,
+            'next_offset': end if end < total else None,
+            'data': data
+        }
+    
+    def _load_image_array(self, image_bytes: bytes) -> np.ndarray:
+        """Decode an image to the (read-only) RGB or RGBA array LSB extraction reads, via the decode cache."""
+        global _decoded_bytes
+        budget = settings.LSB_DECODE_CACHE_MB * 1024 * 1024
+        key = hashlib.sha256(image_bytes).hexdigest() if budget > 0 else None
+        if key is not None:
+            with _decoded_lock:
+                cached = _decoded_images.get(key)
+                if cached is not None:
+                    _decoded_images.move_to_end(key)
+                    return cached
+        
+        img = Image.open(io.BytesIO(image_bytes))
+        
+        # Con vert to RGB if needed
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGB')
+        
+        img_array = np.array(img)
+        # Shared between calls once cached
+        img_array.flags.writeable = False
+        
+        if key is not None and img_array.nbytes <= budget:
+            with _decoded_lock:
+                if key not in _decoded_images:
+                    _decoded_images[key] = img_array
+                    _decoded_bytes += img_array.nbytes
+                while _decoded_bytes > budget:
+                    _, evicted = _decoded_images.popitem(last=False)
+                    _decoded_bytes -= evicted.nbytes
+        return img_array
     
     def _extract_lsb_data(
         self,
@@ -156,54 +335,71 @@ class LSBAnalyzer:
         channels: str,
         bit_order: str,
         bits_per_channel: int,
-        max_bytes: int
+        max_bytes: int,
+        order: str = 'row'
     ) -> bytes:
         """
-        Core LSB extraction algorithm.
+        Core LSB extraction algorithm (vectorized, see lsb_engine).
         
         Returns:
             Extracted bytes
         """
-        height, width = img_array.shape[:2]
+        if order not in TRAVERSAL_ORDERS:
+            raise ValueError(f"order must be one of {', '.join(TRAVERSAL_ORDERS)}")
         
         # Determine which channels to use
         channel_indices = self._parse_channels(channels, img_array.shape[2] if len(img_array.shape) == 3 else 1)
         
-        # Collect bits
-        bit_array = []
-        max_bits = max_bytes * 8
+        return extract_bytes(img_array, channel_indices, bit_order, bits_per_channel, max_bytes, order)
+    
+    def _extract_staged(
+        self,
+        img_array: np.ndarray,
+        channels: str,
+        bit_order: str,
+        bits_per_channel: int,
+        max_bytes: int,
+        order: str,
+        probe_bytes: int
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Header-first extraction: probe, then extract exactly what the probe justifies.
         
-        for y in range(height):
-            for x in range(width):
-                if len(bit_array) >= max_bits:
-                    break
-                
-                pixel = img_array[y, x]
-                
-                for ch_idx in channel_indices:
-                    if len(img_array.shape) == 2:
-                        channel_value = pixel
-                    else:
-                        channel_value = pixel[ch_idx]
-                    
-                    # Extract bits
-                    if bit_order == 'LSB':
-                        for bit_pos in range(bits_per_channel):
-                            bit = (channel_value >> bit_pos) & 1
-                            bit_array.append(bit)
-                    else:  # MSB
-                        for bit_pos in range(bits_per_channel):
-                            bit = (channel_value >> (7 - bit_pos)) & 1
-                            bit_array.append(bit)
-                    
-                    if len(bit_array) >= max_bits:
-                        break
-                
-                if len(bit_array) >= max_bits:
-                    break
+        Returns:
+            (extracted bytes, description of the stage reached and why)
+        """
+        if order not in TRAVERSAL_ORDERS:
+            raise ValueError(f"order must be one of {', '.join(TRAVERSAL_ORDERS)}")
         
-        # Convert bits to bytes
-        return self._bits_to_bytes(bit_array)
+        channel_indices = self._parse_channels(channels, img_array.shape[2] if len(img_array.shape) == 3 else 1)
+        stream = StreamPrefix(img_array, channel_indices, bit_order, bits_per_channel, max_bytes, order)
+        probe = stream.read(probe_bytes)
+        info = {'probe_bytes': len(probe)}
+        
+        # Container whose header declares its size: extract exactly that
+        container = container_length(stream.read, stream.limit)
+        if container:
+            data = stream.read(container['declared_bytes'])
+            return data, {**info, 'stage': 'declared_size', 'reason': f"{container['type']} header", 'container': container}
+        
+        header = score_header(probe, self.FILE_SIGNATURES)
+        if header['signature']:
+            data = self._extract_lsb_data(img_array, channels, bit_order, bits_per_channel, max_bytes, order)
+            return data, {**info, 'stage': 'full', 'reason': f"{header['signature']} signature without a declared size"}
+        
+        # Length prefix written by the embedding tool: extract up to the end of its payload,
+        # prefix included so the stream matches a non-staged extraction
+        prefix = length_prefix(probe, stream.limit, self.FILE_SIGNATURES)
+        if prefix:
+            data = stream.read(prefix['header_bytes'] + prefix['declared_bytes'])
+            reason = f"{prefix['format']} length prefix ({prefix['payload_check']} payload)"
+            return data, {**info, 'stage': 'declared_size', 'reason': reason, 'length_prefix': prefix}
+        
+        if header['printable_ratio'] > 0.7:  # Same threshold as _try_decode_text
+            data = self._extract_lsb_data(img_array, channels, bit_order, bits_per_channel, max_bytes, order)
+            return data, {**info, 'stage': 'full', 'reason': 'text-like prefix'}
+        
+        return probe, {**info, 'stage': 'probe_only', 'reason': 'no signature, length prefix or text in the prefix'}
     
     def _parse_channels(self, channels_str: str, available_channels: int) -> List[int]:
         """Parse channel string to indices."""
@@ -223,23 +419,6 @@ class LSBAnalyzer:
                         indices.append(idx)
             return indices if indices else [0]
     
-    def _bits_to_bytes(self, bits: List[int]) -> bytes:
-        """Convert bit array to bytes."""
-        byte_array = []
-        
-        for i in range(0, len(bits), 8):
-            byte_bits = bits[i:i+8]
-            
-            if len(byte_bits) < 8:
-                # Pad with zeros
-                byte_bits.extend([0] * (8 - len(byte_bits)))
-            
-            # Convert bits to byte (MSB first)
-            byte_val = sum(bit << (7 - idx) for idx, bit in enumerate(byte_bits))
-            byte_array.append(byte_val)
-        
-        return bytes(byte_array)
-    
     def _analyze_extracted_data(self, data: bytes) -> Dict[str, Any]:
         """Analyze basic properties of extracted data."""
         size_bytes = len(data)
@@ -247,9 +426,14 @@ class LSBAnalyzer:
         # Preview first bytes in hex
         preview_hex = ' '.join(f'{b:02x}' for b in data[:32])
         
-        # Count byte frequencies
-        byte_counts = Counter(data)
-        most_common = byte_counts.most_common(5)
+        # Count byte frequencies (most common first, ties in order of first appearance)
+        byte_counts = byte_histogram(as_bytes_array(data))
+        fifth = max(1, np.sort(byte_counts)[-5])
+        candidates = np.flatnonzero(byte_counts >= fifth)
+        most_common = sorted(
+            ((int(b), int(byte_counts[b])) for b in candidates),
+            key=lambda item: (-item[1], data.find(bytes([item[0]])))
+        )[:5]
         
         return {
             'size_bytes': size_bytes,
@@ -340,63 +524,30 @@ class LSBAnalyzer:
         return {'is_text': False}
     
     def _analyze_entropy(self, data: bytes) -> Dict[str, Any]:
-        """Calculate entropy and randomness metrics."""
+        """Calculate entropy and randomness metrics (see byte_stats)."""
         if not data:
             return {'entropy': 0, 'normalized_entropy': 0}
         
-        # Byte frequency
-        byte_counts = Counter(data)
-        total = len(data)
-        
-        # Shannon entropy
-        entropy = -sum(
-            (count / total) * np.log2(count / total)
-            for count in byte_counts.values()
-        )
-        normalized_entropy = entropy / 8.0  # Normalize to 0-1
-        
-        # Chi-square test for randomness
-        expected = total / 256
-        chi_square = sum(
-            (count - expected) ** 2 / expected
-            for count in byte_counts.values()
-        )
+        stats = byte_statistics(data)
+        normalized_entropy = stats['normalized_entropy']
         
         # Serial correlation (measure of pattern)
-        serial_corr = self._calculate_serial_correlation(data)
+        serial_corr = stats['serial_correlation'][1]
         
         # Convert numpy types to Python native types for JSON serialization
         return {
-            'entropy': float(entropy),
+            'entropy': float(stats['entropy']),
             'normalized_entropy': float(normalized_entropy),
-            'chi_square': float(chi_square),
+            'chi_square': float(stats['chi_square']),
             'serial_correlation': float(serial_corr),
+            'serial_correlation_by_lag': {str(lag): round(value, 6) for lag, value in stats['serial_correlation'].items()},
+            'arithmetic_mean': round(stats['mean'], 4),
+            'monte_carlo_pi': round(stats['monte_carlo_pi'], 6),
             'is_high_entropy': bool(normalized_entropy > 0.95),
             'is_random': bool(abs(serial_corr) < 0.1),
             'assessment': self._assess_randomness(normalized_entropy, serial_corr)
         }
     
-    def _calculate_serial_correlation(self, data: bytes, lag: int = 1) -> float:
-        """Calculate serial correlation (pattern detection)."""
-        if len(data) < lag + 1:
-            return 0.0
-        
-        arr = np.array(list(data))
-        n = len(arr) - lag
-        
-        if n <= 0:
-            return 0.0
-        
-        mean = np.mean(arr)
-        
-        numerator = np.sum((arr[:-lag] - mean) * (arr[lag:] - mean))
-        denominator = np.sum((arr - mean) ** 2)
-        
-        if denominator == 0:
-            return 0.0
-        
-        return numerator / denominator
-    
     def _assess_randomness(self, entropy: float, correlation: float) -> str:
         """Assess data randomness level."""
         if entropy > 0.95 and abs(correlation) < 0.1:
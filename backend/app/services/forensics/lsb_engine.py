@@ -0,0 +1,184 @@
+"""
+LSB Extraction Engine
+---------------------
+NumPy bit-plane extraction shared by the LSB analyzers.
+
+A stream is read pixel by pixel in a traversal order; within a pixel, the selected
+channels in the given order; within a channel value, bits_per_channel bits (bit 0 upward
+for 'LSB', bit 7 downward for 'MSB'). Bits are packed into bytes MSB first, the last
+byte zero-padded. Only the pixels needed for the requested number of bytes are touched.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+# row: left to right, top to bottom (the historical order); column: top to bottom, left to right;
+# *_reversed: the same sequence read backwards, starting from the bottom-right pixel
+TRAVERSAL_ORDERS = ("row", "column", "row_reversed", "column_reversed")
+
+
+def _as_channels(image: np.ndarray, channel_indices: Sequence[int]):
+    """(H, W, C) view and channel indices; a 2-D image has one channel, read for every selected index."""
+    if image.ndim == 2:
+        return image[:, :, np.newaxis], [0] * len(channel_indices)
+    return image, list(channel_indices)
+
+
+def pixel_range(image: np.ndarray, start: int, stop: int, order: str = "row") -> np.ndarray:
+    """Pixels [start, stop) of an (H, W, C) image's traversal sequence, as a (n, C) array."""
+    if order not in TRAVERSAL_ORDERS:
+        raise ValueError(f"order must be one of {', '.join(TRAVERSAL_ORDERS)}")
+    height, width, channels = image.shape
+    total = height * width
+    start, stop = max(0, min(start, total)), max(0, min(stop, total))
+    if stop <= start:
+        return image[:0, :0].reshape(0, channels)
+    # A reversed sequence is the forward one read backwards: take the mirrored range and flip it
+    reverse = order.endswith("_reversed")
+    if reverse:
+        start, stop = total - stop, total - start
+    # Column order is row order over the transposed image
+    grid = image if order.startswith("row") else image.transpose(1, 0, 2)
+    line = grid.shape[1]
+    first, last = start // line, -(-stop // line)
+    block = grid[first:last].reshape(-1, channels)[start - first * line:stop - first * line]
+    return block[::-1] if reverse else block
+
+
+def pixel_sequence(image: np.ndarray, count: int, order: str = "row") -> np.ndarray:
+    """The first `count` pixels of an (H, W, C) image in traversal order, as a (count, C) array."""
+    return pixel_range(image, 0, count, order)
+
+
+def channel_values(image: np.ndarray, channel_indices: Sequence[int], count: int, order: str = "row") -> np.ndarray:
+    """The first `count` selected channel values of the stream (fewer if the image runs out), as uint8."""
+    image, indices = _as_channels(image, channel_indices)
+    pixels = pixel_sequence(image, -(-count // max(1, len(indices))), order)
+    return pixels[:, indices].reshape(-1)[:count]
+
+
+def bit_shifts(bit_order: str, bits_per_channel: int) -> np.ndarray:
+    """Right shifts that bring each extracted bit of a channel value to position 0, in stream order."""
+    positions = np.arange(bits_per_channel, dtype=np.uint8)
+    return positions if bit_order == "LSB" else (7 - positions).astype(np.uint8)
+
+
+def values_to_bits(values: np.ndarray, bit_order: str, bits_per_channel: int) -> np.ndarray:
+    """Flat 0/1 uint8 array of the bits taken from every channel value, in stream order."""
+    if bits_per_channel == 1:
+        shift = 0 if bit_order == "LSB" else 7
+        return (values >> shift) & 1
+    return ((values[:, np.newaxis] >> bit_shifts(bit_order, bits_per_channel)) & 1).reshape(-1)
+
+
+def values_to_bytes(values: np.ndarray, bit_order: str, bits_per_channel: int) -> bytes:
+    if bits_per_channel == 8 and bit_order == "MSB":
+        # Bits 7..0 packed MSB first are the channel values themselves
+        return values.astype(np.uint8).tobytes()
+    return np.packbits(values_to_bits(values, bit_order, bits_per_channel)).tobytes()
+
+
+def bit_planes(pixels: np.ndarray) -> np.ndarray:
+    """All eight bit planes of a (N, C) pixel sequence, as a (N, C, 8) 0/1 array indexed by bit position."""
+    return (pixels[:, :, np.newaxis] >> np.arange(8, dtype=np.uint8)) & 1
+
+
+def planes_to_bytes(
+    planes: np.ndarray,
+    channel_indices: Sequence[int],
+    bit_order: str,
+    bits_per_channel: int,
+    max_bytes: int
+) -> bytes:
+    """
+    The first max_bytes of the stream extract_bytes would give, read from precomputed bit_planes()
+    of the pixel sequence instead of the image, so many parameter sets can share one pass.
+    """
+    bits = planes[:, list(channel_indices)][:, :, bit_shifts(bit_order, bits_per_channel)]
+    return np.packbits(bits.reshape(-1)[:max_bytes * 8]).tobytes()
+
+
+def extract_bytes(
+    image: np.ndarray,
+    channel_indices: Sequence[int],
+    bit_order: str = "LSB",
+    bits_per_channel: int = 1,
+    max_bytes: int = 1024 * 1024,
+    order: str = "row"
+) -> bytes:
+    """
+    Extract the LSB stream of an (H, W) or (H, W, C) uint8 image, stopping like the original
+    per-pixel loop: whole channel values are consumed until at least max_bytes * 8 bits are
+    collected, so with bits_per_channel not dividing 8 the result can be one (zero-padded)
+    byte longer than max_bytes.
+    """
+    needed_values = -(-max_bytes * 8 // bits_per_channel)
+    values = channel_values(image, channel_indices, needed_values, order)
+    return values_to_bytes(values, bit_order, bits_per_channel)
+
+
+
+def stream_size(image: np.ndarray, channel_indices: Sequence[int], bits_per_channel: int) -> int:
+    """Bytes in the full stream (the last one zero-padded when the bit count is not a multiple of 8)."""
+    return -(-image.shape[0] * image.shape[1] * len(channel_indices) * bits_per_channel // 8)
+
+
+def extract_range(
+    image: np.ndarray,
+    channel_indices: Sequence[int],
+    bit_order: str = "LSB",
+    bits_per_channel: int = 1,
+    offset: int = 0,
+    length: int = 4096,
+    order: str = "row"
+) -> bytes:
+    """
+    Bytes [offset, offset + length) of the stream extract_bytes reads, touching only the
+    pixels that hold them, so the cost depends on length and not on offset.
+    """
+    image, indices = _as_channels(image, channel_indices)
+    bits_per_pixel = len(indices) * bits_per_channel
+    first_bit, stop_bit = offset * 8, (offset + length) * 8
+    first_pixel = first_bit // bits_per_pixel
+    pixels = pixel_range(image, first_pixel, -(-stop_bit // bits_per_pixel), order)
+    bits = values_to_bits(pixels[:, indices].reshape(-1), bit_order, bits_per_channel)
+    skip = first_bit - first_pixel * bits_per_pixel
+    return np.packbits(bits[skip:skip + length * 8]).tobytes()
+
+
+class StreamPrefix:
+    """
+    The leading bytes of one LSB stream, extracted on demand. The cached prefix at least
+    doubles whenever a read needs more, so a sequence of growing reads (walking a header
+    chain, say) stays linear in the bytes finally used.
+    """
+
+    def __init__(
+        self,
+        image: np.ndarray,
+        channel_indices: Sequence[int],
+        bit_order: str = "LSB",
+        bits_per_channel: int = 1,
+        limit: int = 1024 * 1024,
+        order: str = "row"
+    ):
+        self.image = image
+        self.channel_indices = list(channel_indices)
+        self.bit_order = bit_order
+        self.bits_per_channel = bits_per_channel
+        self.order = order
+        pixels = image.shape[0] * image.shape[1]
+        # Whole bytes the image holds for these parameters, capped by the caller's limit
+        self.limit = min(limit, pixels * len(self.channel_indices) * bits_per_channel // 8)
+        self._data = b""
+
+    def read(self, n: int) -> bytes:
+        """The first n bytes of the stream (fewer past the limit)."""
+        n = min(n, self.limit)
+        if len(self._data) < n:
+            size = min(self.limit, max(n, 2 * len(self._data)))
+            self._data = extract_bytes(
+                self.image, self.channel_indices, self.bit_order, self.bits_per_channel, size, self.order
+            )[:size]
+        return self._data[:n]
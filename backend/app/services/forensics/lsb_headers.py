@@ -0,0 +1,121 @@
+"""
+LSB Payload Headers
+-------------------
+Payload sizes declared at the start of an extracted stream.
+
+Containers whose header gives their total size (BMP, RIFF, 7-Zip) or whose chunk
+layout does (PNG), and the length prefixes LSB embedding tools commonly write
+before the payload: a 32-bit big- or little-endian byte count, or a decimal count
+followed by ':' (as the stegano library does). A flat LSB plane reads as a small
+big-endian count (00 00 0x xx), so a prefix only counts when the bytes after it
+look like a payload.
+"""
+
+import struct
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from .lsb_sweep import score_header
+
+# A PNG walk stops here rather than chase an implausible chunk chain
+MAX_PNG_CHUNKS = 100000
+
+# Smallest payload a length prefix may declare
+MIN_DECLARED_BYTES = 8
+
+# Entropy, relative to the most the sample can have, from which a payload counts as
+# compressed or encrypted data (random samples of 12-1000 bytes stay above ~0.88)
+MIN_PAYLOAD_ENTROPY = 0.8
+
+
+def _png_length(read: Callable[[int], bytes], limit: int) -> Optional[int]:
+    """Walk the chunks after the signature up to IEND; None when the chain breaks or exceeds limit."""
+    position = 8
+    for _ in range(MAX_PNG_CHUNKS):
+        header = read(position + 8)[position:position + 8]
+        if len(header) < 8:
+            return None
+        length, chunk_type = struct.unpack(">I4s", header)
+        if not chunk_type.isalpha():
+            return None
+        position += 12 + length  # length, type, data, CRC
+        if position > limit:
+            return None
+        if chunk_type == b"IEND":
+            return position
+    return None
+
+
+def container_length(read: Callable[[int], bytes], limit: int) -> Optional[Dict[str, Any]]:
+    """
+    Total size of a container starting the stream, if its header declares one.
+
+    Args:
+        read: n -> the first n bytes of the stream (fewer if it is shorter)
+        limit: Largest plausible size (the stream capacity)
+
+    Returns:
+        {'type', 'declared_bytes'} or None
+    """
+    head = read(32)
+    length = None
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        container, length = "PNG", _png_length(read, limit)
+    elif head.startswith(b"BM") and len(head) >= 6:
+        container, length = "BMP", struct.unpack("<I", head[2:6])[0]
+    elif head.startswith(b"RIFF") and len(head) >= 8:
+        container, length = "RIFF", struct.unpack("<I", head[4:8])[0] + 8
+    elif head.startswith(b"7z\xbc\xaf\x27\x1c") and len(head) >= 32:
+        # Start header: next header offset and size, counted from the end of the 32-byte signature header
+        offset, size = struct.unpack("<QQ", head[12:28])
+        container, length = "7-Zip", 32 + offset + size
+
+    if length is None or not 0 < length <= limit:
+        return None
+    return {'type': container, 'declared_bytes': int(length)}
+
+
+def payload_check(sample: bytes, signatures: Dict[bytes, Dict]) -> Optional[str]:
+    """Why sample looks like the start of a payload (file signature, text, or compressed/encrypted data), or None."""
+    if len(sample) < 2:
+        return None
+    header = score_header(sample, signatures)
+    if header['signature']:
+        return f"{header['signature']} signature"
+    if header['printable_ratio'] > 0.7:  # Same threshold as LSBAnalyzer._try_decode_text
+        return 'text'
+    if header['entropy'] >= MIN_PAYLOAD_ENTROPY * np.log2(min(256, len(sample))):
+        return 'high entropy'
+    return None
+
+
+def length_prefix(
+    head: bytes,
+    limit: int,
+    signatures: Dict[bytes, Dict],
+    min_bytes: int = MIN_DECLARED_BYTES
+) -> Optional[Dict[str, Any]]:
+    """
+    A length prefix at the start of the stream declaring at least min_bytes, whose payload
+    fits in limit bytes and starts like one (payload_check on the rest of head).
+
+    Returns:
+        {'format', 'header_bytes', 'declared_bytes', 'payload_check'} (payload size, prefix
+        excluded) or None
+    """
+    candidates = []
+    colon = head.find(b":", 0, 11)
+    if colon > 0 and head[:colon].isdigit():
+        candidates.append(('decimal', colon + 1, int(head[:colon])))
+    if len(head) >= 4:
+        for fmt, code in (('u32be', '>I'), ('u32le', '<I')):
+            candidates.append((fmt, 4, struct.unpack(code, head[:4])[0]))
+
+    for fmt, header_bytes, declared in candidates:
+        if not min_bytes <= declared <= limit - header_bytes:
+            continue
+        check = payload_check(head[header_bytes:header_bytes + declared], signatures)
+        if check:
+            return {'format': fmt, 'header_bytes': header_bytes, 'declared_bytes': declared, 'payload_check': check}
+    return None
@@ -0,0 +1,112 @@
+"""
+LSB Parameter Sweep
+-------------------
+zsteg-style brute force over LSB extraction parameters.
+
+The image is decoded once and, per traversal order, the bit planes of just enough pixels
+for a short header are built once. The header of every channels x bits_per_channel x
+bit_order x order combination is read from those planes and scored on file signatures,
+printable-text ratio and entropy; only the best candidates are worth a full extraction.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .byte_stats import as_bytes_array, byte_histogram, shannon_entropy
+from .lsb_engine import TRAVERSAL_ORDERS, bit_planes, pixel_sequence, planes_to_bytes
+
+# The channel strings /lsb/extract accepts, so every candidate can be replayed there
+SWEEP_CHANNELS = ("R", "G", "B", "A", "RG", "RB", "GB", "RGB", "RGBA")
+SWEEP_BIT_ORDERS = ("LSB", "MSB")
+
+# Bytes counted as text: printable ASCII plus tab, newline and carriage return
+_PRINTABLE = np.zeros(256, dtype=bool)
+_PRINTABLE[0x20:0x7f] = True
+_PRINTABLE[[0x09, 0x0a, 0x0d]] = True
+
+
+def score_header(header: bytes, signatures: Dict[bytes, Dict]) -> Dict[str, Any]:
+    """
+    Score the first bytes of a candidate stream (higher is more promising):
+    50 for a known file signature, up to 40 for the printable-text ratio and up to 10
+    for low (but not constant) entropy. Random noise typically scores 15-20, text 40+.
+    """
+    if not header:
+        return {'score': 0.0, 'signature': None, 'printable_ratio': 0.0, 'entropy': 0.0}
+
+    values = as_bytes_array(header)
+    counts = byte_histogram(values)
+    entropy = shannon_entropy(counts)
+    printable_ratio = float(_PRINTABLE[values].mean())
+
+    signature = next((info['type'] for magic, info in signatures.items() if header.startswith(magic)), None)
+
+    score = 40.0 * printable_ratio
+    if signature:
+        score += 50.0
+    if np.count_nonzero(counts) > 1:
+        # Entropy relative to the most a header this short can have
+        score += 10.0 * (1.0 - entropy / np.log2(min(256, len(values))))
+
+    return {
+        'score': round(score, 2),
+        'signature': signature,
+        'printable_ratio': round(printable_ratio, 3),
+        'entropy': round(entropy, 3)
+    }
+
+
+def rank_candidates(
+    img_array: np.ndarray,
+    resolve_channels,
+    signatures: Dict[bytes, Dict],
+    header_bytes: int = 64,
+    orders: Sequence[str] = TRAVERSAL_ORDERS
+) -> List[Dict[str, Any]]:
+    """
+    Score the header of every parameter combination, best first.
+
+    Args:
+        img_array: (H, W) or (H, W, C) uint8 image
+        resolve_channels: channels string -> channel indices (LSBAnalyzer._parse_channels)
+        signatures: magic bytes -> file info (LSBAnalyzer.FILE_SIGNATURES)
+        header_bytes: Bytes of each candidate stream to score
+        orders: Traversal orders to try
+
+    Returns:
+        One entry per distinct header (combinations reading the same bytes are folded into
+        the first one, counted in 'equivalent_candidates'), with its extraction parameters
+        and header score
+    """
+    image = img_array if img_array.ndim == 3 else img_array[:, :, np.newaxis]
+    available = image.shape[2]
+
+    # Channel strings that fall back to the same indices (A or RGBA without alpha) are one candidate
+    channel_sets = {}
+    for channels in SWEEP_CHANNELS:
+        channel_sets.setdefault(tuple(resolve_channels(channels, available)), channels)
+
+    candidates = {}
+    for order in orders:
+        # One channel at one bit per value is the slowest stream: it bounds the pixels any header needs
+        planes = bit_planes(pixel_sequence(image, header_bytes * 8, order))
+        for indices, channels in channel_sets.items():
+            for bits_per_channel in range(1, 9):
+                for bit_order in SWEEP_BIT_ORDERS:
+                    header = planes_to_bytes(planes, indices, bit_order, bits_per_channel, header_bytes)
+                    if header in candidates:
+                        candidates[header]['equivalent_candidates'] += 1
+                        continue
+                    candidates[header] = {
+                        'channels': channels,
+                        'bit_order': bit_order,
+                        'bits_per_channel': bits_per_channel,
+                        'order': order,
+                        **score_header(header, signatures),
+                        'header_hex': header[:16].hex(' '),
+                        'header_text': ''.join(chr(b) if 0x20 <= b < 0x7f else '.' for b in header[:32]),
+                        'equivalent_candidates': 0
+                    }
+
+    return sorted(candidates.values(), key=lambda c: c['score'], reverse=True)
@@ -16,6 +16,8 @@ from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
 import logging
 
+from ...core.metrics import timed
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +50,7 @@ class MetadataExtractor:
         """Initialize metadata extractor with logging."""
         self.logger = logging.getLogger(self.__class__.__name__)
     
+    @timed("forensics_metadata")
     def extract(self, image_bytes: bytes) -> Dict[str, Any]:
         """
         Main extraction method with comprehensive error handling.
@@ -15,6 +15,8 @@ from collections import Counter
 from chardet import detect
 import logging
 
+from ...core.metrics import timed
+
 logger = logging.getLogger(__name__)
 
 
@@ -90,6 +92,7 @@ class StringExtractor:
         self.min_length = max(min_length, 1)
         self.logger = logging.getLogger(self.__class__.__name__)
     
+    @timed("forensics_strings")
     def extract(self, data: bytes, max_strings: int = 1000) -> Dict[str, Any]:
         """
         Main extraction method with comprehensive analysis.
@@ -9,6 +9,8 @@ import numpy as np
 from PIL import Image
 from typing import Dict, Any, List
 
+from ...core.metrics import timed
+
 
 class SuperimposedAnalyzer:
     """Analyzes images by superimposing different channels and bit planes"""
@@ -183,6 +185,7 @@ class SuperimposedAnalyzer:
         
         return Image.fromarray(colored, mode='RGB')
     
+    @timed("png_encode")
     def _image_to_base64(self, img: Image.Image) -> str:
         """Convert PIL Image to base64 string"""
         buffered = io.BytesIO()
@@ -192,6 +195,7 @@ class SuperimposedAnalyzer:
 
 
 # Standalone function for API
+@timed("forensics_superimposed")
 def analyze_superimposed(image_path: str, config: Dict[str, Any]) -> Dict[str, Any]:
     """
     Analyze image with superimposed channels/bitplanes
@@ -11,9 +11,12 @@ import io
 import base64
 import numpy as np
 from PIL import Image
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+from ...core.metrics import timed
+from .byte_stats import as_bytes_array, byte_histogram, shannon_entropy
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,10 +39,14 @@ class VisualAnalyzer:
     # Bit operations
     BIT_OPERATIONS = ['xor', 'add', 'sub', 'and', 'or']
     
+    # LSB pattern score above which a channel gets an "LSB Pattern Detected" finding
+    LSB_PATTERN_THRESHOLD = 0.3
+    
     def __init__(self):
         """Initialize visual analyzer with logging."""
         self.logger = logging.getLogger(self.__class__.__name__)
     
+    @timed("forensics_visual")
     def analyze(
         self, 
         image_bytes: bytes,
@@ -229,20 +236,20 @@ class VisualAnalyzer:
         
         # Grayscale
         if len(img_array.shape) == 2:
-            hist, _ = np.histogram(img_array, bins=256, range=(0, 256))
-            histograms['grayscale'] = hist.tolist()
+            histograms['grayscale'] = byte_histogram(as_bytes_array(img_array)).tolist()
             return histograms
         
         # Color channels
         num_channels = img_array.shape[2]
         channel_names = ['red', 'green', 'blue', 'alpha'][:num_channels]
         
+        hist_all = np.zeros(256, dtype=np.int64)
         for i, name in enumerate(channel_names):
-            hist, _ = np.histogram(img_array[:, :, i], bins=256, range=(0, 256))
+            hist = byte_histogram(as_bytes_array(img_array[:, :, i]))
             histograms[name] = hist.tolist()
+            hist_all += hist
         
-        # Combined histogram
-        hist_all, _ = np.histogram(img_array.flatten(), bins=256, range=(0, 256))
+        # Combined histogram (the sum of the channel histograms)
         histograms['combined'] = hist_all.tolist()
         
         return histograms
@@ -275,9 +282,12 @@ class VisualAnalyzer:
             ]
         
         for channel_name, channel_data in channels_to_analyze:
+            # One histogram per channel, shared by the LSB and channel entropy
+            hist = byte_histogram(as_bytes_array(channel_data))
+            lsb_metrics = self.lsb_plane_metrics(channel_data, hist)
+            
             # 1. LSB entropy analysis
-            lsb = channel_data & 1
-            lsb_entropy = self._calculate_entropy(lsb)
+            lsb_entropy = lsb_metrics['lsb_entropy']
             metrics[f'{channel_name}_lsb_entropy'] = round(lsb_entropy, 4)
             
             # High LSB entropy suggests hidden data
@@ -292,14 +302,14 @@ class VisualAnalyzer:
                 })
             
             # 2. Channel entropy
-            channel_entropy = self._calculate_entropy(channel_data)
+            channel_entropy = self._histogram_entropy(hist)
             metrics[f'{channel_name}_entropy'] = round(channel_entropy, 4)
             
             # 3. LSB pattern detection (simple visual pattern)
-            lsb_pattern_score = self._detect_lsb_pattern(lsb)
+            lsb_pattern_score = lsb_metrics['lsb_pattern']
             metrics[f'{channel_name}_lsb_pattern'] = round(lsb_pattern_score, 4)
             
-            if lsb_pattern_score > 0.3:
+            if lsb_pattern_score > self.LSB_PATTERN_THRESHOLD:
                 findings.append({
                     'type': 'LSB Pattern Detected',
                     'severity': 'medium',
@@ -341,6 +351,25 @@ class VisualAnalyzer:
             'overall_suspicious': len([f for f in findings if f['severity'] == 'high']) > 0
         }
     
+    def lsb_plane_metrics(self, channel_data: np.ndarray, hist: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        LSB entropy (bits, 0-1) and pattern score (0-1) of one uint8 channel.
+        
+        Args:
+            channel_data: 2D uint8 channel
+            hist: Its byte histogram, if already computed (the LSB plane's
+                histogram is the channel's even/odd value counts)
+            
+        Returns:
+            Dictionary with 'lsb_entropy' and 'lsb_pattern'
+        """
+        if hist is None:
+            hist = byte_histogram(as_bytes_array(channel_data))
+        return {
+            'lsb_entropy': shannon_entropy(np.array([hist[0::2].sum(), hist[1::2].sum()])),
+            'lsb_pattern': self._detect_lsb_pattern(channel_data & 1)
+        }
+    
     def _calculate_entropy(self, data: np.ndarray) -> float:
         """
         Calculate Shannon entropy of data.
@@ -353,20 +382,14 @@ class VisualAnalyzer:
         Returns:
             Entropy value
         """
-        # Flatten array
-        flat_data = data.flatten()
-        
-        # Calculate histogram
-        hist, _ = np.histogram(flat_data, bins=np.arange(257), density=True)
-        
-        # Remove zeros
-        hist = hist[hist > 0]
-        
-        # Calculate entropy
-        entropy = -np.sum(hist * np.log2(hist + 1e-10))
+        return self._histogram_entropy(byte_histogram(as_bytes_array(data)))
+    
+    def _histogram_entropy(self, hist: np.ndarray) -> float:
+        """Entropy of a value histogram: in bits for binary data, else normalized by 8 bits."""
+        entropy = shannon_entropy(hist)
         
         # Normalize to 0-1 range for bit data
-        if data.max() <= 1:
+        if not hist[2:].any():
             return entropy  # Already 0-1
         else:
             return entropy / 8.0  # Normalize byte entropy
@@ -381,6 +404,9 @@ class VisualAnalyzer:
         Returns:
             Pattern score (0-1)
         """
+        # Signed plane: np.diff on uint8 would wrap 1 -> 0 transitions around to 255
+        lsb = lsb.astype(np.int8)
+        
         # Count transitions (0->1 or 1->0) in rows
         row_transitions = np.sum(np.abs(np.diff(lsb, axis=1)))
         
@@ -398,6 +424,7 @@ class VisualAnalyzer:
         
         return min(pattern_score, 1.0)
     
+    @timed("png_encode")
     def _array_to_base64(self, array: np.ndarray) -> str:
         """
         Convert numpy array to base64-encoded PNG image.
@@ -0,0 +1,198 @@
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+# Weights tf.image.rgb_to_grayscale applies to R, G, B
+GRAYSCALE_WEIGHTS = np.array([0.2989, 0.5870, 0.1140], dtype=np.float32)
+GRAYSCALE_LAYER = "To_Grayscale"
+SRM_FILTER_LAYER = "SRM_Filter_Bank"
+
+_CONV_TYPES = (tf.keras.layers.Conv2D, tf.keras.layers.DepthwiseConv2D)
+
+
+def _producer(layer):
+    """The single layer feeding `layer`, or None."""
+    nodes = getattr(layer, "_inbound_nodes", [])
+    if len(nodes) != 1 or len(nodes[0].parent_nodes) != 1:
+        return None
+    return nodes[0].parent_nodes[0].operation
+
+
+def _is_linear(layer) -> bool:
+    return getattr(layer.activation, "__name__", "") == "linear"
+
+
+def _fold_batchnorm(conv, bn) -> list:
+    """Conv (+bias) followed by inference-mode BN -> one conv: W' = W * s, b' = (b - mean) * s + beta, s = gamma / sqrt(var + eps)."""
+    kernel = conv.kernel.numpy()
+    bias = conv.bias.numpy() if conv.use_bias else 0.0
+    gamma = bn.gamma.numpy() if bn.scale else 1.0
+    beta = bn.beta.numpy() if bn.center else 0.0
+    scale = gamma / np.sqrt(bn.moving_variance.numpy() + bn.epsilon)
+
+    if isinstance(conv, tf.keras.layers.DepthwiseConv2D):
+        # kernel (kh, kw, in, multiplier); output channel c * multiplier + m
+        kernel = kernel * scale.reshape(kernel.shape[2], kernel.shape[3])
+    else:
+        kernel = kernel * scale
+    new_bias = (bias - bn.moving_mean.numpy()) * scale + beta
+    return [kernel.astype(np.float32), np.asarray(new_bias, dtype=np.float32)]
+
+
+class _Plan:
+    def __init__(self):
+        self.fold: Dict[int, list] = {}      # id(conv) -> folded [kernel, bias]
+        self.remove: Dict[int, str] = {}     # id(layer) -> why it becomes an identity
+        self.counts = {"folded_batchnorm": 0, "removed_dropout": 0, "folded_grayscale": 0}
+
+
+def _plan(model, plan: _Plan):
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.Model):
+            _plan(layer, plan)
+            continue
+
+        if isinstance(layer, tf.keras.layers.Dropout):
+            plan.remove[id(layer)] = "dropout"
+            plan.counts["removed_dropout"] += 1
+
+        elif isinstance(layer, tf.keras.layers.BatchNormalization):
+            conv = _producer(layer)
+            axis = layer.axis if isinstance(layer.axis, int) else (layer.axis[0] if len(layer.axis) == 1 else None)
+            if (
+                isinstance(conv, _CONV_TYPES)
+                and _is_linear(conv)
+                and len(conv._outbound_nodes) == 1
+                and axis in (-1, 3)
+                and id(conv) not in plan.fold
+            ):
+                plan.fold[id(conv)] = _fold_batchnorm(conv, layer)
+                plan.remove[id(layer)] = "batchnorm"
+                plan.counts["folded_batchnorm"] += 1
+
+        elif layer.name == SRM_FILTER_LAYER and isinstance(layer, tf.keras.layers.Conv2D):
+            gray = _producer(layer)
+            if (
+                gray is not None
+                and gray.name == GRAYSCALE_LAYER
+                and len(gray._outbound_nodes) == 1
+                and layer.kernel.shape[2] == 1
+            ):
+                # conv(gray(x), K) == conv(x, K * w_c) per input channel c: grayscale is linear
+                kernel = layer.kernel.numpy()
+                folded = kernel * GRAYSCALE_WEIGHTS.reshape(1, 1, 3, 1)
+                bias = layer.bias.numpy() if layer.use_bias else np.zeros(kernel.shape[-1], np.float32)
+                plan.fold[id(layer)] = [folded.astype(np.float32), bias.astype(np.float32)]
+                plan.remove[id(gray)] = "grayscale"
+                plan.counts["folded_grayscale"] += 1
+
+
+def _rewrite(model, plan: _Plan):
+    new_weights = []
+
+    def clone_function(layer):
+        if id(layer) in plan.remove:
+            return tf.keras.layers.Identity(name=layer.name)
+        if id(layer) in plan.fold:
+            config = layer.get_config()
+            config["use_bias"] = True
+            # The SRM initializer always returns a (5, 5, 1, 30) tensor; the folded weights are set below
+            for key in ("kernel_initializer", "depthwise_initializer", "bias_initializer"):
+                if key in config:
+                    config[key] = "zeros"
+            clone = layer.__class__.from_config(config)
+            new_weights.append((clone, plan.fold[id(layer)]))
+            return clone
+        # A fresh copy rather than the source layer: shared layers get a second inbound node,
+        # which makes layer.output ambiguous for later graph surgery (see srm_frontend)
+        clone = layer.__class__.from_config(layer.get_config())
+        if layer.weights:
+            new_weights.append((clone, layer.get_weights()))
+        return clone
+
+    def call_function(layer, *args, **kwargs):
+        # Functional graphs skip removed layers entirely instead of calling an identity
+        if id(layer) in removed_clones:
+            return args[0]
+        return layer(*args, **kwargs)
+
+    removed_clones = set()
+
+    def tracked_clone_function(layer):
+        clone = clone_function(layer)
+        if id(layer) in plan.remove:
+            removed_clones.add(id(clone))
+        return clone
+
+    # Sequential models do not accept call_function; their removed layers stay as identities
+    functional = not isinstance(model, tf.keras.Sequential)
+    optimized = tf.keras.models.clone_model(
+        model,
+        clone_function=tracked_clone_function,
+        call_function=call_function if functional else None,
+        recursive=True
+    )
+    for layer, weights in new_weights:
+        layer.set_weights(weights)
+    return optimized
+
+
+def optimize_for_inference(
+    model,
+    input_shape: tuple = (224, 224),
+    atol: float = 1e-4,
+    verify: bool = True
+) -> Tuple[object, Dict]:
+    """
+    Rewrite a loaded model into an inference-only graph:
+
+    - BatchNormalization right after a linear Conv2D / DepthwiseConv2D (Normalize_Noise_Stream
+      after SRM_to_RGB_Bottleneck, every conv+BN pair inside the backbones) is folded into
+      that convolution's kernel and bias
+    - Dropout (Head_Dropout) is removed
+    - To_Grayscale is folded into the frozen SRM_Filter_Bank kernel, which becomes a 3-channel conv
+
+    Removed layers are skipped in functional graphs (Sequential models keep them as identities,
+    which tf.function graph optimization prunes). The result is checked against the source model on
+    random images; if any output differs by more than atol the source model is returned
+    unchanged. Returns (model, report).
+    """
+    report = {"applied": False, "max_abs_diff": None, "reason": None}
+    started = time.perf_counter()
+    try:
+        plan = _Plan()
+        _plan(model, plan)
+        report.update(plan.counts)
+        if not plan.fold and not plan.remove:
+            report["reason"] = "nothing to optimize"
+            return model, report
+        optimized = _rewrite(model, plan)
+    except Exception as e:
+        report["reason"] = f"rewrite failed: {str(e)[:300]}"
+        print(f"[WARN] Graph optimization of {model.name} failed, serving the original graph: {str(e)[:200]}")
+        return model, report
+
+    if verify:
+        height, width = input_shape[:2]
+        rng = np.random.default_rng(0)
+        sample = np.concatenate([
+            np.zeros((1, height, width, 3), dtype=np.float32),
+            rng.uniform(0, 255, (3, height, width, 3)).astype(np.float32)
+        ])
+        expected = model(sample, training=False).numpy()
+        actual = optimized(sample, training=False).numpy()
+        report["max_abs_diff"] = float(np.max(np.abs(actual - expected)))
+        if report["max_abs_diff"] > atol:
+            report["reason"] = f"max |diff| {report['max_abs_diff']:.2e} > {atol:.0e}"
+            print(f"[WARN] Optimized graph of {model.name} is not equivalent ({report['reason']}), serving the original graph")
+            return model, report
+
+    report["applied"] = True
+    report["optimize_seconds"] = round(time.perf_counter() - started, 3)
+    print(
+        f"[INFO] Optimized {model.name}: folded {plan.counts['folded_batchnorm']} BatchNorm, "
+        f"removed {plan.counts['removed_dropout']} Dropout, folded grayscale into SRM: {bool(plan.counts['folded_grayscale'])}"
+    )
+    return optimized, report
@@ -1,10 +1,115 @@
 import numpy as np
-from PIL import Image
+from PIL import Image, JpegImagePlugin
 import io
-import tensorflow as tf
 from ..core.config import settings
+from ..core.metrics import timed
+
+# Pillow modes whose conversion to 8-bit RGB differs from tf.io.decode_image (16-bit / float PNG, TIFF)
+_TF_ONLY_MODES = ("I", "I;16", "I;16B", "I;16L", "I;16N", "F")
+
+
+def decode_rgb(image_bytes: bytes) -> np.ndarray:
+    """
+    Decode with Pillow to an (H, W, 3) uint8 array, like tf.io.decode_image(channels=3,
+    expand_animations=False): first frame only, grayscale replicated to 3 channels, alpha
+    dropped (not composited). High bit-depth images go through TensorFlow, which rescales them.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if img.format == "JPEG" and (img.layers == 1 or JpegImagePlugin.get_sampling(img) == 0):
+            # TF decodes JPEGs with libjpeg's fast integer IDCT, which Pillow only uses in draft
+            # mode (decoder config (scale, draft)). Draft mode also turns off fancy chroma
+            # upsampling, so it only reproduces TF bit for bit when there is no chroma subsampling;
+            # subsampled JPEGs keep Pillow's accurate IDCT, within a few levels of TF.
+            img.decoderconfig = (1, 1)
+        if img.mode in _TF_ONLY_MODES:
+            import tensorflow as tf
+            return tf.io.decode_image(image_bytes, channels=3, expand_animations=False).numpy()
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        return np.asarray(img)
+
+
+def decode_reduced(image_bytes: bytes, height: int, width: int, oversample: int = 2) -> np.ndarray:
+    """
+    Decode to an (h, w, 3) uint8 array only about `oversample` times larger than (height, width)
+    instead of full resolution. JPEGs are downscaled in the DCT domain while decoding (Pillow
+    draft: 1/2, 1/4 or 1/8); other formats are decoded fully and then box-reduced by an integer
+    factor. The result is never smaller than oversample * (height, width) unless the image is.
+
+    Approximates the exact path (which point-samples the full-resolution image), so scores
+    drift; see backend/benchmarks/bench_fast_decode.py.
+    """
+    want_width, want_height = width * max(1, oversample), height * max(1, oversample)
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if img.mode in _TF_ONLY_MODES:
+            image = decode_rgb(image_bytes)
+            factor = min(image.shape[1] // want_width, image.shape[0] // want_height)
+            return np.asarray(Image.fromarray(image).reduce(factor)) if factor >= 2 else image
+        if img.format == "JPEG":
+            img.draft("RGB", (want_width, want_height))
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        factor = min(img.width // want_width, img.height // want_height)
+        if factor >= 2:
+            img = img.reduce(factor)
+        return np.asarray(img)
+
+
+def _interpolation_weights(in_size: int, out_size: int):
+    """Source rows/columns and lerp weights of TF's half-pixel-centers bilinear resize, in float32 like the kernel."""
+    scale = np.float32(in_size) / np.float32(out_size)
+    source = (np.arange(out_size, dtype=np.float32) + np.float32(0.5)) * scale - np.float32(0.5)
+    floor = np.floor(source)
+    lower = np.maximum(floor, 0).astype(np.intp)
+    upper = np.minimum(np.ceil(source), in_size - 1).astype(np.intp)
+    return lower, upper, (source - floor).astype(np.float32)
+
+
+def resize_bilinear(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    """
+    NumPy port of tf.image.resize(image, (height, width)) with the default bilinear method
+    (antialias=False, half_pixel_centers=True) for an (H, W, C) image. Returns float32.
+
+    Only the needed source rows and columns are gathered (on the flattened (H, W * C) view,
+    which is much faster than fancy indexing a 3-D array) and cast, then each output pixel
+    is computed with the kernel's formula and operation order:
+        top = tl + (tr - tl) * x_lerp, bottom = bl + (br - bl) * x_lerp, out = top + (bottom - top) * y_lerp
+    """
+    in_height, in_width, channels = image.shape
+    if (in_height, in_width) == (height, width):
+        # Every lerp is 0 and every sample lands on a source pixel
+        return image.astype(np.float32)
+
+    y_lower, y_upper, y_lerp = _interpolation_weights(in_height, height)
+    x_lower, x_upper, x_lerp = _interpolation_weights(in_width, width)
+    channel = np.arange(channels)
+    left = (x_lower[:, None] * channels + channel).ravel()
+    right = (x_upper[:, None] * channels + channel).ravel()
+    x_lerp = np.repeat(x_lerp, channels)
+
+    flat = image.reshape(in_height, in_width * channels)
+    top_rows = np.take(flat, y_lower, axis=0)
+    bottom_rows = np.take(flat, y_upper, axis=0)
+    top_left = np.take(top_rows, left, axis=1).astype(np.float32)
+    top_right = np.take(top_rows, right, axis=1).astype(np.float32)
+    bottom_left = np.take(bottom_rows, left, axis=1).astype(np.float32)
+    bottom_right = np.take(bottom_rows, right, axis=1).astype(np.float32)
+
+    top = top_left + (top_right - top_left) * x_lerp
+    bottom = bottom_left + (bottom_right - bottom_left) * x_lerp
+    return (top + (bottom - top) * y_lerp[:, None]).reshape(height, width, channels)
+
 
 class ImagePreprocessor:
+    @staticmethod
+    @timed("decode")
+    def decode(image_bytes: bytes) -> np.ndarray:
+        """Decode to a native-resolution (H, W, 3) uint8 array, the same decode preprocess() starts from."""
+        if settings.PREPROCESS_BACKEND == "numpy":
+            return decode_rgb(image_bytes)
+        import tensorflow as tf
+        return tf.io.decode_image(image_bytes, channels=3, expand_animations=False).numpy()
+
     @staticmethod
     def preprocess(image_bytes: bytes) -> np.ndarray:
         """
@@ -20,17 +125,50 @@ class ImagePreprocessor:
         
         KEY: TFRecord stores RAW image bytes (no pre-resize).
         resize() is applied at training load time - must match here.
+
+        PREPROCESS_BACKEND="numpy" runs the same steps with Pillow + resize_bilinear and never
+        imports TensorFlow (checked against this path by backend/tests/test_preprocessing_parity.py).
         """
+        if settings.PREPROCESS_BACKEND == "numpy":
+            with timed("decode"):
+                img = decode_rgb(image_bytes)
+            return ImagePreprocessor.prepare(img)
+
+        import tensorflow as tf
         # Decode (Auto-detects format: BMP, GIF, JPEG, PNG)
-        img = tf.io.decode_image(image_bytes, channels=3, expand_animations=False)
-        
+        with timed("decode"):
+            img = tf.io.decode_image(image_bytes, channels=3, expand_animations=False)
+        return ImagePreprocessor.prepare(img)
+
+    @staticmethod
+    def preprocess_fast(image_bytes: bytes) -> np.ndarray:
+        """
+        Opt-in approximation of preprocess() for bulk triage: decode_reduced() to about
+        PREPROCESS_FAST_DECODE_OVERSAMPLE x the model input, then the same bilinear resize.
+        A 24 MP JPEG never exists at full resolution. Scores drift from the exact path.
+        """
+        target_height, target_width = settings.MODEL_INPUT_SHAPE[:2]
+        with timed("decode"):
+            image = decode_reduced(image_bytes, target_height, target_width, settings.PREPROCESS_FAST_DECODE_OVERSAMPLE)
+        with timed("preprocess"):
+            return resize_bilinear(image, target_height, target_width)[np.newaxis]
+
+    @staticmethod
+    @timed("preprocess")
+    def prepare(img) -> np.ndarray:
+        """Steps 2-5 of preprocess() on an already decoded (H, W, 3) uint8 image (tensor or array)."""
+        target_height, target_width = settings.MODEL_INPUT_SHAPE[:2]
+        if settings.PREPROCESS_BACKEND == "numpy":
+            resized = resize_bilinear(np.asarray(img), target_height, target_width)
+            return resized[np.newaxis]
+
+        import tensorflow as tf
         # Cast to float32 [0-255] - matches: tf.cast(image, tf.float32)
         img = tf.cast(img, tf.float32)
         
         # EXACT MATCH with training: tf.image.resize(image, img_size)
         # img_size = (224, 224), default method = bilinear
         # DO NOT use resize_with_crop_or_pad - that was a mistake!
-        target_height, target_width = settings.MODEL_INPUT_SHAPE[:2]
         img = tf.image.resize(img, [target_height, target_width])
         
         # ensure_shape equivalent: shape is now fixed (224, 224, 3)
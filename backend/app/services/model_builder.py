@@ -1,5 +1,6 @@
 import tensorflow as tf
 import numpy as np
+from .artifact_cache import LoadArtifactCache, file_sha256
 
 @tf.keras.utils.register_keras_serializable()
 class SRMFilterInitializer(tf.keras.initializers.Initializer):
@@ -198,12 +199,41 @@ def build_baseline_cnn_model():
     ], name='Baseline_CNN')
     return model
 
-def load_model_with_reconstruction(model_path: str):
+# Architecture keys matched against the model filename, in priority order
+MODEL_BUILDERS = [
+    ('MobileNetV2_HPF_Enabled', build_mobilenetv2_hpf_model),
+    ('MobileNetV2_HPF_Disabled', build_mobilenetv2_no_hpf_model),
+    ('VGG16', build_vgg16_hpf_model),
+    ('ResNet50', build_resnet50_hpf_model),
+    ('Baseline_CNN', build_baseline_cnn_model),
+]
+
+def select_builder(model_path: str):
+    """Return (builder_key, builder_fn) for the architecture named in model_path."""
+    for key, builder in MODEL_BUILDERS:
+        if key in model_path:
+            return key, builder
+    raise ValueError(f"Unknown model type for {model_path}")
+
+def _compile_for_training(model):
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+
+def load_model_with_reconstruction(
+    model_path: str,
+    artifact_cache: LoadArtifactCache = None,
+    compile_model: bool = False
+):
     """
     Robust model loading with comprehensive custom object support.
     Handles Lambda layers (preprocess_input) and custom layers (SRM/TLU).
     Prioritizes Direct Load, falls back to Reconstruction only if strictly necessary.
     Uses ASCII logging safe for Windows consoles.
+
+    With an artifact_cache, the strategy that worked is remembered per model file hash:
+    later loads go straight to it and skip the attempts that are known to fail (graphs that
+    only loaded by_name get a cached weights file that then matches strictly). A direct load
+    is only remembered, not cached: it still reads the whole .keras file. compile() is only
+    needed for training and is skipped unless compile_model=True.
     """
     import logging
     from tensorflow.keras.applications import mobilenet_v2, vgg16, resnet50
@@ -244,6 +274,34 @@ def load_model_with_reconstruction(model_path: str):
 
     print(f"[INFO] Loading model from {model_path}...")
 
+    digest = file_sha256(model_path) if artifact_cache is not None else None
+    manifest = artifact_cache.lookup(digest) if artifact_cache is not None else None
+    if manifest:
+        try:
+            if manifest['strategy'] == 'direct':
+                model = tf.keras.models.load_model(model_path, custom_objects=custom_objects, compile=False)
+            else:
+                model = dict(MODEL_BUILDERS)[manifest['builder']]()
+                if manifest.get('weights_file'):
+                    model.load_weights(str(artifact_cache.weights_path(digest)))
+                else:
+                    model.load_weights(model_path, skip_mismatch=False)
+            print(f"[INFO] [ARTIFACT CACHE] Success! Reused '{manifest['strategy']}' strategy.")
+            if compile_model:
+                _compile_for_training(model)
+            return model
+        except Exception as e:
+            print(f"[WARN] Cached load artifact unusable, doing a full load. Error: {str(e)[:200]}")
+            artifact_cache.invalidate(digest)
+
+    def remember(strategy, builder_key=None, model=None):
+        if artifact_cache is None:
+            return
+        try:
+            artifact_cache.record(digest, strategy, builder=builder_key, model=model, source=str(model_path))
+        except Exception as e:
+            print(f"[WARN] Could not write load artifact: {str(e)[:200]}")
+
     # 3. Attempt Direct Load (Primary Strategy)
     # Direct load is safest as it preserves the exact saved architecture (e.g. Rescaling layers)
     try:
@@ -254,9 +312,10 @@ def load_model_with_reconstruction(model_path: str):
         )
         print("[INFO] [DIRECT LOAD] Success!")
         
-        # Re-compile with a standard optimizer to ensure model is usable
-        # This fixes issues where saved optimizer config is incompatible
-        model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+        # Re-compile with a standard optimizer only when training; inference never needs it
+        # (this used to fix issues where saved optimizer config is incompatible)
+        if compile_model:
+            _compile_for_training(model)
         
         # Quick sanity check for Baseline CNN
         if 'Baseline_CNN' in model_path:
@@ -267,6 +326,7 @@ def load_model_with_reconstruction(model_path: str):
              else:
                  print("   -> WARNING: Rescaling layer MISSING. Predictions may be incorrect.")
 
+        remember('direct')
         return model
         
     except Exception as e:
@@ -276,18 +336,8 @@ def load_model_with_reconstruction(model_path: str):
     # 4. Fallback: Reconstruction (Secondary Strategy)
     # Only use if Direct Load fails (e.g. strict serialization issues)
     try:
-        if 'MobileNetV2_HPF_Enabled' in model_path:
-            new_model = build_mobilenetv2_hpf_model()
-        elif 'MobileNetV2_HPF_Disabled' in model_path:
-            new_model = build_mobilenetv2_no_hpf_model()
-        elif 'VGG16' in model_path:
-            new_model = build_vgg16_hpf_model()
-        elif 'ResNet50' in model_path:
-            new_model = build_resnet50_hpf_model()
-        elif 'Baseline_CNN' in model_path:
-            new_model = build_baseline_cnn_model()
-        else:
-            raise ValueError(f"Unknown model type for {model_path}")
+        builder_key, builder = select_builder(model_path)
+        new_model = builder()
 
         # 5. STRICT Weights Loading
         # CRITICAL: Do NOT use by_name=True blindly. It hides architecture mismatches.
@@ -297,8 +347,9 @@ def load_model_with_reconstruction(model_path: str):
             new_model.load_weights(model_path, skip_mismatch=False)
             print("[INFO] [RECONSTRUCTION] Success! Weights loaded strictly.")
             
-            # Compile new model
-            new_model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+            if compile_model:
+                _compile_for_training(new_model)
+            remember('reconstruction', builder_key)
             return new_model
             
         except Exception as w_e:
@@ -308,8 +359,9 @@ def load_model_with_reconstruction(model_path: str):
             new_model.load_weights(model_path, by_name=True)
             print("[WARN] [WARNING] Loaded with by_name=True. Validate predictions carefully!")
             
-            # Compile new model
-            new_model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+            if compile_model:
+                _compile_for_training(new_model)
+            remember('reconstruction_by_name', builder_key, new_model)
             return new_model
 
     except Exception as build_e:
@@ -0,0 +1,152 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def measure_model_footprint(model: Any) -> int:
+    """Bytes held by a loaded model's variables (weights, BN statistics, frozen SRM kernels)."""
+    if hasattr(model, "footprint_bytes"):
+        # Non-Keras backends (TFLite) report their own size
+        return int(model.footprint_bytes)
+    total = 0
+    for variable in getattr(model, "weights", []):
+        dtype = getattr(variable.dtype, "name", variable.dtype)
+        total += int(np.prod(variable.shape)) * np.dtype(dtype).itemsize
+    return total
+
+
+def read_rss_bytes(pid="self") -> int:
+    """Resident set size of this process (or of another one by pid), or 0 where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        return 0
+
+
+class ModelCache:
+    """
+    LRU cache of loaded models bounded by a memory budget.
+
+    Every entry records the footprint measured when the model was loaded. Inserting a
+    model evicts least-recently-used, unpinned entries until the budget is respected.
+    A model larger than the whole budget is still admitted (it is needed to serve the
+    request), after every other unpinned model has been evicted.
+    """
+
+    def __init__(self, budget_bytes: int, pinned: Iterable[str] = ()):
+        self.budget_bytes = budget_bytes
+        self.pinned = set(p for p in pinned if p)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return the model and mark it most recently used, or None if not resident."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            self._entries.move_to_end(name)
+            entry["last_used"] = time.time()
+            return entry["model"]
+
+    def __getitem__(self, name: str) -> Any:
+        model = self.get(name)
+        if model is None:
+            raise KeyError(name)
+        return model
+
+    def info(self, name: str) -> Optional[Dict[str, Any]]:
+        """Metadata recorded with a resident model (without the model itself), or None. Does not touch LRU order."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            return {k: v for k, v in entry.items() if k != "model"}
+
+    @property
+    def used_bytes(self) -> int:
+        with self._lock:
+            return sum(e["footprint_bytes"] for e in self._entries.values())
+
+    def put(self, name: str, model: Any, footprint_bytes: int, **info) -> List[str]:
+        """Insert a model, evicting LRU entries as needed. Returns the names that were evicted."""
+        with self._lock:
+            self._entries.pop(name, None)
+            evicted = self._make_room(footprint_bytes)
+            now = time.time()
+            self._entries[name] = {
+                "model": model,
+                "footprint_bytes": footprint_bytes,
+                "loaded_at": now,
+                "last_used": now,
+                **info
+            }
+        if evicted:
+            gc.collect()
+        return evicted
+
+    def _make_room(self, incoming_bytes: int) -> List[str]:
+        evicted = []
+        for name in list(self._entries.keys()):
+            if self.used_bytes + incoming_bytes <= self.budget_bytes:
+                break
+            if name in self.pinned:
+                continue
+            del self._entries[name]
+            evicted.append(name)
+            self.evictions += 1
+        return evicted
+
+    def evict(self, name: str) -> bool:
+        with self._lock:
+            removed = self._entries.pop(name, None) is not None
+            if removed:
+                self.evictions += 1
+        if removed:
+            gc.collect()
+        return removed
+
+    def pin(self, name: str):
+        with self._lock:
+            self.pinned.add(name)
+
+    def unpin(self, name: str):
+        with self._lock:
+            self.pinned.discard(name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Resident models (least recently used first) with their measured sizes."""
+        with self._lock:
+            models = [
+                {
+                    "name": name,
+                    "footprint_bytes": e["footprint_bytes"],
+                    "footprint_mb": round(e["footprint_bytes"] / (1024 * 1024), 2),
+                    "pinned": name in self.pinned,
+                    **{k: v for k, v in e.items() if k not in ("model", "footprint_bytes")}
+                }
+                for name, e in self._entries.items()
+            ]
+            used = sum(m["footprint_bytes"] for m in models)
+            return {
+                "budget_mb": round(self.budget_bytes / (1024 * 1024), 2),
+                "used_mb": round(used / (1024 * 1024), 2),
+                "evictions": self.evictions,
+                "pinned": sorted(self.pinned),
+                "models": models
+            }
@@ -1,11 +1,29 @@
 import tensorflow as tf
 import numpy as np
 import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from ..core.config import settings
+from ..core.execution import execution, PoolSaturatedError
+from ..core.metrics import timed
 from .image_processing import ImagePreprocessor
 from .model_builder import load_model_with_reconstruction
+from .artifact_cache import LoadArtifactCache, file_sha256
+from .compiled_inference import CompiledModel
+from .graph_optimizer import optimize_for_inference
+from .tflite_backend import TFLiteModel
+from .onnx_backend import ONNXModel
+from .model_cache import ModelCache, measure_model_footprint, read_rss_bytes
+from .prediction_cache import PredictionCache
+from .cascade import CascadeStats, lsb_screen, stage1_decides
+from .ensemble import combine_scores, confident_agreement, parse_members
+from .srm_frontend import SplitHPFModel, split_hpf_model
+from .tiling import aggregate_scores, build_heatmap, describe_grid, iter_patch_batches, sample_tiles, tile_grid
 
 # Enable unsafe deserialization to allow loading models with Lambda layers/custom functions
 try:
@@ -13,9 +31,153 @@ try:
 except AttributeError:
     pass
 
+class MicroBatcher:
+    """
+    Collects concurrent single-image requests for one model into batched forward passes.
+
+    A worker thread takes the first queued request, then keeps draining the queue until
+    either max_batch_size requests are collected or max_wait_ms has passed since that
+    first request arrived. The whole batch runs through predict_fn once and every caller
+    gets its own score back through a Future.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        model=None
+    ):
+        self.model_name = model_name
+        self.predict_fn = predict_fn
+        # Model object predict_fn is bound to, so a reloaded model gets a fresh batcher
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Dict[int, int] = {}
+        self._recent_waits: deque = deque(maxlen=1024)
+        self._total_requests = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run, name=f"batcher-{model_name}", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, image: np.ndarray) -> Future:
+        """Queue one preprocessed (1, H, W, C) tensor; the Future resolves to its raw score."""
+        if self._closed:
+            raise RuntimeError(f"Batcher for {self.model_name} is closed")
+        future: Future = Future()
+        self._queue.put((image, future, time.perf_counter()))
+        return future
+
+    def close(self):
+        """Stop the worker after the requests already queued have been served."""
+        self._closed = True
+        self._queue.put(None)
+
+    def _collect(self) -> List[tuple]:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-post the sentinel so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+
+            started = time.perf_counter()
+            self._record(len(batch), [started - enqueued for _, _, enqueued in batch])
+
+            try:
+                scores = self.predict_fn(np.concatenate([img for img, _, _ in batch], axis=0))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), score in zip(batch, scores):
+                future.set_result(float(score))
+
+    def _record(self, batch_size: int, waits: List[float]):
+        with self._stats_lock:
+            self._batch_sizes[batch_size] = self._batch_sizes.get(batch_size, 0) + 1
+            self._total_requests += batch_size
+            self._total_wait += sum(waits)
+            self._max_wait_seen = max(self._max_wait_seen, max(waits))
+            self._recent_waits.extend(waits)
+
+    def stats(self) -> Dict:
+        """Queue depth, batch-size histogram and wait time added by batching."""
+        with self._stats_lock:
+            waits = sorted(self._recent_waits)
+            batches = sum(self._batch_sizes.values())
+            return {
+                "model": self.model_name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "batches": batches,
+                "requests": self._total_requests,
+                "avg_batch_size": round(self._total_requests / batches, 3) if batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "wait_ms": {
+                    "avg": round(self._total_wait / self._total_requests * 1000.0, 3) if self._total_requests else 0.0,
+                    "p50": round(waits[len(waits) // 2] * 1000.0, 3) if waits else 0.0,
+                    "p95": round(waits[int(len(waits) * 0.95)] * 1000.0, 3) if waits else 0.0,
+                    "max": round(self._max_wait_seen * 1000.0, 3),
+                }
+            }
+
 class ModelManager:
     _instance = None
-    _models: Dict[str, tf.keras.Model] = {}
+    _models: ModelCache = ModelCache(
+        budget_bytes=settings.MODEL_CACHE_BUDGET_MB * 1024 * 1024,
+        pinned=[settings.DEFAULT_MODEL]
+    )
+    _artifact_cache: Optional[LoadArtifactCache] = (
+        LoadArtifactCache(settings.ARTIFACT_CACHE_DIR) if settings.ARTIFACT_CACHE_ENABLED else None
+    )
+    _prediction_cache: Optional[PredictionCache] = (
+        PredictionCache(
+            max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.PREDICTION_CACHE_TTL_S,
+            disk_path=settings.PREDICTION_CACHE_DB or None
+        ) if settings.PREDICTION_CACHE_ENABLED else None
+    )
+    _batchers: Dict[str, MicroBatcher] = {}
+    _batchers_lock = threading.Lock()
+    _compiled: Dict[str, CompiledModel] = {}
+    _compiled_lock = threading.Lock()
+    # model_name -> (model object, SplitHPFModel or None when the model has no shareable SRM front-end)
+    _srm_splits: Dict[str, tuple] = {}
+    _cascade_stats = CascadeStats()
+    _load_locks: Dict[str, threading.Lock] = {}
+    _load_locks_guard = threading.Lock()
+    _warmup_status: Dict[str, str] = {}
+    _ready = threading.Event()
     _current_model_name: Optional[str] = None
     
     def __new__(cls):
@@ -24,12 +186,12 @@ class ModelManager:
         return cls._instance
     
     def get_available_models(self) -> List[str]:
-        """List all .h5 or .keras files in the models directory."""
+        """List all .h5, .keras, .tflite or .onnx files in the models directory."""
         if not settings.MODELS_DIR.exists():
             return []
         
         files = [f.name for f in settings.MODELS_DIR.iterdir() 
-                 if f.suffix in ['.h5', '.keras']]
+                 if f.suffix in ['.h5', '.keras', '.tflite', '.onnx']]
         return sorted(files)
     
     def load_model(self, model_name: str) -> tuple[bool, str]:
@@ -42,26 +204,220 @@ class ModelManager:
         if not model_path.exists():
             raise FileNotFoundError(f"Model {model_name} not found")
             
-        try:
-            # Use reconstruction approach to bypass Keras 3 Lambda deserialization issues
-            model = load_model_with_reconstruction(str(model_path))
-            self._models[model_name] = model
-            self._current_model_name = model_name
-            return True, ""
-        except Exception as e:
-            import traceback
-            error_msg = f"Error loading model {model_name}: {str(e)}"
-            print(error_msg)
-            with open("backend_error.log", "a") as f:
-                f.write(f"{error_msg}\n")
-                traceback.print_exc(file=f)
-            return False, str(e)
+        # Single-flight: concurrent requests for the same cold model wait for one load
+        with self._load_lock(model_name):
+            if model_name in self._models:
+                self._current_model_name = model_name
+                return True, ""
 
-    def predict(self, image_bytes: bytes, model_name: Optional[str] = None) -> Dict:
-        """Run inference on an image."""
-        
-        # Determine which model to use
-        target_model = model_name or self._current_model_name
+            try:
+                rss_before = read_rss_bytes()
+                started = time.perf_counter()
+                digest = file_sha256(model_path)
+                info = {}
+                if model_path.suffix == '.tflite':
+                    model = TFLiteModel(model_path, num_threads=settings.TFLITE_NUM_THREADS)
+                elif model_path.suffix == '.onnx':
+                    model = ONNXModel(
+                        model_path,
+                        intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+                        inter_op_threads=settings.ONNX_INTER_OP_THREADS,
+                        optimization_level=settings.ONNX_OPTIMIZATION_LEVEL
+                    )
+                else:
+                    # Use reconstruction approach to bypass Keras 3 Lambda deserialization issues
+                    model = load_model_with_reconstruction(str(model_path), artifact_cache=self._artifact_cache)
+                    if settings.GRAPH_OPTIMIZER_ENABLED:
+                        model, optimization = optimize_for_inference(
+                            model,
+                            input_shape=settings.MODEL_INPUT_SHAPE,
+                            atol=settings.GRAPH_OPTIMIZER_ATOL
+                        )
+                        info["graph_optimization"] = optimization
+                evicted = self._models.put(
+                    model_name,
+                    model,
+                    measure_model_footprint(model),
+                    rss_delta_bytes=max(0, read_rss_bytes() - rss_before),
+                    load_seconds=round(time.perf_counter() - started, 3),
+                    sha256=digest,
+                    **info
+                )
+                if self._prediction_cache is not None:
+                    # Results of any other version of this file (e.g. from before a restart) are stale
+                    self._prediction_cache.invalidate_model(model_name, keep_digest=digest)
+                for name in evicted:
+                    print(f"[INFO] Evicted model {name} from cache (budget {self._models.budget_bytes // (1024 * 1024)} MB)")
+                    self._close_batcher(name)
+                    self._drop_compiled(name)
+                self._current_model_name = model_name
+                return True, ""
+            except Exception as e:
+                import traceback
+                error_msg = f"Error loading model {model_name}: {str(e)}"
+                print(error_msg)
+                with open("backend_error.log", "a") as f:
+                    f.write(f"{error_msg}\n")
+                    traceback.print_exc(file=f)
+                return False, str(e)
+
+    def _load_lock(self, model_name: str) -> threading.Lock:
+        with self._load_locks_guard:
+            return self._load_locks.setdefault(model_name, threading.Lock())
+
+    def warm_up(self, model_name: str):
+        """Run dummy inferences so graph tracing happens before real traffic arrives."""
+        model = self._get_model(model_name)
+        if settings.INFERENCE_MODE == "compiled" and not isinstance(model, (TFLiteModel, ONNXModel)):
+            self._compiled_model(model_name, model).warm_up()
+            return
+        height, width = settings.MODEL_INPUT_SHAPE[:2]
+        for size in self._trace_batch_sizes():
+            self._forward(model_name, model, np.zeros((size, height, width, 3), dtype=np.float32))
+
+    def preload(self, model_names: List[str]):
+        """
+        Load, pin and warm up the given models, then mark the manager ready.
+        Readiness stays false if any of them fails so traffic is never routed to a cold worker.
+        """
+        self._ready.clear()
+        for name in model_names:
+            self._warmup_status[name] = "pending"
+        for name in model_names:
+            try:
+                success, error_msg = self.load_model(name)
+                if not success:
+                    raise RuntimeError(error_msg)
+                # Preloaded models must stay resident, otherwise warming them up is pointless
+                self._models.pin(name)
+                self.warm_up(name)
+                self._warmup_status[name] = "ready"
+                print(f"[INFO] Preloaded and warmed up {name}")
+            except Exception as e:
+                self._warmup_status[name] = f"failed: {str(e)}"
+                print(f"[ERROR] Preloading {name} failed: {e}")
+        if all(status == "ready" for status in self._warmup_status.values()):
+            self._ready.set()
+
+    def readiness(self) -> Dict:
+        return {
+            "ready": self._ready.is_set(),
+            "models": dict(self._warmup_status)
+        }
+
+    def _get_model(self, model_name: str):
+        """Return a resident model object, reloading it if it was evicted since resolve_model()."""
+        model = self._models.get(model_name)
+        if model is None:
+            success, error_msg = self.load_model(model_name)
+            if not success:
+                raise RuntimeError(error_msg)
+            model = self._models[model_name]
+        return model
+
+    def resident_models(self) -> Dict:
+        """Models currently held in memory with their measured footprint, least recently used first."""
+        snapshot = self._models.snapshot()
+        with self._compiled_lock:
+            compiled = {name: c.describe() for name, c in self._compiled.items()}
+        snapshot["inference"] = {"mode": settings.INFERENCE_MODE, "compiled": compiled}
+        return snapshot
+
+    def _trace_batch_sizes(self) -> List[int]:
+        """Batch sizes traced at warm-up: configured explicitly, or the sizes the batchers produce."""
+        if settings.INFERENCE_TRACE_BATCH_SIZES:
+            return sorted(set(settings.INFERENCE_TRACE_BATCH_SIZES))
+        sizes = {1}
+        if settings.BATCHING_ENABLED:
+            sizes.add(settings.BATCH_MAX_SIZE)
+        return sorted(sizes)
+
+    def _compiled_model(self, model_name: str, model) -> CompiledModel:
+        """Return the tf.function wrapper for this model object, building it on first use."""
+        with self._compiled_lock:
+            compiled = self._compiled.get(model_name)
+            if compiled is None or compiled.model is not model:
+                compiled = CompiledModel(
+                    model,
+                    input_shape=settings.MODEL_INPUT_SHAPE,
+                    jit_compile=settings.INFERENCE_JIT_COMPILE,
+                    batch_sizes=self._trace_batch_sizes()
+                )
+                self._compiled[model_name] = compiled
+            return compiled
+
+    def _drop_compiled(self, model_name: str):
+        with self._compiled_lock:
+            self._compiled.pop(model_name, None)
+            self._srm_splits.pop(model_name, None)
+
+    def _srm_split(self, model_name: str, model) -> Optional[SplitHPFModel]:
+        """The model cut at its TLU output (built and verified once per model object), or None for non-HPF models."""
+        with self._compiled_lock:
+            cached = self._srm_splits.get(model_name)
+        if cached is not None and cached[0] is model:
+            return cached[1]
+        split = split_hpf_model(
+            model,
+            input_shape=settings.MODEL_INPUT_SHAPE,
+            jit_compile=settings.INFERENCE_JIT_COMPILE,
+            batch_sizes=self._trace_batch_sizes()
+        )
+        with self._compiled_lock:
+            self._srm_splits[model_name] = (model, split)
+        return split
+
+    def _forward(self, model_name: str, model, batch: np.ndarray) -> np.ndarray:
+        """Run one forward pass of a loaded model over a (N, H, W, C) batch. Returns N raw scores."""
+        with timed("inference"):
+            if isinstance(model, (TFLiteModel, ONNXModel)):
+                return model.predict(batch)[:, 0]
+            if settings.INFERENCE_MODE == "compiled":
+                return self._compiled_model(model_name, model)(batch)[:, 0]
+            return model.predict(batch, batch_size=len(batch), verbose=0)[:, 0]
+
+    def _get_batcher(self, model_name: str, model, predict_fn: Optional[Callable] = None) -> MicroBatcher:
+        """Return the micro-batcher serving this model object, starting one on first use."""
+        if predict_fn is None:
+            predict_fn = lambda batch: self._forward(model_name, model, batch)
+        with self._batchers_lock:
+            batcher = self._batchers.get(model_name)
+            if batcher is not None and batcher.model is not model:
+                # The model was evicted and reloaded; retire the batcher bound to the old object
+                batcher.close()
+                batcher = None
+            if batcher is None:
+                batcher = MicroBatcher(
+                    model_name,
+                    predict_fn,
+                    max_batch_size=settings.BATCH_MAX_SIZE,
+                    max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+                    model=model
+                )
+                self._batchers[model_name] = batcher
+            return batcher
+
+    def _close_batcher(self, model_name: str):
+        with self._batchers_lock:
+            batchers = [self._batchers.pop(name, None) for name in (model_name, f"{model_name}#srm_tail")]
+        for batcher in batchers:
+            if batcher is not None:
+                batcher.close()
+
+    def batching_stats(self) -> Dict:
+        """Per-model micro-batching statistics for tuning BATCH_MAX_SIZE / BATCH_MAX_WAIT_MS."""
+        with self._batchers_lock:
+            batchers = list(self._batchers.values())
+        return {
+            "enabled": settings.BATCHING_ENABLED,
+            "max_batch_size": settings.BATCH_MAX_SIZE,
+            "max_wait_ms": settings.BATCH_MAX_WAIT_MS,
+            "models": {b.model_name: b.stats() for b in batchers}
+        }
+
+    def resolve_model(self, model_name: Optional[str] = None) -> tuple[Optional[str], str]:
+        """Pick the model to serve a request and make sure it is loaded. Returns (model_name, error_message)."""
+        target_model = model_name or settings.DEFAULT_MODEL or self._current_model_name
         if not target_model:
             # Try to load the first available model if none selected
             available = self.get_available_models()
@@ -69,15 +425,59 @@ class ModelManager:
                 self.load_model(available[0])
                 target_model = available[0]
             else:
-                return {"error": "No models available"}
+                return None, "No models available"
         
         if target_model not in self._models:
             success, error_msg = self.load_model(target_model)
             if not success:
-                return {"error": f"Failed to load model {target_model}: {error_msg}"}
-                
-        model = self._models[target_model]
+                return None, f"Failed to load model {target_model}: {error_msg}"
+        else:
+            self._reload_if_changed(target_model)
+
+        return target_model, ""
+
+    def _reload_if_changed(self, model_name: str):
+        """Reload a resident model whose file was replaced on disk (hash is re-computed only when size/mtime change)."""
+        info = self._models.info(model_name)
+        try:
+            current = file_sha256(settings.MODELS_DIR / model_name)
+        except OSError:
+            # File removed: keep serving the resident copy
+            return
+        if info is None or info.get("sha256") == current:
+            return
+        print(f"[INFO] Model file {model_name} changed on disk, reloading")
+        self._models.evict(model_name)
+        self._close_batcher(model_name)
+        self._drop_compiled(model_name)
+        self.load_model(model_name)
+
+    def prediction_cache_stats(self) -> Dict:
+        if self._prediction_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._prediction_cache.stats()}
+
+    def predict(self, image_bytes: bytes, model_name: Optional[str] = None) -> Dict:
+        """Run inference on an image."""
         
+        # Determine which model to use
+        target_model, error_msg = self.resolve_model(model_name)
+        if not target_model:
+            return {"error": error_msg}
+
+        if self._prediction_cache is None:
+            return self._predict_uncached(image_bytes, target_model)
+
+        # Identical bytes for the same model file always give the same answer; concurrent
+        # duplicates share one decode + forward pass
+        try:
+            model_digest = file_sha256(settings.MODELS_DIR / target_model)
+        except OSError:
+            return self._predict_uncached(image_bytes, target_model)
+        key = PredictionCache.key(image_bytes, target_model, model_digest)
+        return self._prediction_cache.get_or_compute(key, lambda: self._predict_uncached(image_bytes, target_model))
+
+    def _predict_uncached(self, image_bytes: bytes, target_model: str) -> Dict:
         # Preprocess
         try:
             # Preprocess image (resize, cast to float32 [0, 255])
@@ -89,10 +489,348 @@ class ModelManager:
         # Inference
         try:
             # Model outputs single sigmoid probability
-            prediction = model.predict(processed_img, verbose=0)[0][0]
+            model = self._get_model(target_model)
+            if settings.BATCHING_ENABLED:
+                # Queue wait + shared forward pass as seen by this request (the forward itself
+                # is timed as "inference" on the batcher thread)
+                with timed("batched_inference"):
+                    prediction = self._get_batcher(target_model, model).submit(processed_img).result()
+            else:
+                prediction = self._forward(target_model, model, processed_img)[0]
         except Exception as e:
             return {"error": f"Inference failed: {str(e)}"}
             
+        return self._interpret(target_model, prediction)
+
+    def _submit_forward(self, model_name: str, processed_img: np.ndarray) -> Future:
+        """Start one model on a preprocessed (1, H, W, C) image without waiting; the Future resolves to its raw score."""
+        model = self._get_model(model_name)
+        if settings.BATCHING_ENABLED:
+            return self._get_batcher(model_name, model).submit(processed_img)
+        return execution["ensemble"].submit(lambda: float(self._forward(model_name, model, processed_img)[0]))
+
+    def _submit_tail(self, model_name: str, model, split: SplitHPFModel, features: np.ndarray) -> Future:
+        """Start an HPF model's tail on shared (1, H, W, 30) TLU features; the Future resolves to its raw score."""
+        if settings.BATCHING_ENABLED:
+            batcher = self._get_batcher(f"{model_name}#srm_tail", model, lambda batch: split.tail(batch)[:, 0])
+            return batcher.submit(features)
+        return execution["ensemble"].submit(lambda: float(split.tail(features)[0, 0]))
+
+    def ensemble_members(self, members: Optional[List[str]] = None) -> List[tuple]:
+        """(model_name, weight) pairs, cheapest first: explicit list, ENSEMBLE_MEMBERS, or every model by file size."""
+        parsed = parse_members(members or settings.ENSEMBLE_MEMBERS)
+        if parsed:
+            return parsed
+        return [(name, 1.0) for name in self._models_by_size()]
+
+    def _models_by_size(self) -> List[str]:
+        """Available model files, smallest first."""
+        return sorted(self.get_available_models(), key=lambda n: (settings.MODELS_DIR / n).stat().st_size)
+
+    def predict_ensemble(
+        self,
+        image_bytes: bytes,
+        members: Optional[List[str]] = None,
+        method: Optional[str] = None
+    ) -> Dict:
+        """
+        Combine several models into one verdict: decode and resize once, run members concurrently.
+        The cheapest ENSEMBLE_EARLY_EXIT_MEMBERS go first; when they agree confidently the
+        remaining (expensive) members are skipped. Members that fail are reported and left out.
+
+        HPF members with identical SRM kernels share one front-end pass (grayscale -> SRM ->
+        TLU); only their tails run per model (ENSEMBLE_SHARE_SRM).
+        """
+        method = method or settings.ENSEMBLE_METHOD
+        try:
+            members = self.ensemble_members(members)
+        except ValueError as e:
+            return {"error": str(e)}
+        if not members:
+            return {"error": "No models available"}
+
+        started = time.perf_counter()
+        try:
+            processed_img = ImagePreprocessor.preprocess(image_bytes)
+        except Exception as e:
+            return {"error": f"Preprocessing failed: {str(e)}"}
+        decode_ms = (time.perf_counter() - started) * 1000.0
+
+        first_stage = settings.ENSEMBLE_EARLY_EXIT_MEMBERS
+        stages = [members[:first_stage], members[first_stage:]] if 0 < first_stage < len(members) else [members]
+        report: List[Dict] = []
+        scored: List[tuple] = []
+        early_exit = False
+        # TLU features per SRM key, computed at most once per request and reused by later stages
+        features: Dict[str, np.ndarray] = {}
+        shared_srm: Dict[str, Dict] = {}
+
+        for index, stage in enumerate(stages):
+            if index > 0 and confident_agreement([s for s, _ in scored], settings.ENSEMBLE_EARLY_EXIT_CONFIDENCE):
+                early_exit = True
+                report.extend({"model": name, "weight": weight, "skipped": True} for name, weight in stage)
+                continue
+
+            resolved = []
+            for name, weight in stage:
+                try:
+                    target, error_msg = self.resolve_model(name)
+                    if not target:
+                        raise RuntimeError(error_msg)
+                    resolved.append((name, weight, self._get_model(name)))
+                except Exception as e:
+                    report.append({"model": name, "weight": weight, "error": str(e)})
+
+            # Share the front-end between members whose SRM key repeats (in this stage or an earlier one)
+            splits = {}
+            if settings.ENSEMBLE_SHARE_SRM:
+                candidates = {name: self._srm_split(name, model) for name, _, model in resolved}
+                keys = [s.key for s in candidates.values() if s is not None]
+                splits = {
+                    name: s for name, s in candidates.items()
+                    if s is not None and (s.key in features or keys.count(s.key) > 1)
+                }
+
+            pending = []
+            for name, weight, model in resolved:
+                submitted = time.perf_counter()
+                split = splits.get(name)
+                try:
+                    if split is None:
+                        future = self._submit_forward(name, processed_img)
+                    else:
+                        if split.key not in features:
+                            features[split.key] = split.front(processed_img)
+                            shared_srm[split.key] = {
+                                "front_ms": round((time.perf_counter() - submitted) * 1000.0, 3),
+                                "models": []
+                            }
+                        shared_srm[split.key]["models"].append(name)
+                        future = self._submit_tail(name, model, split, features[split.key])
+                except PoolSaturatedError:
+                    raise
+                except Exception as e:
+                    report.append({"model": name, "weight": weight, "error": f"Inference failed: {str(e)}"})
+                    continue
+                finished = {}
+                future.add_done_callback(lambda _, done=finished: done.setdefault("at", time.perf_counter()))
+                pending.append((name, weight, submitted, finished, future, split is not None))
+
+            for name, weight, submitted, finished, future, srm_shared in pending:
+                try:
+                    score = float(future.result())
+                except Exception as e:
+                    report.append({"model": name, "weight": weight, "error": f"Inference failed: {str(e)}"})
+                    continue
+                member = self._interpret(name, score)
+                report.append({
+                    "model": name,
+                    "weight": weight,
+                    "prediction": member["prediction"],
+                    "raw_score": score,
+                    "srm_shared": srm_shared,
+                    # Submit-to-result time: members of a stage overlap, so these do not add up
+                    "latency_ms": round((finished.get("at", time.perf_counter()) - submitted) * 1000.0, 3)
+                })
+                scored.append((score, weight))
+
+        if not scored:
+            return {"error": "; ".join(f"{m['model']}: {m.get('error')}" for m in report)}
+        try:
+            combined = combine_scores(scored, method)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        result = self._interpret("ensemble", combined)
+        result["ensemble"] = {
+            "method": method,
+            "early_exit": early_exit,
+            "decode_ms": round(decode_ms, 3),
+            "total_ms": round((time.perf_counter() - started) * 1000.0, 3),
+            "shared_srm": list(shared_srm.values()),
+            "members": report
+        }
+        return result
+
+    def cascade_stages(
+        self,
+        stage1_model: Optional[str] = None,
+        stage2_models: Optional[List[str]] = None
+    ) -> tuple:
+        """(stage-1 model, stage-2 (model, weight) pairs): explicit, CASCADE_* settings, or smallest model vs the rest."""
+        # Not ensemble_members(): its default is ENSEMBLE_MEMBERS when that is set
+        by_size = self._models_by_size()
+        stage1 = stage1_model or settings.CASCADE_STAGE1_MODEL or (by_size[0] if by_size else None)
+        stage2 = parse_members(stage2_models or settings.CASCADE_STAGE2_MODELS) or [
+            (name, 1.0) for name in by_size if name != stage1
+        ]
+        return stage1, [(name, weight) for name, weight in stage2 if name != stage1]
+
+    def predict_cascade(
+        self,
+        image_bytes: bytes,
+        stage1_model: Optional[str] = None,
+        stage2_models: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Triage an image: stage 1 runs the LSB screen and a cheap model on the 224x224 view;
+        only images it cannot settle (score inside the uncertainty band, or a "clean" score
+        with a flagged LSB plane) go through the stage-2 models, whose weighted mean decides.
+        The image is decoded once for both stages.
+        """
+        started = time.perf_counter()
+        try:
+            stage1, stage2 = self.cascade_stages(stage1_model, stage2_models)
+        except ValueError as e:
+            return {"error": str(e)}
+        if not stage1:
+            return {"error": "No models available"}
+        target, error_msg = self.resolve_model(stage1)
+        if not target:
+            return {"error": error_msg}
+
+        try:
+            image = ImagePreprocessor.decode(image_bytes)
+            processed_img = ImagePreprocessor.prepare(image)
+        except Exception as e:
+            self._cascade_stats.record(None, 0.0, None, 0.0)
+            return {"error": f"Preprocessing failed: {str(e)}"}
+        decoded = time.perf_counter()
+
+        try:
+            # The LSB screen runs on this thread while the stage-1 forward pass is in flight
+            future = self._submit_forward(stage1, processed_img)
+            screen = lsb_screen(image, settings.CASCADE_LSB_PATTERN_THRESHOLD)
+            stage1_score = float(future.result())
+        except PoolSaturatedError:
+            raise
+        except Exception as e:
+            self._cascade_stats.record(None, 0.0, None, 0.0)
+            return {"error": f"Inference failed: {str(e)}"}
+        stage1_done = time.perf_counter()
+
+        band = (settings.CASCADE_BAND_LOW, settings.CASCADE_BAND_HIGH)
+        report = {
+            "band": list(band),
+            "decode_ms": round((decoded - started) * 1000.0, 3),
+            "stage1": {
+                "model": stage1,
+                "raw_score": stage1_score,
+                "lsb": screen,
+                "latency_ms": round((stage1_done - decoded) * 1000.0, 3)
+            },
+            "stage2": None
+        }
+
+        decided_by, score, stage2_ms = "stage1", stage1_score, None
+        if not stage1_decides(stage1_score, band, screen["flagged"]) and stage2:
+            members, scored = [], []
+            pending = []
+            for name, weight in stage2:
+                try:
+                    target, error_msg = self.resolve_model(name)
+                    if not target:
+                        raise RuntimeError(error_msg)
+                    pending.append((name, weight, self._submit_forward(name, processed_img)))
+                except PoolSaturatedError:
+                    raise
+                except Exception as e:
+                    members.append({"model": name, "weight": weight, "error": str(e)})
+            for name, weight, future in pending:
+                try:
+                    member_score = float(future.result())
+                except Exception as e:
+                    members.append({"model": name, "weight": weight, "error": f"Inference failed: {str(e)}"})
+                    continue
+                members.append({"model": name, "weight": weight, "raw_score": member_score})
+                scored.append((member_score, weight))
+            stage2_ms = (time.perf_counter() - stage1_done) * 1000.0
+            report["stage2"] = {"members": members, "latency_ms": round(stage2_ms, 3)}
+            # If every stage-2 model failed the stage-1 verdict stands
+            if scored and sum(weight for _, weight in scored) > 0:
+                decided_by, score = "stage2", combine_scores(scored, "weighted")
+
+        total_ms = (time.perf_counter() - started) * 1000.0
+        self._cascade_stats.record(decided_by, (stage1_done - decoded) * 1000.0, stage2_ms, total_ms)
+        result = self._interpret("cascade", score)
+        result["cascade"] = {"decided_by": decided_by, "total_ms": round(total_ms, 3), **report}
+        return result
+
+    def cascade_stats(self) -> Dict:
+        """Images decided per stage, per-stage latency and the throughput gain over stage 2 alone."""
+        return self._cascade_stats.snapshot()
+
+    def predict_batch(self, batch: np.ndarray, model_name: Optional[str] = None) -> List[Dict]:
+        """Run inference on an already preprocessed (N, 224, 224, 3) batch in one forward pass."""
+        target_model, error_msg = self.resolve_model(model_name)
+        if not target_model:
+            return [{"error": error_msg}] * len(batch)
+
+        try:
+            predictions = self._forward(target_model, self._get_model(target_model), batch)
+        except Exception as e:
+            return [{"error": f"Inference failed: {str(e)}"}] * len(batch)
+
+        return [self._interpret(target_model, p) for p in predictions]
+
+    def predict_tiled(
+        self,
+        image_bytes: bytes,
+        model_name: Optional[str] = None,
+        stride: Optional[int] = None,
+        max_tiles: Optional[int] = None,
+        aggregation: Optional[str] = None
+    ) -> Dict:
+        """
+        Score an image at native resolution: cut it into MODEL_INPUT_SHAPE patches on a
+        stride grid, run up to max_tiles of them through the model TILED_BATCH_SIZE at a time,
+        and combine the patch scores into one verdict plus a coarse per-patch heatmap.
+        """
+        target_model, error_msg = self.resolve_model(model_name)
+        if not target_model:
+            return {"error": error_msg}
+
+        patch = settings.MODEL_INPUT_SHAPE[0]
+        stride = stride or settings.TILED_STRIDE
+        max_tiles = settings.TILED_MAX_TILES if max_tiles is None else max_tiles
+        aggregation = aggregation or settings.TILED_AGGREGATION
+        started = time.perf_counter()
+
+        try:
+            image = ImagePreprocessor.decode(image_bytes)
+            row_offsets, col_offsets = tile_grid(image.shape[0], image.shape[1], patch, stride)
+            cells = sample_tiles(len(row_offsets), len(col_offsets), max_tiles)
+        except Exception as e:
+            return {"error": f"Preprocessing failed: {str(e)}"}
+        decoded = time.perf_counter()
+
+        try:
+            model = self._get_model(target_model)
+            scores = []
+            for batch in iter_patch_batches(image, cells, row_offsets, col_offsets, patch, settings.TILED_BATCH_SIZE):
+                scores.append(np.asarray(self._forward(target_model, model, batch)).reshape(len(batch), -1)[:, 0])
+            scores = np.concatenate(scores)
+            score = aggregate_scores(scores, aggregation, settings.TILED_TOPK_FRACTION)
+        except ValueError as e:
+            return {"error": str(e)}
+        except Exception as e:
+            return {"error": f"Inference failed: {str(e)}"}
+        finished = time.perf_counter()
+
+        result = self._interpret(target_model, score)
+        result["tiled"] = {
+            **describe_grid(image.shape, patch, stride, row_offsets, col_offsets, cells),
+            "aggregation": aggregation,
+            "batch_size": settings.TILED_BATCH_SIZE,
+            "heatmap": build_heatmap(cells, scores, len(row_offsets), len(col_offsets)),
+            "decode_ms": round((decoded - started) * 1000, 2),
+            "inference_ms": round((finished - decoded) * 1000, 2),
+            "patches_per_s": round(len(cells) / max(finished - decoded, 1e-9), 1)
+        }
+        return result
+
+    def _interpret(self, target_model: str, prediction: float) -> Dict:
+        """Turn a raw sigmoid score into the API response fields."""
         # NOTE: Baseline_CNN has inconsistent predictions and is not recommended for use.
         # - Predicts clean images as stego (raw_score ~0.90)
         # - Also predicts stego images incorrectly
@@ -0,0 +1,144 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import tensorflow as tf
+
+OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+
+
+def _require(module: str, package: str):
+    """Import an optional dependency, with an install hint instead of a bare ImportError."""
+    try:
+        return __import__(module)
+    except ImportError:
+        raise RuntimeError(f"{package} is not installed; run `pip install {package}` to use the ONNX backend")
+
+
+def export_onnx(
+    model,
+    output_path,
+    opset: int = 17,
+    input_shape: tuple = (224, 224),
+    verify: bool = True,
+    atol: float = 1e-4
+) -> Dict:
+    """
+    Convert a Keras model (as returned by load_model_with_reconstruction) to ONNX.
+
+    The model is traced as a tf.function with a dynamic batch dimension, so the custom pieces
+    never reach the ONNX exporter as Python objects: the To_Grayscale Lambda
+    (tf.image.rgb_to_grayscale) lowers to a MatMul over the channel axis, the TLU Lambda to
+    Clip, and the SRMFilterInitializer kernels are frozen into a Conv weight constant.
+
+    With verify=True the exported graph is run through ONNX Runtime and compared with the
+    TensorFlow output; a difference above atol raises ValueError and nothing is kept.
+    Returns {'path', 'opset', 'ops', 'max_abs_diff'}.
+    """
+    tf2onnx = _require("tf2onnx", "tf2onnx")
+
+    height, width = input_shape[:2]
+    signature = [tf.TensorSpec((None, height, width, 3), tf.float32, name="image")]
+
+    @tf.function(input_signature=signature)
+    def serve(images):
+        return model(images, training=False)
+
+    onnx_model, _ = tf2onnx.convert.from_function(serve, input_signature=signature, opset=opset)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(onnx_model.SerializeToString())
+
+    info = {
+        "path": str(output_path),
+        "opset": opset,
+        "ops": sorted(set(node.op_type for node in onnx_model.graph.node)),
+        "max_abs_diff": None
+    }
+    if verify:
+        rng = np.random.default_rng(0)
+        sample = np.concatenate([
+            np.zeros((1, height, width, 3), dtype=np.float32),
+            rng.uniform(0, 255, (3, height, width, 3)).astype(np.float32)
+        ])
+        expected = serve(tf.constant(sample)).numpy()
+        actual = ONNXModel(output_path, intra_op_threads=1).predict(sample)
+        info["max_abs_diff"] = float(np.max(np.abs(actual - expected)))
+        if info["max_abs_diff"] > atol:
+            output_path.unlink()
+            raise ValueError(f"ONNX export does not match TensorFlow: max |diff| {info['max_abs_diff']:.2e} > {atol:.0e}")
+
+    print(f"[INFO] Exported ONNX model to {output_path} ({output_path.stat().st_size / (1024 * 1024):.2f} MB)")
+    return info
+
+
+class ONNXModel:
+    """
+    A .onnx file served through ONNX Runtime's CPU execution provider with a Keras-like predict().
+
+    InferenceSession.run is thread-safe, so one session serves every thread. intra_op_threads
+    parallelises a single op, inter_op_threads independent branches (only with parallel
+    execution); 0 lets ONNX Runtime pick.
+    """
+
+    def __init__(
+        self,
+        model_path,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        optimization_level: str = "all"
+    ):
+        ort = _require("onnxruntime", "onnxruntime")
+        if optimization_level not in OPTIMIZATION_LEVELS:
+            raise ValueError(f"Unknown optimization level '{optimization_level}', expected one of {OPTIMIZATION_LEVELS}")
+
+        self.model_path = str(model_path)
+        self.name = Path(model_path).stem
+        # Size of the graph file, reported to ModelCache instead of Keras variables
+        self.footprint_bytes = os.path.getsize(self.model_path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = {
+            "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }[optimization_level]
+        self._session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self._input_name = self._session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        """Forward a (N, H, W, 3) float32 batch. Returns the (N, 1) outputs like Keras predict()."""
+        return self._session.run(None, {self._input_name: np.ascontiguousarray(batch, dtype=np.float32)})[0]
+
+    __call__ = predict
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a model from MODELS_DIR to ONNX")
+    parser.add_argument("model", help="Model file (path or name inside MODELS_DIR)")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--output", help="Output path (default: next to the model, <stem>.onnx)")
+    parser.add_argument("--no-verify", action="store_true", help="Skip the ONNX Runtime parity check")
+    args = parser.parse_args(argv)
+
+    from ..core.config import settings
+    from .model_builder import load_model_with_reconstruction
+
+    model_path = Path(args.model)
+    if not model_path.exists():
+        model_path = settings.MODELS_DIR / args.model
+    output = Path(args.output) if args.output else model_path.with_suffix(".onnx")
+
+    model = load_model_with_reconstruction(str(model_path))
+    info = export_onnx(model, output, args.opset, settings.MODEL_INPUT_SHAPE, verify=not args.no_verify)
+    print(f"[INFO] ops: {', '.join(info['ops'])}; max |diff| vs TensorFlow: {info['max_abs_diff']}")
+
+
+if __name__ == "__main__":
+    main()
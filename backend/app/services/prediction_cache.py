@@ -0,0 +1,169 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+class PredictionCache:
+    """
+    Content-addressed cache of /predict results.
+
+    Keys are SHA-256(image bytes) + model name + SHA-256(model file), so a re-sent image hits
+    regardless of filename, and a model file that changes on disk can never serve results of
+    its previous version. Two tiers:
+
+    - memory: LRU bounded by max_entries, every entry expires ttl_seconds after it was stored
+    - disk (optional): a SQLite file that survives restarts, same TTL; hits are promoted to memory
+
+    Concurrent requests for the same key share one computation (single-flight): the first
+    caller computes, the others wait on its Future. Results carrying an "error" are returned
+    to everyone waiting but never stored.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600, disk_path: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "shared": 0, "stores": 0, "invalidated": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, model_name TEXT, model_digest TEXT, result TEXT, created_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_predictions_model ON predictions (model_name)")
+            self._db.commit()
+
+    @staticmethod
+    def key(image_bytes: bytes, model_name: str, model_digest: str) -> str:
+        return f"{model_name}:{model_digest}:{hashlib.sha256(image_bytes).hexdigest()}"
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached result for key (memory first, then disk), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, created_at = entry
+                if not self._expired(created_at):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return copy.deepcopy(result)
+                del self._entries[key]
+
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute("SELECT result, created_at FROM predictions WHERE key = ?", (key,)).fetchone()
+        if row is None or self._expired(row[1]):
+            return None
+        result = json.loads(row[0])
+        with self._lock:
+            self._stats["disk_hits"] += 1
+            self._remember(key, result, row[1])
+        return copy.deepcopy(result)
+
+    def _remember(self, key: str, result: Dict, created_at: float):
+        self._entries[key] = (result, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, key: str, result: Dict):
+        if "error" in result:
+            return
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, copy.deepcopy(result), created_at)
+            self._stats["stores"] += 1
+        if self._db is not None:
+            model_name, model_digest, _ = key.rsplit(":", 2)
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                    (key, model_name, model_digest, json.dumps(result), created_at)
+                )
+                self._db.commit()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict]) -> Dict:
+        """Return the cached result for key, or compute it once no matter how many callers ask at the same time."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self._stats["misses"] += 1
+            else:
+                self._stats["shared"] += 1
+
+        if not owner:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = compute()
+            self.put(key, result)
+            future.set_result(result)
+            return copy.deepcopy(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def invalidate_model(self, model_name: str, keep_digest: Optional[str] = None) -> int:
+        """Drop every entry of model_name (except those computed with keep_digest). Returns how many were dropped."""
+        prefix = f"{model_name}:"
+        keep = f"{model_name}:{keep_digest}:" if keep_digest else None
+        with self._lock:
+            stale = [k for k in self._entries if k.startswith(prefix) and not (keep and k.startswith(keep))]
+            for k in stale:
+                del self._entries[k]
+        removed = len(stale)
+        if self._db is not None:
+            with self._db_lock:
+                cursor = self._db.execute(
+                    "DELETE FROM predictions WHERE model_name = ? AND model_digest != ?",
+                    (model_name, keep_digest or "")
+                )
+                self._db.commit()
+            removed = max(removed, cursor.rowcount)
+        with self._lock:
+            self._stats["invalidated"] += removed
+        return removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"] + self._stats["shared"]
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "in_flight": len(self._in_flight),
+                "hit_ratio": round((self._stats["hits"] + self._stats["disk_hits"] + self._stats["shared"]) / lookups, 4) if lookups else 0.0,
+                **self._stats
+            }
+        if self._db is not None:
+            with self._db_lock:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        return stats
@@ -0,0 +1,87 @@
+import hashlib
+from typing import Optional
+
+import numpy as np
+import tensorflow as tf
+
+from .compiled_inference import CompiledModel
+
+# Layers of the fixed SRM residual stage shared by every HPF model (see build_srm_branch);
+# everything after TLU_Activation (bottleneck, batch norm, backbone, head) is model specific.
+SRM_FILTER_LAYER = "SRM_Filter_Bank"
+SRM_FRONT_OUTPUT = "TLU_Activation"
+
+
+def srm_front_key(model) -> Optional[str]:
+    """
+    Fingerprint of a model's frozen SRM front-end (kernel, bias and TLU output shape), or None
+    when the model has no SRM branch. Models with equal keys compute identical TLU features.
+    """
+    if not hasattr(model, "get_layer"):
+        # TFLite / ONNX backends are opaque graphs
+        return None
+    try:
+        srm_layer = model.get_layer(SRM_FILTER_LAYER)
+        tlu_layer = model.get_layer(SRM_FRONT_OUTPUT)
+    except ValueError:
+        return None
+    h = hashlib.sha256()
+    h.update(str(tuple(tlu_layer.output.shape)).encode())
+    for weight in srm_layer.get_weights():
+        h.update(str(weight.shape).encode())
+        h.update(np.ascontiguousarray(weight, dtype=np.float32).tobytes())
+    return h.hexdigest()[:16]
+
+
+class SplitHPFModel:
+    """
+    An HPF model cut at TLU_Activation.
+
+    front: image -> To_Grayscale -> SRM_Filter_Bank -> TLU features (N, H, W, 30)
+    tail:  TLU features -> bottleneck -> batch norm -> backbone -> head
+
+    Both halves reuse the original layer objects, so no weights are copied. HPF models with
+    the same key can share one front pass and feed its features into each of their tails.
+    """
+
+    def __init__(self, model, input_shape: tuple = (224, 224), jit_compile: bool = False, batch_sizes=(1,)):
+        tlu_output = model.get_layer(SRM_FRONT_OUTPUT).output
+        self.key = srm_front_key(model)
+        self.feature_channels = int(tlu_output.shape[-1])
+        self.front = CompiledModel(
+            tf.keras.Model(model.input, tlu_output, name=f"{model.name}_srm_front"),
+            input_shape=input_shape,
+            jit_compile=jit_compile,
+            batch_sizes=batch_sizes
+        )
+        self.tail = CompiledModel(
+            tf.keras.Model(tlu_output, model.output, name=f"{model.name}_srm_tail"),
+            input_shape=input_shape,
+            jit_compile=jit_compile,
+            batch_sizes=batch_sizes,
+            input_channels=self.feature_channels
+        )
+        self.model = model
+
+    def verify(self, input_shape: tuple = (224, 224)) -> float:
+        """Max |tail(front(x)) - model(x)| on a random batch."""
+        height, width = input_shape[:2]
+        sample = np.random.default_rng(0).uniform(0, 255, (2, height, width, 3)).astype(np.float32)
+        expected = self.model(sample, training=False).numpy()
+        return float(np.max(np.abs(self.tail(self.front(sample)) - expected)))
+
+
+def split_hpf_model(model, input_shape: tuple = (224, 224), atol: float = 1e-5, **kwargs) -> Optional[SplitHPFModel]:
+    """Cut an HPF Keras model at its TLU output, or None if it has no SRM branch or the halves do not reproduce it."""
+    if srm_front_key(model) is None:
+        return None
+    try:
+        split = SplitHPFModel(model, input_shape=input_shape, **kwargs)
+        diff = split.verify(input_shape)
+    except Exception as e:
+        print(f"[WARN] Could not split {model.name} at {SRM_FRONT_OUTPUT}: {str(e)[:200]}")
+        return None
+    if diff > atol:
+        print(f"[WARN] SRM split of {model.name} differs from the full model by {diff:.2e}, not sharing its front-end")
+        return None
+    return split
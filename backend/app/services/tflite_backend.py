@@ -0,0 +1,164 @@
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+QUANTIZATION_MODES = ("float32", "float16", "int8")
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".gif"}
+
+
+def iter_calibration_images(calibration_dir, limit: int = 200) -> Iterator[np.ndarray]:
+    """Preprocessed (1, H, W, 3) tensors from an image folder, in sorted order, exactly as /predict sees them."""
+    from .image_processing import ImagePreprocessor
+
+    paths = sorted(p for p in Path(calibration_dir).rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+    count = 0
+    for path in paths:
+        if count >= limit:
+            return
+        try:
+            yield ImagePreprocessor.preprocess(path.read_bytes())
+            count += 1
+        except Exception as e:
+            print(f"[WARN] Skipping calibration image {path.name}: {e}")
+
+
+def export_tflite(
+    model,
+    output_path,
+    quantization: str = "float32",
+    calibration_images: Optional[Iterable[np.ndarray]] = None,
+    input_shape: tuple = (224, 224)
+) -> Path:
+    """
+    Convert a Keras model (as returned by load_model_with_reconstruction) to a TFLite flatbuffer.
+
+    quantization:
+        'float32' - plain conversion, same numerics as Keras
+        'float16' - weights stored as float16 (half the size), computed in float32 on CPU
+        'int8'    - full-integer ops; activation ranges are calibrated on calibration_images
+                    (preprocessed (1, H, W, 3) float32 tensors). Input/output stay float32 so
+                    callers do not change.
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}")
+
+    height, width = input_shape[:2]
+
+    # Static batch of 1: with a dynamic batch dimension XNNPACK refuses to delegate the graph
+    # and the reference kernels are ~4x slower; TFLiteModel runs batches image by image
+    @tf.function(input_signature=[tf.TensorSpec((1, height, width, 3), tf.float32, name="image")])
+    def serve(images):
+        return model(images, training=False)
+
+    # Keras 3 variables trip the MLIR converter (ReadVariableOp "missing attribute 'value'",
+    # a hard LLVM abort), so fold them into constants before converting
+    frozen = convert_variables_to_constants_v2(serve.get_concrete_function())
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([frozen])
+
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        if calibration_images is None:
+            raise ValueError("int8 quantization needs a calibration set of representative images")
+        samples = [np.asarray(img, dtype=np.float32).reshape(1, height, width, 3) for img in calibration_images]
+        if not samples:
+            raise ValueError("Calibration set is empty")
+
+        def representative_dataset():
+            for sample in samples:
+                yield [sample]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    flatbuffer = converter.convert()
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(flatbuffer)
+    print(f"[INFO] Exported {quantization} TFLite model to {output_path} ({len(flatbuffer) / (1024 * 1024):.2f} MB)")
+    return output_path
+
+
+class TFLiteModel:
+    """
+    A .tflite file served through the TFLite interpreter with a Keras-like predict().
+
+    Interpreters are not thread-safe, so every calling thread gets its own (they share the
+    memory-mapped flatbuffer). Graphs exported with a static batch of 1 (export_tflite) run
+    batches one image at a time; graphs with a dynamic batch dimension are resized instead.
+    """
+
+    def __init__(self, model_path, num_threads: Optional[int] = None):
+        self.model_path = str(model_path)
+        self.name = Path(model_path).stem
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self._local = threading.local()
+        # Size of the flatbuffer, reported to ModelCache instead of Keras variables
+        self.footprint_bytes = os.path.getsize(self.model_path)
+        self._interpreter()
+
+    def _interpreter(self):
+        interpreter = getattr(self._local, "interpreter", None)
+        if interpreter is None:
+            interpreter = tf.lite.Interpreter(model_path=self.model_path, num_threads=self.num_threads)
+            interpreter.allocate_tensors()
+            self._local.interpreter = interpreter
+            self._local.batch_size = interpreter.get_input_details()[0]["shape"][0]
+        return interpreter
+
+    def _invoke(self, interpreter, batch: np.ndarray) -> np.ndarray:
+        input_detail = interpreter.get_input_details()[0]
+        if self._local.batch_size != len(batch):
+            interpreter.resize_tensor_input(input_detail["index"], [len(batch)] + list(input_detail["shape"][1:]))
+            interpreter.allocate_tensors()
+            self._local.batch_size = len(batch)
+            input_detail = interpreter.get_input_details()[0]
+        interpreter.set_tensor(input_detail["index"], np.ascontiguousarray(batch, dtype=np.float32))
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]["index"]).copy()
+
+    def predict(self, batch: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        """Forward a (N, H, W, 3) float32 batch. Returns the (N, 1) outputs like Keras predict()."""
+        interpreter = self._interpreter()
+        if interpreter.get_input_details()[0]["shape_signature"][0] == -1:
+            return self._invoke(interpreter, batch)
+        return np.concatenate([self._invoke(interpreter, batch[i:i + 1]) for i in range(len(batch))], axis=0)
+
+    __call__ = predict
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a model from MODELS_DIR to TFLite")
+    parser.add_argument("model", help="Model file (path or name inside MODELS_DIR)")
+    parser.add_argument("--quantization", choices=QUANTIZATION_MODES, default="float32")
+    parser.add_argument("--calibration-dir", help="Folder of representative images (required for int8)")
+    parser.add_argument("--calibration-limit", type=int, default=200)
+    parser.add_argument("--output", help="Output path (default: next to the model, <stem>_<quantization>.tflite)")
+    args = parser.parse_args(argv)
+
+    from ..core.config import settings
+    from .model_builder import load_model_with_reconstruction
+
+    model_path = Path(args.model)
+    if not model_path.exists():
+        model_path = settings.MODELS_DIR / args.model
+    output = Path(args.output) if args.output else model_path.with_name(f"{model_path.stem}_{args.quantization}.tflite")
+
+    model = load_model_with_reconstruction(str(model_path))
+    calibration = None
+    if args.calibration_dir:
+        calibration = iter_calibration_images(args.calibration_dir, args.calibration_limit)
+    export_tflite(model, output, args.quantization, calibration, settings.MODEL_INPUT_SHAPE)
+
+
+if __name__ == "__main__":
+    main()
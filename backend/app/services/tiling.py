@@ -0,0 +1,112 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+TILE_AGGREGATIONS = ("mean", "max", "topk")
+
+
+def _axis_offsets(length: int, patch: int, stride: int) -> List[int]:
+    """Patch starts along one axis; the last patch is aligned to the edge so every pixel is covered."""
+    if length <= patch:
+        return [0]
+    offsets = list(range(0, length - patch + 1, stride))
+    if offsets[-1] != length - patch:
+        offsets.append(length - patch)
+    return offsets
+
+
+def tile_grid(height: int, width: int, patch: int, stride: int) -> Tuple[List[int], List[int]]:
+    """Row and column offsets of the patch grid over a (height, width) image."""
+    if stride <= 0:
+        raise ValueError("Tile stride must be positive")
+    return _axis_offsets(height, patch, stride), _axis_offsets(width, patch, stride)
+
+
+def sample_tiles(rows: int, cols: int, budget: int) -> List[Tuple[int, int]]:
+    """
+    Grid cells (row, col) to score. With more cells than the budget, cells are picked at
+    evenly spaced positions in row-major order, so the sample covers the whole image and the
+    same image always gives the same tiles.
+    """
+    total = rows * cols
+    if budget <= 0 or total <= budget:
+        indices = range(total)
+    else:
+        indices = np.unique(np.linspace(0, total - 1, budget).round().astype(int))
+    return [(int(i) // cols, int(i) % cols) for i in indices]
+
+
+def iter_patch_batches(
+    image: np.ndarray,
+    cells: List[Tuple[int, int]],
+    row_offsets: List[int],
+    col_offsets: List[int],
+    patch: int,
+    batch_size: int
+) -> Iterator[np.ndarray]:
+    """
+    Cut native-resolution patches out of a decoded (H, W, 3) uint8 image and yield them as
+    float32 (n, patch, patch, 3) batches of at most batch_size. Only one batch is converted
+    to float32 at a time, so a 12 MP photo never exists as a float copy.
+
+    Images smaller than the patch are zero padded at the bottom/right.
+    """
+    height, width = image.shape[:2]
+    if height < patch or width < patch:
+        padded = np.zeros((max(height, patch), max(width, patch), image.shape[2]), dtype=image.dtype)
+        padded[:height, :width] = image
+        image = padded
+
+    for start in range(0, len(cells), batch_size):
+        chunk = cells[start:start + batch_size]
+        batch = np.empty((len(chunk), patch, patch, image.shape[2]), dtype=np.float32)
+        for i, (r, c) in enumerate(chunk):
+            y, x = row_offsets[r], col_offsets[c]
+            batch[i] = image[y:y + patch, x:x + patch]
+        yield batch
+
+
+def aggregate_scores(scores: np.ndarray, method: str = "mean", topk_fraction: float = 0.1) -> float:
+    """
+    Combine patch scores into one image score.
+
+    mean - average over patches (payloads spread over the whole image)
+    max  - most suspicious patch (small embedded regions)
+    topk - average of the highest topk_fraction of patches, between the two
+    """
+    if method not in TILE_AGGREGATIONS:
+        raise ValueError(f"Unknown tile aggregation '{method}', expected one of {TILE_AGGREGATIONS}")
+    if len(scores) == 0:
+        raise ValueError("No patch was scored")
+    if method == "max":
+        return float(np.max(scores))
+    if method == "topk":
+        k = max(1, int(np.ceil(len(scores) * topk_fraction)))
+        return float(np.mean(np.sort(scores)[-k:]))
+    return float(np.mean(scores))
+
+
+def build_heatmap(cells: List[Tuple[int, int]], scores: np.ndarray, rows: int, cols: int) -> List[List[Optional[float]]]:
+    """rows x cols grid of patch scores; cells outside the sampling budget are None."""
+    heatmap: List[List[Optional[float]]] = [[None] * cols for _ in range(rows)]
+    for (r, c), score in zip(cells, scores):
+        heatmap[r][c] = round(float(score), 4)
+    return heatmap
+
+
+def describe_grid(
+    image_shape: tuple,
+    patch: int,
+    stride: int,
+    row_offsets: List[int],
+    col_offsets: List[int],
+    cells: List[Tuple[int, int]]
+) -> Dict:
+    return {
+        "image_size": [int(image_shape[1]), int(image_shape[0])],
+        "patch_size": patch,
+        "stride": stride,
+        "grid": [len(row_offsets), len(col_offsets)],
+        "tiles_total": len(row_offsets) * len(col_offsets),
+        "tiles_scored": len(cells)
+    }
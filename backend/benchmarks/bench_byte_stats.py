@@ -0,0 +1,122 @@
+"""
+Byte-statistics benchmark: forensics/byte_stats against the per-analyzer code it replaced.
+
+Three workloads on random payloads of each --sizes (MB):
+- lsb_entropy: LSBAnalyzer's entropy analysis (Counter-based entropy and chi-square plus
+  np.array(list(data)) serial correlation) vs byte_statistics() (which also adds the
+  mean, lags 1/2/4/8 and the Monte-Carlo pi estimate)
+- most_common: Counter.most_common(5) vs a bincount histogram
+- visual_entropy: VisualAnalyzer's per-channel np.histogram for channel and LSB entropy
+  vs one bincount per channel, on a square RGB image of the same byte count
+
+Values are checked against the legacy results (entropy and serial correlation to 1e-9;
+chi-square is only compared when every byte value occurs, since the legacy sum skipped
+absent values). The script exits non-zero on a mismatch.
+
+Usage:
+    python -m backend.benchmarks.bench_byte_stats [--sizes 1 4 16] [--repeat 3] [--out results.json]
+"""
+
+import argparse
+import sys
+from collections import Counter
+
+import numpy as np
+
+from backend.app.services.forensics.byte_stats import as_bytes_array, byte_histogram, byte_statistics, shannon_entropy
+from backend.benchmarks.common import summarize, time_call, write_json
+
+
+def legacy_lsb_entropy(data: bytes) -> dict:
+    """LSBAnalyzer._analyze_entropy and _calculate_serial_correlation before byte_stats."""
+    byte_counts = Counter(data)
+    total = len(data)
+    entropy = -sum((count / total) * np.log2(count / total) for count in byte_counts.values())
+    expected = total / 256
+    chi_square = sum((count - expected) ** 2 / expected for count in byte_counts.values())
+    arr = np.array(list(data))
+    mean = np.mean(arr)
+    serial = np.sum((arr[:-1] - mean) * (arr[1:] - mean)) / np.sum((arr - mean) ** 2)
+    return {'entropy': float(entropy), 'chi_square': float(chi_square), 'serial_correlation': float(serial)}
+
+
+def legacy_visual_entropy(data: np.ndarray) -> float:
+    """VisualAnalyzer._calculate_entropy before byte_stats."""
+    hist, _ = np.histogram(data.flatten(), bins=np.arange(257), density=True)
+    hist = hist[hist > 0]
+    entropy = -np.sum(hist * np.log2(hist + 1e-10))
+    return entropy if data.max() <= 1 else entropy / 8.0
+
+
+def new_visual_entropy(channel: np.ndarray) -> tuple:
+    hist = byte_histogram(as_bytes_array(channel))
+    return shannon_entropy(np.array([hist[0::2].sum(), hist[1::2].sum()])), shannon_entropy(hist) / 8.0
+
+
+def bench_size(size_mb: float, repeat: int, failures: list) -> dict:
+    rng = np.random.default_rng(int(size_mb * 1000))
+    data = rng.integers(0, 256, int(size_mb * 1024 * 1024), dtype=np.uint8).tobytes()
+    side = int((len(data) // 3) ** 0.5)
+    image = np.frombuffer(data[:side * side * 3], dtype=np.uint8).reshape(side, side, 3)
+
+    # Parity
+    legacy, new = legacy_lsb_entropy(data), byte_statistics(data)
+    if abs(legacy['entropy'] - new['entropy']) > 1e-9:
+        failures.append(f"{size_mb}MB entropy {legacy['entropy']} != {new['entropy']}")
+    if abs(legacy['serial_correlation'] - new['serial_correlation'][1]) > 1e-9:
+        failures.append(f"{size_mb}MB serial correlation {legacy['serial_correlation']} != {new['serial_correlation'][1]}")
+    if len(set(data)) == 256 and abs(legacy['chi_square'] - new['chi_square']) > 1e-6 * legacy['chi_square']:
+        failures.append(f"{size_mb}MB chi-square {legacy['chi_square']} != {new['chi_square']}")
+    for c in range(3):
+        lsb_new, channel_new = new_visual_entropy(image[:, :, c])
+        if abs(legacy_visual_entropy(image[:, :, c] & 1) - lsb_new) > 1e-6 or abs(legacy_visual_entropy(image[:, :, c]) - channel_new) > 1e-6:
+            failures.append(f"{size_mb}MB visual entropy channel {c}")
+
+    def legacy_visual():
+        for c in range(3):
+            legacy_visual_entropy(image[:, :, c] & 1)
+            legacy_visual_entropy(image[:, :, c])
+
+    def new_visual():
+        for c in range(3):
+            new_visual_entropy(image[:, :, c])
+
+    def new_most_common():
+        counts = byte_histogram(as_bytes_array(data))
+        return np.argsort(-counts, kind='stable')[:5]
+
+    workloads = {
+        "lsb_entropy": (lambda: legacy_lsb_entropy(data), lambda: byte_statistics(data)),
+        "most_common": (lambda: Counter(data).most_common(5), new_most_common),
+        "visual_entropy": (legacy_visual, new_visual)
+    }
+    results = {"statistics": {k: v for k, v in new.items() if k != 'serial_correlation'}}
+    for name, (old_fn, new_fn) in workloads.items():
+        old_summary = summarize(time_call(old_fn, repeat=repeat))
+        new_summary = summarize(time_call(new_fn, repeat=repeat, warmup=1))
+        results[name] = {
+            "legacy": old_summary,
+            "byte_stats": new_summary,
+            "speedup": round(old_summary["p50_ms"] / max(new_summary["p50_ms"], 1e-6), 1)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="*", type=float, default=[1, 4, 16], help="Payload sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    failures = []
+    results = {"sizes": {f"{size:g}MB": bench_size(size, args.repeat, failures) for size in args.sizes}}
+    results["parity_failures"] = failures
+    write_json(results, args.out)
+    if failures:
+        print(f"[WARN] {len(failures)} parity failures", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
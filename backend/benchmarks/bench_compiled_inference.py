@@ -0,0 +1,83 @@
+"""
+Forward-pass benchmark: Keras model.predict() against the fixed-signature tf.function path.
+
+For every model it times, per batch size:
+
+    predict    - model.predict(batch, verbose=0) (the previous serving path)
+    compiled   - CompiledModel without XLA
+    xla        - CompiledModel with jit_compile=True (batches padded to the traced sizes)
+
+and reports the largest absolute score difference against predict(), so a speedup never
+hides a numerical regression. Models are synthetic (random weights) unless --model-files
+points at real .keras/.h5 files.
+
+Usage:
+    python -m backend.benchmarks.bench_compiled_inference [--models Baseline_CNN] [--batch-sizes 1 8 16]
+        [--model-files models/x.keras] [--repeat 20] [--no-xla] [--out results.json]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.services.compiled_inference import CompiledModel
+from backend.app.services.model_builder import MODEL_BUILDERS, load_model_with_reconstruction
+from backend.benchmarks.common import summarize, time_call, write_json, write_synthetic_model
+
+
+def bench_model(model, batch_sizes, repeat: int, xla: bool) -> dict:
+    height, width = settings.MODEL_INPUT_SHAPE[:2]
+    rng = np.random.default_rng(0)
+    variants = {
+        "predict": lambda b: model.predict(b, batch_size=len(b), verbose=0),
+        "compiled": CompiledModel(model, settings.MODEL_INPUT_SHAPE, jit_compile=False, batch_sizes=batch_sizes),
+    }
+    if xla:
+        variants["xla"] = CompiledModel(model, settings.MODEL_INPUT_SHAPE, jit_compile=True, batch_sizes=batch_sizes)
+
+    results = {}
+    for size in batch_sizes:
+        batch = rng.uniform(0, 255, (size, height, width, 3)).astype(np.float32)
+        reference = model.predict(batch, batch_size=size, verbose=0)
+        row = {}
+        for name, fn in variants.items():
+            samples = time_call(lambda: fn(batch), repeat=repeat, warmup=2)
+            row[name] = summarize(samples)
+            row[name]["per_image_ms"] = round(row[name]["p50_ms"] / size, 3)
+            row[name]["max_abs_diff"] = float(np.max(np.abs(np.asarray(fn(batch)) - reference)))
+        for name in variants:
+            if name != "predict":
+                row[name]["speedup_vs_predict"] = round(row["predict"]["p50_ms"] / row[name]["p50_ms"], 2)
+        results[f"batch_{size}"] = row
+    if xla:
+        results["xla_state"] = variants["xla"].describe()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", default=[key for key, _ in MODEL_BUILDERS])
+    parser.add_argument("--model-files", nargs="*", default=[])
+    parser.add_argument("--batch-sizes", nargs="*", type=int, default=[1, 8, 16])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-xla", action="store_true")
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(p) for p in args.model_files] or [
+            write_synthetic_model(key, Path(tmp)) for key in args.models
+        ]
+        for path in paths:
+            model = load_model_with_reconstruction(str(path))
+            results[path.name] = bench_model(model, args.batch_sizes, args.repeat, xla=not args.no_xla)
+
+    write_json(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Fast reduced-resolution decode benchmark: ImagePreprocessor.preprocess_fast against the exact preprocess().
+
+For every image it measures both paths' latency, the pixels actually decoded and the
+difference between the two (1, 224, 224, 3) tensors. With models it also reports the
+raw_score drift (mean / max |fast - exact|) and how many labels flip at 0.5, which is what
+decides whether BULK_FAST_DECODE is acceptable for a triage run.
+
+Images are synthetic JPEGs (--sizes, --per-size each) unless --images points at a directory.
+Models are synthetic (random weights) unless --model-files points at real .keras/.h5 files.
+
+Usage:
+    python -m backend.benchmarks.bench_fast_decode [--images dir/] [--sizes 4000x3000 6000x4000]
+        [--per-size 4] [--models MobileNetV2_HPF_Enabled] [--model-files models/x.keras]
+        [--oversample 2] [--repeat 3] [--out results.json]
+"""
+
+import argparse
+import io
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from backend.app.core.config import settings
+from backend.app.services.image_processing import ImagePreprocessor, decode_reduced
+from backend.app.services.model_builder import load_model_with_reconstruction
+from backend.benchmarks.common import summarize, synthetic_image_bytes, time_call, write_json, write_synthetic_model
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def _load_images(args) -> list:
+    if args.images:
+        paths = sorted(p for p in Path(args.images).rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+        return [(p.name, p.read_bytes()) for p in paths]
+    images = []
+    for size in args.sizes:
+        width, height = (int(v) for v in size.lower().split("x"))
+        for seed in range(args.per_size):
+            buffer = io.BytesIO()
+            Image.open(io.BytesIO(synthetic_image_bytes(width, height, seed=seed))).save(buffer, format="JPEG", quality=90)
+            images.append((f"synthetic_{size}_{seed}.jpg", buffer.getvalue()))
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", default=None)
+    parser.add_argument("--sizes", nargs="*", default=["1920x1080", "4000x3000", "6000x4000"])
+    parser.add_argument("--per-size", type=int, default=3)
+    parser.add_argument("--models", nargs="*", default=["MobileNetV2_HPF_Enabled"])
+    parser.add_argument("--model-files", nargs="*", default=[])
+    parser.add_argument("--oversample", type=int, default=settings.PREPROCESS_FAST_DECODE_OVERSAMPLE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    settings.PREPROCESS_FAST_DECODE_OVERSAMPLE = args.oversample
+    height, width = settings.MODEL_INPUT_SHAPE[:2]
+    images = _load_images(args)
+
+    per_image, exact_batch, fast_batch = {}, [], []
+    for name, data in images:
+        exact = ImagePreprocessor.preprocess(data)
+        fast = ImagePreprocessor.preprocess_fast(data)
+        exact_batch.append(exact)
+        fast_batch.append(fast)
+        with Image.open(io.BytesIO(data)) as img:
+            full_pixels = img.width * img.height
+        reduced = decode_reduced(data, height, width, args.oversample)
+        row = {
+            "exact": summarize(time_call(lambda: ImagePreprocessor.preprocess(data), repeat=args.repeat)),
+            "fast": summarize(time_call(lambda: ImagePreprocessor.preprocess_fast(data), repeat=args.repeat)),
+            "decoded_pixels": {"exact": full_pixels, "fast": int(reduced.shape[0] * reduced.shape[1])},
+            "tensor_mean_abs_diff": round(float(np.mean(np.abs(fast - exact))), 4),
+            "tensor_max_abs_diff": round(float(np.max(np.abs(fast - exact))), 4)
+        }
+        row["speedup"] = round(row["exact"]["p50_ms"] / row["fast"]["p50_ms"], 2)
+        per_image[name] = row
+
+    results = {
+        "oversample": args.oversample,
+        "images": per_image,
+        "mean_speedup": round(float(np.mean([r["speedup"] for r in per_image.values()])), 2),
+        "models": {}
+    }
+
+    exact_batch = np.concatenate(exact_batch)
+    fast_batch = np.concatenate(fast_batch)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(p) for p in args.model_files] or [write_synthetic_model(key, Path(tmp)) for key in args.models]
+        for path in paths:
+            model = load_model_with_reconstruction(str(path))
+            exact_scores = np.asarray(model.predict(exact_batch, verbose=0)).reshape(-1)
+            fast_scores = np.asarray(model.predict(fast_batch, verbose=0)).reshape(-1)
+            drift = np.abs(fast_scores - exact_scores)
+            results["models"][path.name] = {
+                "raw_score_mean_abs_drift": round(float(drift.mean()), 6),
+                "raw_score_max_abs_drift": round(float(drift.max()), 6),
+                "label_flips": int(np.sum((fast_scores >= 0.5) != (exact_scores >= 0.5))),
+                "images": len(drift)
+            }
+
+    write_json(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
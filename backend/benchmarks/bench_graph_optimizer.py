@@ -0,0 +1,74 @@
+"""
+Inference graph optimizer benchmark: each model as loaded against its optimize_for_inference() rewrite.
+
+Both graphs run through CompiledModel (the serving path). Per model it reports the rewrite
+(BatchNorm folded, Dropout removed, grayscale folded into SRM), the time the rewrite took,
+latency per batch size before and after, and the largest absolute score difference between
+the two graphs on the benchmark batches. Models are synthetic (random weights, including
+BatchNorm statistics) unless --model-files points at real .keras/.h5 files.
+
+Usage:
+    python -m backend.benchmarks.bench_graph_optimizer [--models MobileNetV2_HPF_Enabled] [--batch-sizes 1 8]
+        [--model-files models/x.keras] [--repeat 20] [--out results.json]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.services.compiled_inference import CompiledModel
+from backend.app.services.graph_optimizer import optimize_for_inference
+from backend.app.services.model_builder import MODEL_BUILDERS, load_model_with_reconstruction
+from backend.benchmarks.common import summarize, time_call, write_json, write_synthetic_model
+
+
+def bench_model(model, batch_sizes, repeat: int) -> dict:
+    height, width = settings.MODEL_INPUT_SHAPE[:2]
+    rng = np.random.default_rng(0)
+    optimized, report = optimize_for_inference(model, input_shape=settings.MODEL_INPUT_SHAPE, atol=np.inf)
+    results = {"optimization": report}
+    if optimized is model:
+        return results
+
+    variants = {
+        "original": CompiledModel(model, settings.MODEL_INPUT_SHAPE, batch_sizes=batch_sizes),
+        "optimized": CompiledModel(optimized, settings.MODEL_INPUT_SHAPE, batch_sizes=batch_sizes),
+    }
+    for size in batch_sizes:
+        batch = rng.uniform(0, 255, (size, height, width, 3)).astype(np.float32)
+        row = {}
+        for name, fn in variants.items():
+            row[name] = summarize(time_call(lambda: fn(batch), repeat=repeat, warmup=2))
+            row[name]["per_image_ms"] = round(row[name]["p50_ms"] / size, 3)
+        row["speedup"] = round(row["original"]["p50_ms"] / row["optimized"]["p50_ms"], 2)
+        row["max_abs_diff"] = float(np.max(np.abs(variants["optimized"](batch) - variants["original"](batch))))
+        results[f"batch_{size}"] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", default=[key for key, _ in MODEL_BUILDERS])
+    parser.add_argument("--model-files", nargs="*", default=[])
+    parser.add_argument("--batch-sizes", nargs="*", type=int, default=[1, 8])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(p) for p in args.model_files] or [
+            write_synthetic_model(key, Path(tmp)) for key in args.models
+        ]
+        for path in paths:
+            model = load_model_with_reconstruction(str(path))
+            results[path.name] = bench_model(model, args.batch_sizes, args.repeat)
+
+    write_json(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Inference benchmark suite: the serving path of every architecture in model_builder, end to end.
+
+For every model (synthetic weights, synthetic JPEG) it reports:
+
+    cold_load_s       - ModelManager.load_model() in a fresh process (reconstruction + graph optimizer)
+    first_forward_s   - the first forward pass after loading (tracing)
+    warm              - single-image latency of the full predict path (decode + resize + forward), p50/p95/p99
+    stages            - the same request split into decode, resize and forward
+    batch_sweep       - forward latency and images/s per batch size
+    thread_sweep      - single-image and largest-batch forward latency per TF intra:inter thread count
+
+Each model and each thread setting runs in its own spawned process: TensorFlow only accepts
+thread counts before its runtime starts, and cold load has to mean cold. The prediction cache,
+micro-batching and the load-artifact cache are turned off so every number is a real forward
+pass (bench_model_loading covers the artifact cache). INFERENCE_MODE, PREPROCESS_BACKEND and
+GRAPH_OPTIMIZER_ENABLED apply as configured and are recorded with the results.
+
+With --baseline, every latency and throughput metric is compared against a previous results
+file; changes beyond --tolerance are listed as regressions or improvements, and
+--fail-on-regression makes the script exit non-zero (for CI).
+
+Usage:
+    python -m backend.benchmarks.bench_inference [--models Baseline_CNN VGG16] [--batch-sizes 1 8 32]
+        [--threads 1:1 2:1 4:1] [--repeat 30] [--image-size 1024x768] [--out results.json]
+        [--baseline baseline.json] [--tolerance 0.1] [--fail-on-regression]
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from backend.benchmarks.common import summarize, synthetic_image_bytes, time_call, write_json, write_synthetic_model
+
+# Leaf metrics compared against a baseline; everything else (n, min_ms, settings) is context
+LOWER_IS_BETTER = ("cold_load_s", "first_forward_s", "mean_ms", "p50_ms", "p95_ms", "p99_ms")
+HIGHER_IS_BETTER = ("images_per_s",)
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.open(io.BytesIO(synthetic_image_bytes(width, height))).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def run_job(job: dict) -> dict:
+    """Benchmark one model file in this (fresh) process. Runs in a spawned child."""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(job["intra_op_threads"])
+    tf.config.threading.set_inter_op_parallelism_threads(job["inter_op_threads"])
+
+    from backend.app.core.config import settings
+    from backend.app.services.image_processing import ImagePreprocessor
+    from backend.app.services.model_service import ModelManager
+
+    settings.MODELS_DIR = Path(job["models_dir"])
+    manager = ModelManager()
+    name = job["model_file"]
+    height, width = settings.MODEL_INPUT_SHAPE[:2]
+    repeat, warmup = job["repeat"], job["warmup"]
+
+    started = time.perf_counter()
+    loaded, error = manager.load_model(name)
+    if not loaded:
+        return {"error": error}
+    result = {"cold_load_s": round(time.perf_counter() - started, 3)}
+
+    model = manager._get_model(name)
+    forward = lambda batch: manager._forward(name, model, batch)
+    rng = np.random.default_rng(0)
+    single = rng.uniform(0, 255, (1, height, width, 3)).astype(np.float32)
+    result["first_forward_s"] = round(time_call(lambda: forward(single))[0], 3)
+
+    if job["stages"]:
+        image_bytes = _jpeg(*job["image_size"])
+        decoded = ImagePreprocessor.decode(image_bytes)
+        tensor = ImagePreprocessor.prepare(decoded)
+        result["warm"] = summarize(time_call(lambda: manager._predict_uncached(image_bytes, name), repeat, warmup))
+        result["stages"] = {
+            "decode": summarize(time_call(lambda: ImagePreprocessor.decode(image_bytes), repeat, warmup)),
+            "resize": summarize(time_call(lambda: ImagePreprocessor.prepare(decoded), repeat, warmup)),
+            "forward": summarize(time_call(lambda: forward(tensor), repeat, warmup))
+        }
+
+    result["batch_sweep"] = {}
+    for size in job["batch_sizes"]:
+        batch = rng.uniform(0, 255, (size, height, width, 3)).astype(np.float32)
+        row = summarize(time_call(lambda: forward(batch), repeat=max(3, repeat // size), warmup=1))
+        row["images_per_s"] = round(size * 1000.0 / row["p50_ms"], 2)
+        result["batch_sweep"][str(size)] = row
+    return result
+
+
+def _spawn(context, job: dict) -> dict:
+    # One short-lived process per job; a crash (e.g. out of memory) is recorded, not fatal
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            return pool.submit(run_job, job).result()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _flatten(tree, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> dict:
+    """Relative change of every shared latency / throughput metric; beyond tolerance it is a regression or improvement."""
+    now, before = _flatten(current["models"]), _flatten(baseline.get("models", {}))
+    metrics, regressions, improvements = {}, [], []
+    for path in sorted(now.keys() & before.keys()):
+        leaf = path.rsplit(".", 1)[-1]
+        if leaf not in LOWER_IS_BETTER + HIGHER_IS_BETTER or before[path] <= 0:
+            continue
+        change = (now[path] - before[path]) / before[path]
+        worse = -change if leaf in HIGHER_IS_BETTER else change
+        metrics[path] = {"baseline": before[path], "current": now[path], "change_pct": round(change * 100.0, 1)}
+        if worse > tolerance:
+            regressions.append(path)
+        elif worse < -tolerance:
+            improvements.append(path)
+    mismatched = sorted(
+        key for key in current["environment"]
+        if key in baseline.get("environment", {}) and baseline["environment"][key] != current["environment"][key]
+    )
+    return {
+        "tolerance_pct": round(tolerance * 100.0, 1),
+        "environment_mismatch": mismatched,
+        "regressions": regressions,
+        "improvements": improvements,
+        "metrics": metrics
+    }
+
+
+def _environment(args) -> dict:
+    import tensorflow as tf
+    from backend.app.core.config import settings
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "tensorflow": tf.__version__,
+        "numpy": np.__version__,
+        "inference_mode": settings.INFERENCE_MODE,
+        "jit_compile": settings.INFERENCE_JIT_COMPILE,
+        "graph_optimizer": settings.GRAPH_OPTIMIZER_ENABLED,
+        "preprocess_backend": settings.PREPROCESS_BACKEND,
+        "image_size": args.image_size,
+        "repeat": args.repeat
+    }
+
+
+def main():
+    from backend.app.services.model_builder import MODEL_BUILDERS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", default=[key for key, _ in MODEL_BUILDERS])
+    parser.add_argument("--batch-sizes", nargs="*", type=int, default=[1, 4, 8, 16, 32])
+    parser.add_argument("--threads", nargs="*", default=["1:1", "2:1", "4:1"],
+                        help="intra:inter TF thread counts for the thread sweep (0 = TensorFlow default)")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--image-size", default="1024x768", help="Synthetic JPEG size (WxH)")
+    parser.add_argument("--baseline", default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative change that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    # Inherited by the spawned jobs, which import the settings fresh
+    os.environ["PREDICTION_CACHE_ENABLED"] = "0"
+    os.environ["BATCHING_ENABLED"] = "0"
+    os.environ["ARTIFACT_CACHE_ENABLED"] = "0"
+
+    image_size = tuple(int(v) for v in args.image_size.lower().split("x"))
+    threads = [tuple(int(v) for v in t.split(":")) for t in args.threads]
+    context = multiprocessing.get_context("spawn")
+    results = {"environment": _environment(args), "models": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for key in args.models:
+            path = write_synthetic_model(key, Path(tmp))
+            job = {
+                "models_dir": tmp,
+                "model_file": path.name,
+                "intra_op_threads": 0,
+                "inter_op_threads": 0,
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+                "image_size": image_size,
+                "stages": True,
+                "batch_sizes": args.batch_sizes
+            }
+            print(f"[INFO] Benchmarking {key}", file=sys.stderr, flush=True)
+            row = _spawn(context, job)
+            row["thread_sweep"] = {}
+            for intra, inter in threads:
+                sweep = _spawn(context, dict(
+                    job, intra_op_threads=intra, inter_op_threads=inter, stages=False,
+                    batch_sizes=sorted({1, max(args.batch_sizes)})
+                ))
+                row["thread_sweep"][f"{intra}:{inter}"] = sweep.get("batch_sweep", sweep)
+            results["models"][key] = row
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["comparison"] = compare(results, json.load(f), args.tolerance)
+    write_json(results, args.out)
+
+    comparison = results.get("comparison")
+    if comparison and comparison["regressions"]:
+        print(f"[WARN] {len(comparison['regressions'])} metrics regressed beyond {comparison['tolerance_pct']}%: "
+              f"{', '.join(comparison['regressions'])}", file=sys.stderr)
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+LSB extraction benchmark: the NumPy engine (lsb_engine.extract_bytes) against the original per-pixel loop.
+
+Parity: every channels / bit_order / bits_per_channel combination and several max_bytes
+values (including ones the image cannot fill and ones that end mid channel value) on small
+RGB, RGBA and grayscale arrays must give byte-identical output. The script exits non-zero
+on any mismatch.
+
+Timing: extraction of --max-bytes from synthetic images of each --sizes, for every traversal
+order. The legacy loop is only timed on --legacy-bytes (it is linear in the output size) and
+extrapolated, so the run stays short.
+
+Usage:
+    python -m backend.benchmarks.bench_lsb_engine [--sizes 1920x1080 4000x3000] [--max-bytes 1048576]
+        [--legacy-bytes 65536] [--repeat 5] [--out results.json]
+"""
+
+import argparse
+import itertools
+import sys
+
+import numpy as np
+
+from backend.app.services.forensics.lsb_analyzer import LSBAnalyzer
+from backend.app.services.forensics.lsb_engine import TRAVERSAL_ORDERS, extract_bytes
+from backend.benchmarks.common import summarize, time_call, write_json
+
+CHANNELS = ("R", "G", "B", "A", "RGB", "RGBA", "RG", "RB", "GB")
+
+
+def legacy_extract(img_array: np.ndarray, channel_indices, bit_order: str, bits_per_channel: int, max_bytes: int) -> bytes:
+    """The per-pixel loop and bit packing LSBAnalyzer used before the engine, kept as the reference."""
+    height, width = img_array.shape[:2]
+    bit_array = []
+    max_bits = max_bytes * 8
+    for y in range(height):
+        for x in range(width):
+            if len(bit_array) >= max_bits:
+                break
+            pixel = img_array[y, x]
+            for ch_idx in channel_indices:
+                channel_value = pixel if len(img_array.shape) == 2 else pixel[ch_idx]
+                for bit_pos in range(bits_per_channel):
+                    shift = bit_pos if bit_order == "LSB" else 7 - bit_pos
+                    bit_array.append((channel_value >> shift) & 1)
+                if len(bit_array) >= max_bits:
+                    break
+            if len(bit_array) >= max_bits:
+                break
+    byte_array = []
+    for i in range(0, len(bit_array), 8):
+        byte_bits = bit_array[i:i + 8]
+        byte_bits.extend([0] * (8 - len(byte_bits)))
+        byte_array.append(sum(bit << (7 - idx) for idx, bit in enumerate(byte_bits)))
+    return bytes(byte_array)
+
+
+def check_parity() -> tuple:
+    rng = np.random.default_rng(0)
+    arrays = {
+        "rgb_13x17": rng.integers(0, 256, (13, 17, 3), dtype=np.uint8),
+        "rgba_9x11": rng.integers(0, 256, (9, 11, 4), dtype=np.uint8),
+        "gray_7x5": rng.integers(0, 256, (7, 5), dtype=np.uint8),
+    }
+    analyzer = LSBAnalyzer.__new__(LSBAnalyzer)
+    cases, failures = 0, []
+    for (name, array), channels, bit_order, bits in itertools.product(arrays.items(), CHANNELS, ("LSB", "MSB"), range(1, 9)):
+        indices = analyzer._parse_channels(channels, array.shape[2] if array.ndim == 3 else 1)
+        for max_bytes in (0, 1, 3, 17, 123, 10000):
+            cases += 1
+            if extract_bytes(array, indices, bit_order, bits, max_bytes) != legacy_extract(array, indices, bit_order, bits, max_bytes):
+                failures.append(f"{name} {channels} {bit_order} {bits} {max_bytes}")
+    return cases, failures
+
+
+def bench_speed(sizes, max_bytes: int, legacy_bytes: int, repeat: int) -> dict:
+    rng = np.random.default_rng(1)
+    results = {}
+    for width, height in sizes:
+        image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        row = {}
+        for order in TRAVERSAL_ORDERS:
+            row[order] = summarize(time_call(lambda: extract_bytes(image, [0, 1, 2], "LSB", 1, max_bytes, order), repeat=repeat, warmup=1))
+        legacy = summarize(time_call(lambda: legacy_extract(image, [0, 1, 2], "LSB", 1, legacy_bytes)))
+        scale = min(max_bytes, width * height * 3 // 8) / legacy_bytes
+        row["legacy_extrapolated_ms"] = round(legacy["p50_ms"] * scale, 1)
+        row["speedup"] = round(row["legacy_extrapolated_ms"] / row["row"]["p50_ms"], 1)
+        results[f"{width}x{height}"] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="*", default=["1920x1080", "4000x3000"])
+    parser.add_argument("--max-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--legacy-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(v) for v in s.lower().split("x")) for s in args.sizes]
+    cases, failures = check_parity()
+    results = {
+        "parity": {"cases": cases, "failures": failures},
+        "max_bytes": args.max_bytes,
+        "speed": bench_speed(sizes, args.max_bytes, args.legacy_bytes, args.repeat)
+    }
+    write_json(results, args.out)
+    if failures:
+        print(f"[WARN] {len(failures)} parity failures", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Cold-load benchmark for load_model_with_reconstruction with and without the load-artifact cache.
+
+For every architecture it writes two synthetic model files: a native .keras file (direct
+strategy) and a legacy .h5 without model_config (direct load fails, reconstruction wins).
+Each file is then loaded three ways:
+
+    legacy   - no artifact cache, compile() on every path (the previous behaviour)
+    first    - artifact cache enabled but empty (pays the fallbacks once and records them)
+    cached   - artifact cache populated (goes straight to the winning strategy, no compile)
+
+The cache holds no serving artifact for the direct strategy, only its manifest: a cached
+direct load still deserializes the whole .keras file and saves just compile(), while a
+cached reconstruction also skips the failed direct attempt. "by_strategy" therefore
+reports the two speedups separately.
+
+Usage:
+    python -m backend.benchmarks.bench_model_loading [--models VGG16 ResNet50] [--repeat 3] [--out results.json]
+"""
+
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+
+from backend.app.services.artifact_cache import LoadArtifactCache, file_sha256
+from backend.app.services.model_builder import MODEL_BUILDERS, load_model_with_reconstruction
+from backend.benchmarks.common import summarize, time_call, write_json, write_synthetic_model
+
+
+def bench_file(path: Path, cache_root: Path, repeat: int) -> dict:
+    def legacy():
+        load_model_with_reconstruction(str(path), artifact_cache=None, compile_model=True)
+
+    def cached():
+        load_model_with_reconstruction(str(path), artifact_cache=LoadArtifactCache(cache_root))
+
+    shutil.rmtree(cache_root, ignore_errors=True)
+    first = time_call(cached, repeat=1)
+    # Interleave so both variants see the same process state (graph/name caches, allocator)
+    before, warm = [], []
+    for _ in range(repeat):
+        before += time_call(legacy)
+        warm += time_call(cached)
+
+    legacy_ms = summarize(before)["p50_ms"]
+    cached_ms = summarize(warm)["p50_ms"]
+    return {
+        "strategy": LoadArtifactCache(cache_root).lookup(file_sha256(path))["strategy"],
+        "legacy": summarize(before),
+        "first_with_cache": summarize(first),
+        "cached": summarize(warm),
+        "saved_ms": round(legacy_ms - cached_ms, 3),
+        "speedup": round(legacy_ms / cached_ms, 2) if cached_ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", default=[key for key, _ in MODEL_BUILDERS])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for key in args.models:
+            for fmt in ("keras", "weights_only"):
+                path = write_synthetic_model(key, tmp / "models", fmt=fmt)
+                results[f"{key}/{fmt}"] = bench_file(path, tmp / "artifact_cache" / key / fmt, args.repeat)
+
+    by_strategy = {}
+    for entry in results.values():
+        totals = by_strategy.setdefault(entry["strategy"], {"files": 0, "legacy_p50_ms": 0.0, "cached_p50_ms": 0.0})
+        totals["files"] += 1
+        totals["legacy_p50_ms"] += entry["legacy"]["p50_ms"]
+        totals["cached_p50_ms"] += entry["cached"]["p50_ms"]
+    for totals in by_strategy.values():
+        totals["legacy_p50_ms"] = round(totals["legacy_p50_ms"], 3)
+        totals["cached_p50_ms"] = round(totals["cached_p50_ms"], 3)
+        totals["speedup"] = round(totals["legacy_p50_ms"] / totals["cached_p50_ms"], 2) if totals["cached_p50_ms"] else None
+
+    write_json({"files": results, "by_strategy": by_strategy}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+ONNX Runtime against TensorFlow: score parity and throughput per architecture.
+
+Every model is exported with export_onnx (which already rejects graphs that diverge), then
+both backends score the same preprocessed images:
+
+    parity      - max / mean |raw_score difference| and label flips at 0.5
+    throughput  - p50 latency and images/s per batch size, for the TensorFlow tf.function
+                  path and for ONNX Runtime at each --intra-threads / --opt-levels setting
+
+Models are synthetic (random weights) unless --model-files points at real .keras/.h5 files.
+Needs the optional onnxruntime and tf2onnx packages.
+
+Usage:
+    python -m backend.benchmarks.bench_onnx [--models MobileNetV2_HPF_Enabled VGG16 ResNet50]
+        [--model-files models/x.keras] [--batch-sizes 1 8] [--intra-threads 1 4]
+        [--opt-levels basic all] [--validation-dir data/val] [--repeat 10] [--out results.json]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.services.compiled_inference import CompiledModel
+from backend.app.services.image_processing import ImagePreprocessor
+from backend.app.services.model_builder import load_model_with_reconstruction
+from backend.app.services.onnx_backend import OPTIMIZATION_LEVELS, ONNXModel, export_onnx
+from backend.app.services.tflite_backend import iter_calibration_images
+from backend.benchmarks.common import summarize, synthetic_image_bytes, time_call, write_json, write_synthetic_model
+
+
+def throughput(forward, images: np.ndarray, batch_sizes, repeat: int) -> dict:
+    rows = {}
+    for size in batch_sizes:
+        batch = images[:size]
+        stats = summarize(time_call(lambda: forward(batch), repeat=repeat, warmup=2))
+        rows[f"batch_{len(batch)}"] = {
+            "p50_ms": stats["p50_ms"],
+            "p95_ms": stats["p95_ms"],
+            "images_per_s": round(len(batch) * 1000.0 / stats["p50_ms"], 2),
+        }
+    return rows
+
+
+def bench_model(model_path: Path, images: np.ndarray, args, tmp: Path) -> dict:
+    model = load_model_with_reconstruction(str(model_path))
+    onnx_path = tmp / f"{model_path.stem}.onnx"
+    export = export_onnx(model, onnx_path, input_shape=settings.MODEL_INPUT_SHAPE)
+
+    tf_forward = CompiledModel(model, settings.MODEL_INPUT_SHAPE)
+    reference = tf_forward(images)[:, 0]
+    results = {
+        "export": {k: v for k, v in export.items() if k != "path"},
+        "tensorflow": throughput(tf_forward, images, args.batch_sizes, args.repeat),
+    }
+
+    for level in args.opt_levels:
+        for threads in args.intra_threads:
+            session = ONNXModel(onnx_path, intra_op_threads=threads, optimization_level=level)
+            scores = session.predict(images)[:, 0]
+            diff = np.abs(scores - reference)
+            key = f"onnx_{level}_threads_{threads}"
+            results[key] = {
+                "parity": {
+                    "max_abs": round(float(diff.max()), 7),
+                    "mean_abs": round(float(diff.mean()), 7),
+                    "label_flips": int(np.sum((scores >= 0.5) != (reference >= 0.5))),
+                },
+                **throughput(session.predict, images, args.batch_sizes, args.repeat),
+            }
+            for batch_key, row in results["tensorflow"].items():
+                results[key][batch_key]["speedup_vs_tensorflow"] = round(row["p50_ms"] / results[key][batch_key]["p50_ms"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", default=["MobileNetV2_HPF_Enabled", "VGG16", "ResNet50"])
+    parser.add_argument("--model-files", nargs="*", default=[])
+    parser.add_argument("--validation-dir")
+    parser.add_argument("--batch-sizes", nargs="*", type=int, default=[1, 8])
+    parser.add_argument("--intra-threads", nargs="*", type=int, default=[1, settings.EXECUTION_POOLS["forensics_heavy"]["workers"]])
+    parser.add_argument("--opt-levels", nargs="*", choices=OPTIMIZATION_LEVELS, default=["basic", "all"])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+    args.intra_threads = sorted(set(args.intra_threads))
+
+    if args.validation_dir:
+        images = list(iter_calibration_images(args.validation_dir, 64))
+    else:
+        images = [ImagePreprocessor.preprocess(synthetic_image_bytes(seed=i)) for i in range(max(16, max(args.batch_sizes)))]
+    images = np.concatenate(images, axis=0)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        paths = [Path(p) for p in args.model_files] or [write_synthetic_model(key, tmp) for key in args.models]
+        for path in paths:
+            try:
+                results[path.name] = bench_model(path, images, args, tmp)
+            except Exception as e:
+                results[path.name] = {"error": str(e)[:500]}
+
+    write_json(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
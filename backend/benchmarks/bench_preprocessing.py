@@ -0,0 +1,54 @@
+"""
+Preprocessing microbenchmark: TensorFlow path against the NumPy/Pillow path.
+
+p50 latency of ImagePreprocessor.preprocess (decode + resize) with PREPROCESS_BACKEND "tf"
+and "numpy" per source size, for PNG and 4:2:0 JPEG. Output parity between the two
+backends is asserted by backend/tests/test_preprocessing_parity.py.
+
+Usage:
+    python -m backend.benchmarks.bench_preprocessing [--sizes 640x480 4000x3000] [--repeat 20] [--out results.json]
+"""
+
+import argparse
+
+from backend.app.core.config import settings
+from backend.app.services.image_processing import ImagePreprocessor
+from backend.benchmarks.common import encode_variant, summarize, time_call, write_json
+
+
+def _with_backend(backend: str, fn, *args):
+    previous = settings.PREPROCESS_BACKEND
+    settings.PREPROCESS_BACKEND = backend
+    try:
+        return fn(*args)
+    finally:
+        settings.PREPROCESS_BACKEND = previous
+
+
+def bench_speed(sizes, repeat: int) -> dict:
+    results = {}
+    for w, h in sizes:
+        for variant in ("PNG", "JPEG_q75_420"):
+            data = encode_variant(w, h, variant)
+            row = {}
+            for backend in ("tf", "numpy"):
+                samples = time_call(lambda: _with_backend(backend, ImagePreprocessor.preprocess, data), repeat=repeat, warmup=2)
+                row[backend] = summarize(samples)
+            row["speedup"] = round(row["tf"]["p50_ms"] / row["numpy"]["p50_ms"], 2)
+            results[f"{variant}_{w}x{h}"] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="*", default=["224x224", "333x251", "640x480", "1920x1080", "4000x3000"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(v) for v in s.lower().split("x")) for s in args.sizes]
+    write_json({"speed": bench_speed(sizes, args.repeat)}, args.out)
+
+
+if __name__ == "__main__":
+    main()
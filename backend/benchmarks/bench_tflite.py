@@ -0,0 +1,126 @@
+"""
+TFLite export check: raw_score drift, latency and memory of float32 / float16 / int8 against Keras.
+
+Every image in the validation folder goes through the same preprocessing as /predict, then
+through the Keras model and each exported TFLite variant. For each variant it reports:
+
+    drift      - max / mean / p99 |raw_score - keras raw_score| and how many labels flip at 0.5
+    latency    - single-image p50/p95 (the /predict case) and per-image time at --batch-size
+    memory     - flatbuffer size vs Keras variable bytes, RSS growth when the interpreter loads
+
+Without --validation-dir a synthetic image set is used (enough to catch broken conversions,
+not to judge accuracy). int8 calibrates on --calibration-dir, or on the first half of the
+validation images, in which case drift is reported on the other half only.
+
+Usage:
+    python -m backend.benchmarks.bench_tflite [--model-file models/model_MobileNetV2_HPF_Enabled.keras]
+        [--validation-dir data/val] [--calibration-dir data/calib] [--modes float32 float16 int8]
+        [--num-threads 4] [--repeat 20] [--out results.json]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.services.compiled_inference import CompiledModel
+from backend.app.services.image_processing import ImagePreprocessor
+from backend.app.services.model_builder import load_model_with_reconstruction
+from backend.app.services.model_cache import measure_model_footprint, read_rss_bytes
+from backend.app.services.tflite_backend import QUANTIZATION_MODES, TFLiteModel, export_tflite, iter_calibration_images
+from backend.benchmarks.common import summarize, synthetic_image_bytes, time_call, write_json, write_synthetic_model
+
+
+def drift_stats(scores: np.ndarray, reference: np.ndarray) -> dict:
+    diff = np.abs(scores - reference)
+    return {
+        "images": int(len(diff)),
+        "max_abs": round(float(diff.max()), 6),
+        "mean_abs": round(float(diff.mean()), 6),
+        "p99_abs": round(float(np.percentile(diff, 99)), 6),
+        "label_flips": int(np.sum((scores >= 0.5) != (reference >= 0.5))),
+    }
+
+
+def latency(forward, images: np.ndarray, batch_size: int, repeat: int) -> dict:
+    single = summarize(time_call(lambda: forward(images[:1]), repeat=repeat, warmup=2))
+    batch = images[:batch_size]
+    batched = summarize(time_call(lambda: forward(batch), repeat=max(1, repeat // 4), warmup=1))
+    return {
+        "single_p50_ms": single["p50_ms"],
+        "single_p95_ms": single["p95_ms"],
+        f"batch_{len(batch)}_per_image_ms": round(batched["p50_ms"] / len(batch), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-file", help="Model to export (default: synthetic MobileNetV2_HPF_Enabled)")
+    parser.add_argument("--validation-dir")
+    parser.add_argument("--calibration-dir")
+    parser.add_argument("--modes", nargs="*", choices=QUANTIZATION_MODES, default=list(QUANTIZATION_MODES))
+    parser.add_argument("--num-threads", type=int, default=settings.TFLITE_NUM_THREADS)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=200, help="Max validation images")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        model_path = Path(args.model_file) if args.model_file else write_synthetic_model("MobileNetV2_HPF_Enabled", tmp)
+        model = load_model_with_reconstruction(str(model_path))
+
+        if args.validation_dir:
+            images = list(iter_calibration_images(args.validation_dir, args.limit))
+        else:
+            images = [ImagePreprocessor.preprocess(synthetic_image_bytes(seed=i)) for i in range(min(args.limit, 64))]
+        if not images:
+            raise SystemExit("No validation images found")
+
+        if args.calibration_dir:
+            calibration = list(iter_calibration_images(args.calibration_dir, args.limit))
+            evaluation = np.concatenate(images, axis=0)
+        else:
+            half = max(1, len(images) // 2)
+            calibration, evaluation = images[:half], np.concatenate(images[half:] or images, axis=0)
+
+        keras_forward = CompiledModel(model, settings.MODEL_INPUT_SHAPE)
+        reference = keras_forward(evaluation)[:, 0]
+        results = {
+            "model": model_path.name,
+            "num_threads": args.num_threads,
+            "keras": {
+                "size_mb": round(measure_model_footprint(model) / (1024 * 1024), 2),
+                **latency(keras_forward, evaluation, args.batch_size, args.repeat),
+            },
+        }
+
+        for mode in args.modes:
+            out_path = tmp / f"{model_path.stem}_{mode}.tflite"
+            try:
+                export_tflite(model, out_path, mode, calibration if mode == "int8" else None, settings.MODEL_INPUT_SHAPE)
+            except Exception as e:
+                results[mode] = {"error": str(e)[:500]}
+                continue
+
+            rss_before = read_rss_bytes()
+            tflite_model = TFLiteModel(out_path, num_threads=args.num_threads)
+            scores = tflite_model.predict(evaluation)[:, 0]
+            results[mode] = {
+                "size_mb": round(out_path.stat().st_size / (1024 * 1024), 2),
+                "rss_growth_mb": round(max(0, read_rss_bytes() - rss_before) / (1024 * 1024), 2),
+                "drift": drift_stats(scores, reference),
+                **latency(tflite_model.predict, evaluation, args.batch_size, args.repeat),
+            }
+            results[mode]["speedup_single"] = round(
+                results["keras"]["single_p50_ms"] / results[mode]["single_p50_ms"], 2
+            )
+
+    write_json(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Tiled inference benchmark: patch throughput of ModelManager.predict_tiled's forward loop against batch size.
+
+A synthetic full-resolution image is cut into native-resolution patches (same grid and
+sampling as /predict/tiled). For every batch size the patches run through CompiledModel
+that many at a time; the report has total latency, patches per second and the speedup
+over batch size 1. Models are synthetic (random weights) unless --model-files points at
+real .keras/.h5 files.
+
+Usage:
+    python -m backend.benchmarks.bench_tiled [--models MobileNetV2_HPF_Enabled] [--image-size 4000 3000]
+        [--stride 224] [--max-tiles 64] [--batch-sizes 1 8 32] [--repeat 3] [--out results.json]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.services.compiled_inference import CompiledModel
+from backend.app.services.image_processing import ImagePreprocessor
+from backend.app.services.model_builder import MODEL_BUILDERS, load_model_with_reconstruction
+from backend.app.services.tiling import iter_patch_batches, sample_tiles, tile_grid
+from backend.benchmarks.common import summarize, synthetic_image_bytes, time_call, write_json, write_synthetic_model
+
+
+def bench_model(model, image: np.ndarray, stride: int, max_tiles: int, batch_sizes, repeat: int) -> dict:
+    patch = settings.MODEL_INPUT_SHAPE[0]
+    rows, cols = tile_grid(image.shape[0], image.shape[1], patch, stride)
+    cells = sample_tiles(len(rows), len(cols), max_tiles)
+    compiled = CompiledModel(model, settings.MODEL_INPUT_SHAPE, batch_sizes=batch_sizes)
+
+    def run(batch_size: int):
+        for batch in iter_patch_batches(image, cells, rows, cols, patch, batch_size):
+            compiled(batch)
+
+    results = {"tiles_total": len(rows) * len(cols), "tiles_scored": len(cells)}
+    for size in batch_sizes:
+        row = summarize(time_call(lambda: run(size), repeat=repeat, warmup=1))
+        row["patches_per_s"] = round(len(cells) / (row["p50_ms"] / 1000), 1)
+        results[f"batch_{size}"] = row
+    base = results.get(f"batch_{min(batch_sizes)}")
+    for size in batch_sizes:
+        results[f"batch_{size}"]["speedup"] = round(base["p50_ms"] / results[f"batch_{size}"]["p50_ms"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", default=["MobileNetV2_HPF_Enabled"])
+    parser.add_argument("--model-files", nargs="*", default=[])
+    parser.add_argument("--image-size", nargs=2, type=int, default=[4000, 3000], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--stride", type=int, default=settings.TILED_STRIDE)
+    parser.add_argument("--max-tiles", type=int, default=64)
+    parser.add_argument("--batch-sizes", nargs="*", type=int, default=[1, 8, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    image = ImagePreprocessor.decode(synthetic_image_bytes(*args.image_size, fmt="PNG"))
+    results = {"image_size": args.image_size, "stride": args.stride}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(p) for p in args.model_files] or [
+            write_synthetic_model(key, Path(tmp)) for key in args.models
+        ]
+        for path in paths:
+            model = load_model_with_reconstruction(str(path))
+            results[path.name] = bench_model(model, image, args.stride, args.max_tiles, args.batch_sizes, args.repeat)
+
+    write_json(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Shared helpers for the offline benchmarks: synthetic model files and images, timing and percentiles.
+
+Everything here runs without real weights or datasets so benchmarks can be reproduced anywhere.
+"""
+
+import io
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+from PIL import Image
+
+
+def synthetic_image_bytes(width: int = 512, height: int = 512, fmt: str = "PNG", seed: int = 0) -> bytes:
+    """Encode a smooth random image (gradient + noise, closer to a photo than pure noise)."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    base = np.stack([
+        xx * 255.0 / max(width - 1, 1),
+        yy * 255.0 / max(height - 1, 1),
+        (xx + yy) * 127.5 / max(width + height - 2, 1)
+    ], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, mode="RGB").save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+# Encodings of synthetic_image_bytes() that exercise each decode path of PREPROCESS_BACKEND="numpy"
+IMAGE_VARIANTS = ("PNG", "JPEG_q75_420", "JPEG_q95_444", "JPEG_q90_L", "BMP", "GIF", "PNG_L", "PNG_RGBA")
+
+
+def encode_variant(width: int, height: int, variant: str) -> bytes:
+    """synthetic_image_bytes() in one of IMAGE_VARIANTS (JPEG quality/subsampling, grayscale, alpha)."""
+    if variant in ("PNG", "BMP", "GIF"):
+        return synthetic_image_bytes(width, height, fmt=variant)
+    img = Image.open(io.BytesIO(synthetic_image_bytes(width, height)))
+    buffer = io.BytesIO()
+    if variant == "JPEG_q75_420":
+        img.save(buffer, format="JPEG", quality=75, subsampling=2)
+    elif variant == "JPEG_q95_444":
+        img.save(buffer, format="JPEG", quality=95, subsampling=0)
+    elif variant == "JPEG_q90_L":
+        img.convert("L").save(buffer, format="JPEG", quality=90)
+    elif variant == "PNG_L":
+        img.convert("L").save(buffer, format="PNG")
+    elif variant == "PNG_RGBA":
+        img.putalpha(128)
+        img.save(buffer, format="PNG")
+    else:
+        raise ValueError(f"Unknown variant {variant}")
+    return buffer.getvalue()
+
+
+def write_synthetic_model(builder_key: str, out_dir, fmt: str = "keras", seed: int = 0) -> Path:
+    """
+    Build an architecture from model_builder with random (non-trivial) weights and save it.
+
+    fmt:
+        'keras'          - native .keras file; loads through the direct strategy
+        'h5'             - legacy full-model .h5 file
+        'weights_only'   - legacy .h5 without model_config, so direct load fails and the
+                           loader has to fall back to architecture reconstruction
+    """
+    import h5py
+    from backend.app.services.model_builder import MODEL_BUILDERS
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    model = dict(MODEL_BUILDERS)[builder_key]()
+    randomize_weights(model, seed=seed)
+
+    if fmt == "keras":
+        path = out_dir / f"{builder_key}_synthetic.keras"
+        model.save(path)
+    elif fmt in ("h5", "weights_only"):
+        path = out_dir / f"{builder_key}_synthetic{'_weights' if fmt == 'weights_only' else ''}.h5"
+        model.save(path)
+        if fmt == "weights_only":
+            with h5py.File(path, "a") as f:
+                del f.attrs["model_config"]
+    else:
+        raise ValueError(f"Unknown synthetic model format: {fmt}")
+    return path
+
+
+def randomize_weights(model, seed: int = 0, scale: float = 0.05):
+    """Perturb trainable weights and BN statistics so outputs are not a constant 0.5. SRM kernels stay fixed."""
+    rng = np.random.default_rng(seed)
+    for layer in model.layers:
+        if hasattr(layer, "layers"):
+            randomize_weights(layer, seed=int(rng.integers(1 << 31)), scale=scale)
+            continue
+        weights = layer.get_weights()
+        if not weights or layer.name == "SRM_Filter_Bank":
+            continue
+        if "BatchNormalization" in layer.__class__.__name__:
+            # Positive values everywhere keeps the moving variance valid
+            layer.set_weights([(np.abs(rng.normal(1.0, 0.2, w.shape)) + 0.1).astype(w.dtype) for w in weights])
+        else:
+            layer.set_weights([(w + rng.normal(0, scale, w.shape)).astype(w.dtype) for w in weights])
+
+
+def time_call(fn: Callable, repeat: int = 1, warmup: int = 0) -> List[float]:
+    """Wall-clock seconds of repeat calls to fn, after warmup untimed calls."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    arr = np.asarray(samples, dtype=np.float64) * 1000.0
+    if arr.size == 0:
+        return {}
+    return {
+        "n": int(arr.size),
+        "mean_ms": round(float(arr.mean()), 3),
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "min_ms": round(float(arr.min()), 3),
+    }
+
+
+def write_json(results: Dict, path):
+    if path:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,54 @@
+"""
+PREPROCESS_BACKEND="numpy" (Pillow + resize_bilinear) against the TensorFlow path it replaces.
+
+decode_rgb uses libjpeg's fast integer IDCT for 4:4:4 and grayscale JPEGs, as TF does, so
+every format is bit-identical except chroma-subsampled JPEGs: Pillow decodes those with the
+accurate IDCT and fancy upsampling, a few levels away from TF.
+
+Run from the repository root: python -m pytest backend/tests
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from backend.app.core.config import settings
+from backend.app.services.image_processing import ImagePreprocessor, resize_bilinear
+from backend.benchmarks.common import IMAGE_VARIANTS, encode_variant
+
+SIZES = [(224, 224), (333, 251), (640, 480), (1920, 1080)]
+
+# Largest absolute difference allowed per variant (0 = bit-identical)
+TOLERANCES = {variant: 0.0 for variant in IMAGE_VARIANTS}
+TOLERANCES["JPEG_q75_420"] = 4.0
+
+
+def _preprocess(monkeypatch, backend: str, data: bytes) -> np.ndarray:
+    monkeypatch.setattr(settings, "PREPROCESS_BACKEND", backend)
+    return ImagePreprocessor.preprocess(data)
+
+
+@pytest.mark.parametrize("width,height", SIZES)
+@pytest.mark.parametrize("variant", IMAGE_VARIANTS)
+def test_numpy_backend_matches_tf(monkeypatch, variant, width, height):
+    data = encode_variant(width, height, variant)
+    reference = _preprocess(monkeypatch, "tf", data)
+    result = _preprocess(monkeypatch, "numpy", data)
+
+    assert result.shape == reference.shape == (1, *settings.MODEL_INPUT_SHAPE[:2], 3)
+    assert result.dtype == reference.dtype
+    np.testing.assert_allclose(result, reference, rtol=0, atol=TOLERANCES[variant])
+
+
+@pytest.mark.parametrize("width,height", SIZES)
+def test_resize_bilinear_matches_tf_image_resize(monkeypatch, width, height):
+    data = encode_variant(width, height, "PNG")
+    monkeypatch.setattr(settings, "PREPROCESS_BACKEND", "tf")
+    decoded = ImagePreprocessor.decode(data)
+    target_height, target_width = settings.MODEL_INPUT_SHAPE[:2]
+
+    np.testing.assert_array_equal(
+        resize_bilinear(decoded, target_height, target_width)[np.newaxis],
+        ImagePreprocessor.preprocess(data)
+    )